@@ -0,0 +1,153 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+import analysis
+from analysis_engine import AnalysisEngine, DEFAULT_CONCURRENCY, estimate_tokens
+from batching import pack_batches
+from context_compressor import DEFAULT_CONTEXT_TOKENS, compress_context
+from json_stream import iter_records
+from model_backends import StubModel
+from platforms import PLATFORMS
+from rate_limiter import RateLimiter
+
+# --- Workload ---
+WORKLOAD_FILE = PLATFORMS["aicrowd"].details_file  # The checked-in scraped competitions
+DEFAULT_LIMIT = 60
+DEFAULT_BATCH_TOKENS = 20_000
+MODES = ["serial", "concurrent", "batched"]
+UNLIMITED_RPM = 100_000  # Measure the analysis code, not the quota
+
+
+def load_workload(limit, context_tokens):
+    """The first `limit` competitions with a context, compressed the way the analyzers send them."""
+    competitions = []
+    for competition in iter_records(WORKLOAD_FILE):
+        context = competition.get("context") or ""
+        if not context or context.startswith("Error:"):
+            continue
+        if context_tokens > 0:
+            context = compress_context(context, context_tokens)[0]
+        competitions.append({"name": competition.get("name") or competition.get("link"), "context": context})
+        if len(competitions) >= limit:
+            break
+    return competitions
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[round(fraction * (len(ordered) - 1))]
+
+
+async def run_mode(mode, competitions, args):
+    """
+    Analyzes the workload with the stub model: one call at a time ("serial", like the
+    original loop without its sleeps), through the concurrent engine, or batched.
+    Returns the measurements for one row of the report.
+    """
+    analysis.model = StubModel(latency=(args.latency_min, args.latency_max), rate_limit_error_rate=args.rate_limit_error_rate,
+                               error_rate=args.error_rate, seed=args.seed, seconds_per_1k_tokens=args.seconds_per_1k_tokens,
+                               defect_rate=args.defect_rate)
+    analysis.response_cache = None
+    latencies = []
+    tokens = 0
+    records = 0
+
+    async def timed(call, prompt_tokens):
+        nonlocal tokens
+        started = time.monotonic()
+        result = await call
+        latencies.append(time.monotonic() - started)
+        tokens += prompt_tokens + estimate_tokens(json.dumps(result))
+        return result
+
+    def on_result(item, result):
+        nonlocal records
+        records += len(result) if mode == "batched" else 1
+
+    if mode == "batched":
+        items = pack_batches(competitions, args.batch_tokens, size_of=lambda c: estimate_tokens(c["context"]), key_of=lambda c: c["name"])
+        analyze = lambda batch: timed(
+            analysis.analyze_competition_batch(batch),
+            estimate_tokens(analysis.BATCH_SYSTEM_PROMPT + "".join(c["context"] for c in batch)),
+        )
+    else:
+        items = competitions
+        analyze = lambda c: timed(
+            analysis.analyze_competition_context(c["context"], c["name"]),
+            estimate_tokens(analysis.SYSTEM_PROMPT + c["context"]),
+        )
+
+    engine = AnalysisEngine(analyze, concurrency=1 if mode == "serial" else args.concurrency,
+                            rate_limiter=RateLimiter(args.rpm, 0))
+    started = time.monotonic()
+    with contextlib.redirect_stdout(io.StringIO()):  # Keep per-call progress lines out of the report
+        failures = await engine.run(items, on_result=on_result)
+    elapsed = time.monotonic() - started
+
+    return {
+        "mode": mode,
+        "records": records,
+        "seconds": elapsed,
+        "records_per_second": records / elapsed if elapsed else 0.0,
+        "p50_latency": percentile(latencies, 0.5),
+        "p95_latency": percentile(latencies, 0.95),
+        "tokens_per_second": tokens / elapsed if elapsed else 0.0,
+        "calls": analysis.model.calls,
+        "failures": len(failures),
+    }
+
+
+def main(args):
+    competitions = load_workload(args.limit, args.context_tokens)
+    print(f"📊 Analysis benchmark: {len(competitions)} competitions from {WORKLOAD_FILE}")
+    print(f"   Stub model: {args.latency_min}–{args.latency_max}s latency + {args.seconds_per_1k_tokens}s per 1k prompt tokens, "
+          f"{args.rate_limit_error_rate:.0%} 429s, "
+          f"{args.error_rate:.0%} errors, seed {args.seed}. Concurrency {args.concurrency}, batches of ≤{args.batch_tokens:,} tokens.\n")
+
+    results = []
+    print(f"{'mode':<12}{'records':>8}{'wall s':>9}{'rec/s':>8}{'p50 s':>8}{'p95 s':>8}{'tok/s':>10}{'calls':>7}{'failed':>8}")
+    for mode in args.modes:
+        result = asyncio.run(run_mode(mode, competitions, args))
+        results.append(result)
+        print(f"{mode:<12}{result['records']:>8}{result['seconds']:>9.1f}{result['records_per_second']:>8.2f}"
+              f"{result['p50_latency']:>8.2f}{result['p95_latency']:>8.2f}{result['tokens_per_second']:>10,.0f}"
+              f"{result['calls']:>7}{result['failures']:>8}")
+
+    serial = next((result for result in results if result["mode"] == "serial"), None)
+    if serial and serial["records_per_second"]:
+        for result in results:
+            if result is not serial:
+                print(f"🚀 {result['mode']}: {result['records_per_second'] / serial['records_per_second']:.1f}x the serial throughput.")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"workload": WORKLOAD_FILE, "competitions": len(competitions), "settings": vars(args), "results": results}, f, indent=4)
+        print(f"✅ Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark analysis throughput against the local stub model (no API key or quota).")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES, help="Which analysis modes to run.")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="Number of competitions in the workload.")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Calls in flight for the concurrent and batched modes.")
+    parser.add_argument("--batch_tokens", type=int, default=DEFAULT_BATCH_TOKENS, help="Context tokens per request in batched mode.")
+    parser.add_argument("--context_tokens", type=int, default=DEFAULT_CONTEXT_TOKENS, help="Per-competition context budget. 0 sends contexts uncompressed.")
+    parser.add_argument("--latency_min", type=float, default=0.2, help="Shortest stub response time in seconds.")
+    parser.add_argument("--latency_max", type=float, default=0.6, help="Longest stub response time in seconds.")
+    parser.add_argument("--seconds_per_1k_tokens", type=float, default=0.05, help="Extra stub latency per 1,000 prompt tokens.")
+    parser.add_argument("--rate_limit_error_rate", type=float, default=0.0, help="Share of stub calls answered with a 429.")
+    parser.add_argument("--error_rate", type=float, default=0.0, help="Share of stub calls failing with a 500.")
+    parser.add_argument("--defect_rate", type=float, default=0.0, help="Share of single answers sent malformed (repaired locally or by a field retry).")
+    parser.add_argument("--rpm", type=int, default=UNLIMITED_RPM, help="Requests-per-minute limit to apply (default: effectively none).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for stub latencies and failures.")
+    parser.add_argument("--output", help="Also write the results as JSON to this file.")
+    main(parser.parse_args())
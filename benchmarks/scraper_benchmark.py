@@ -0,0 +1,193 @@
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import types
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+from fixture_server import FIXTURES_DIR, FixtureServer
+from platforms import load_script
+
+# --- Workload ---
+AICROWD_FIXTURES = os.path.join(FIXTURES_DIR, "aicrowd", "competitions.json")
+KAGGLE_FIXTURES = os.path.join(FIXTURES_DIR, "kaggle", "competitions.json")
+DEFAULT_ROUNDS = 20     # Each fixture competition is scraped this many times (as ?copy=N URLs)
+DEFAULT_KAGGLE_WORKERS = 2
+PLATFORMS = ["aicrowd", "kaggle"]
+CATEGORIES = ["fetch", "wait", "sleep", "parse", "clean"]
+
+
+class StageTimer:
+    """Adds up the seconds spent inside wrapped functions, per category, across threads."""
+
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def wrap(self, category, function):
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                with self.lock:
+                    self.seconds[category] += time.perf_counter() - started
+                    self.calls[category] += 1
+        return timed
+
+
+def write_workload(fixtures_file, rounds, path):
+    """Repeats the fixture competitions `rounds` times under distinct URLs (the server ignores the query)."""
+    with open(fixtures_file, "r", encoding="utf-8") as f:
+        competitions = json.load(f)
+    workload = [dict(competition, link=f"{competition['link']}?copy={copy}")
+                for copy in range(1, rounds + 1) for competition in competitions]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(workload, f)
+    return len(workload)
+
+
+def measure(run, verbose=False, memory=True):
+    """Runs `run()` and returns (seconds, peak traced memory in MB)."""
+    if memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        run()
+    elapsed = time.perf_counter() - started
+    peak = 0.0
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def bench_aicrowd(server, workdir, args):
+    """
+    Times aicrowd/get_comp_details.py over the fixture challenges: a first fetch, then a
+    recheck in which every page answers the conditional GET with 304 Not Modified.
+    fetch = HTTP requests, parse = lxml parsing and text extraction, clean = text cleaning.
+    """
+    module = load_script("aicrowd", "get_comp_details")
+    input_path = os.path.join(workdir, "aicrowd_input.json")
+    output_path = os.path.join(workdir, "aicrowd_output.json")
+    competitions = write_workload(AICROWD_FIXTURES, args.rounds, input_path)
+
+    timer = StageTimer()
+    create_http_session = module.create_http_session
+
+    def timed_session():
+        session = create_http_session()
+        session.get = timer.wrap("fetch", session.get)
+        return session
+
+    module.create_http_session = timed_session
+    module.BeautifulSoup = timer.wrap("parse", module.BeautifulSoup)
+    module.find_content_text = timer.wrap("parse", module.find_content_text)
+    module.clean_text_for_analysis = timer.wrap("clean", module.clean_text_for_analysis)
+
+    rows = []
+    for label in ["aicrowd", "aicrowd (recheck)"]:
+        timer.seconds.clear()
+        timer.calls.clear()
+        elapsed, peak = measure(lambda: module.main(base_url=server.url + "/aicrowd", input_path=input_path,
+                                                    output_path=output_path, metrics_path=None), args.verbose, not args.no_memory)
+        rows.append(report_row(label, competitions, timer.calls["fetch"], elapsed, peak, timer.seconds))
+    return rows
+
+
+def bench_kaggle(server, workdir, args):
+    """
+    Times kaggle/get_comp_details.py (the browser pool) over the fixture competitions.
+    fetch = page loads, wait = WebDriverWait, sleep = fixed sleeps, parse = the rest of each
+    scrape (reading and splitting tab text). Seconds are summed over all workers.
+    """
+    module = load_script("kaggle", "get_comp_details")
+    base_url = server.url + "/kaggle"
+    try:
+        module.create_driver(True, base_url).quit()
+    except Exception as e:
+        print(f"⚠️ Skipping Kaggle: could not start Chrome ({str(e).splitlines()[0] if str(e) else type(e).__name__}).")
+        return []
+
+    input_path = os.path.join(workdir, "kaggle_input.json")
+    output_path = os.path.join(workdir, "kaggle_output.json")
+    competitions = write_workload(KAGGLE_FIXTURES, args.rounds, input_path)
+
+    timer = StageTimer()
+    create_driver = module.create_driver
+
+    def timed_driver(*driver_args):
+        driver = create_driver(*driver_args)
+        driver.get = timer.wrap("fetch", driver.get)
+        return driver
+
+    class TimedWait(module.WebDriverWait):
+        until = timer.wrap("wait", module.WebDriverWait.until)
+
+    module.create_driver = timed_driver
+    module.WebDriverWait = TimedWait
+    module.time = types.SimpleNamespace(sleep=timer.wrap("sleep", time.sleep))
+    module.scrape_competition = timer.wrap("scrape", module.scrape_competition)
+
+    elapsed, peak = measure(lambda: module.main(args.kaggle_workers, True, competitions, base_url, input_path, output_path,
+                                                metrics_path=None),
+                            args.verbose, not args.no_memory)
+    seconds = dict(timer.seconds)
+    seconds["parse"] = max(0.0, seconds.pop("scrape", 0.0) - sum(seconds.get(name, 0.0) for name in ["fetch", "wait", "sleep"]))
+    pages = competitions * len(module.TABS_TO_SCRAPE)
+    return [report_row("kaggle", competitions, pages, elapsed, peak, seconds)]
+
+
+def report_row(label, competitions, pages, elapsed, peak, seconds):
+    row = {"platform": label, "competitions": competitions, "pages": pages, "seconds": elapsed,
+           "pages_per_second": pages / elapsed if elapsed else 0.0, "peak_memory_mb": peak}
+    row.update({f"{category}_seconds": seconds.get(category, 0.0) for category in CATEGORIES})
+    return row
+
+
+def main(args):
+    workdir = tempfile.mkdtemp(prefix="scraper_benchmark_")
+    rows = []
+    try:
+        with FixtureServer() as server:
+            print(f"📊 Scraper benchmark: fixture pages from {FIXTURES_DIR} served at {server.url}, {args.rounds} rounds.\n")
+            if "aicrowd" in args.platforms:
+                rows += bench_aicrowd(server, workdir, args)
+            if "kaggle" in args.platforms:
+                rows += bench_kaggle(server, workdir, args)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{'platform':<20}{'pages':>7}{'wall s':>9}{'pages/s':>9}" + "".join(f"{category + ' s':>9}" for category in CATEGORIES) + f"{'peak MB':>9}")
+    for row in rows:
+        print(f"{row['platform']:<20}{row['pages']:>7}{row['seconds']:>9.2f}{row['pages_per_second']:>9.1f}"
+              + "".join(f"{row[category + '_seconds']:>9.2f}" for category in CATEGORIES) + f"{row['peak_memory_mb']:>9.1f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"rounds": args.rounds, "results": rows}, f, indent=4)
+        print(f"✅ Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the detail scrapers against saved pages served locally.")
+    parser.add_argument("--platforms", nargs="+", choices=PLATFORMS, default=PLATFORMS, help="Which scrapers to run.")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="How many times each fixture competition is scraped.")
+    parser.add_argument("--kaggle_workers", type=int, default=DEFAULT_KAGGLE_WORKERS, help="Browser workers for the Kaggle scraper.")
+    parser.add_argument("--no_memory", action="store_true", help="Skip tracemalloc (its overhead inflates parse and clean times).")
+    parser.add_argument("--verbose", action="store_true", help="Show the scrapers' own progress output.")
+    parser.add_argument("--output", help="Also write the results as JSON to this file.")
+    main(parser.parse_args())
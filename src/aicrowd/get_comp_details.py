@@ -1,9 +1,12 @@
-import json
 import os
 import re
+import sys
 import time
-import unicodedata
 import argparse
+from urllib.parse import urljoin
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 from selenium import webdriver
 from selenium.common.exceptions import (NoSuchElementException, TimeoutException, StaleElementReferenceException)
 from selenium.webdriver.chrome.options import Options
@@ -12,93 +15,50 @@ from selenium.webdriver.common.by import By
 # Removed WebDriverWait imports - using direct element finding for speed
 from webdriver_manager.chrome import ChromeDriverManager
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fingerprints import (STALE_AFTER_DAYS, conditional_headers, is_stale, record_fetch,
+                          record_not_modified)
+from json_stream import RecordWriter, iter_records, load_records, write_records
+from metrics import recorder
+from platforms import PLATFORMS
+from text_cleaning import clean_text_for_analysis
+
 # --- 💡 Configuration ---
 # Set the number of competitions you want to process.
 # To process all, set this to a very large number (e.g., 9999).
 COMPETITIONS_TO_PROCESS = 9999  # Default to process all
 
+AICROWD_URL = "https://www.aicrowd.com"
+# Default paths come from the registry in platforms.py (repo-relative, like the pipeline uses).
+INPUT_PATH = PLATFORMS["aicrowd"].list_file
+OUTPUT_PATH = PLATFORMS["aicrowd"].details_file
+METRICS_PATH = PLATFORMS["aicrowd"].metrics_file
+
 # Tabs to scrape from AIcrowd competitions
 TABS_TO_SCRAPE = ["Overview", "Rules"]
 
-# --- Text Cleaning Functions ---
-def clean_text_for_analysis(text):
-    """
-    Comprehensive text cleaning to optimize for token length and analysis.
-    First extracts according to previous logic, then removes emojis/special chars, then applies >10 condition.
-    """
-    if not text:
-        return ""
-    
-    # Step 1: Apply previous extraction logic first
-    lines = text.split('\n')
-    filtered_lines = []
-    for line in lines:
-        line = line.strip()
-        # Keep lines that are not too short and don't look like UI elements (previous logic)
-        if (len(line) > 10 and 
-            not re.match(r'^(Home|Challenges|Leaderboard|Discussion|Insights|Rules|Overview)$', line) and
-            not re.match(r'^[0-9\s\-_|]+$', line) and  # Skip lines that are mostly numbers/symbols
-            not line.startswith('©') and  # Skip copyright notices
-            'cookie' not in line.lower() and  # Skip cookie notices
-            'privacy' not in line.lower()):  # Skip privacy notices
-            filtered_lines.append(line)
-    
-    # Step 2: Remove emojis and special Unicode characters from filtered content
-    cleaned_lines = []
-    for line in filtered_lines:
-        # Remove emojis and special Unicode characters
-        cleaned_line = unicodedata.normalize('NFKD', line)
-        cleaned_line = ''.join(c for c in cleaned_line if unicodedata.category(c) != 'So')
-        
-        # Apply line content cleaning (URLs, emails, excessive punctuation)
-        cleaned_line = clean_line_content(cleaned_line)
-        
-        # Step 3: Apply >10 character condition after all cleaning
-        if cleaned_line and len(cleaned_line.strip()) > 10:
-            cleaned_lines.append(cleaned_line.strip())
-    
-    # Remove excessive whitespace and normalize
-    result = '\n'.join(cleaned_lines)
-    result = re.sub(r'\s+', ' ', result)
-    result = re.sub(r'\n\s*\n', '\n', result)
-    
-    return result
+# Content areas to read, in priority order (optimized for AIcrowd structure)
+CONTENT_SELECTORS = [
+    "#description-wrapper .md-content",  # Main content area with markdown
+    ".challenge-description-md-content",  # Specific challenge description
+    "#description-wrapper",  # Description wrapper
+    "div[role='main']",
+    ".main-content",
+    "main"
+]
 
-def clean_line_content(line):
-    """
-    Clean individual line content by removing special characters and normalizing text.
-    """
-    # Remove URLs
-    line = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', line)
-    
-    # Remove email addresses
-    line = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '', line)
-    
-    # Remove dates (various formats)
-    line = re.sub(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b', '', line)  # MM/DD/YYYY, MM-DD-YYYY
-    line = re.sub(r'\b\d{4}[/-]\d{1,2}[/-]\d{1,2}\b', '', line)  # YYYY/MM/DD, YYYY-MM-DD
-    line = re.sub(r'\b\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{2,4}\b', '', line, flags=re.IGNORECASE)  # DD Mon YYYY
-    line = re.sub(r'\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2},?\s+\d{2,4}\b', '', line, flags=re.IGNORECASE)  # Mon DD, YYYY
-    line = re.sub(r'\b\d{1,2}:\d{2}(?::\d{2})?(?:\s*[AP]M)?\b', '', line, flags=re.IGNORECASE)  # Time formats
-    line = re.sub(r'\b(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{2,4}\b', '', line, flags=re.IGNORECASE)  # Full month names
-    line = re.sub(r'\b\d{4}\b', '', line)  # Years (4 digits)
-    
-    # Remove excessive punctuation (keep periods, commas, colons)
-    line = re.sub(r'[!]{2,}', '!', line)
-    line = re.sub(r'[?]{2,}', '?', line)
-    line = re.sub(r'[-]{3,}', '--', line)
-    line = re.sub(r'[_]{2,}', '_', line)
-    
-    # Remove bullet points and list markers
-    line = re.sub(r'^[\s]*[•·▪▫‣⁃]\s*', '', line)
-    line = re.sub(r'^[\s]*\d+[\.\)]\s*', '', line)
-    line = re.sub(r'^[\s]*[a-zA-Z][\.\)]\s*', '', line)
-    
-    # Normalize whitespace
-    line = re.sub(r'\s+', ' ', line)
-    line = line.strip()
-    
-    return line
+# Plain HTTP fetching (tried before starting a browser)
+HTTP_TIMEOUT = 15
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+}
+BLOCK_TAGS = ["p", "div", "section", "article", "li", "ul", "ol", "table", "tr", "pre", "blockquote",
+              "h1", "h2", "h3", "h4", "h5", "h6"]
+NOT_MODIFIED = "not modified"  # fetch_static() result for a 304 answer to a conditional GET
+
+def mirror_link(link, base_url=AICROWD_URL):
+    """Points an aicrowd.com link at a mirror, e.g. the local fixture server."""
+    return link if base_url == AICROWD_URL else link.replace(AICROWD_URL, base_url.rstrip("/"), 1)
 
 def deduplicate_urls(competitions):
     """
@@ -123,254 +83,406 @@ def deduplicate_urls(competitions):
     return unique_competitions
 
 # --- Script Setup ---
-options = Options()
-# options.add_argument("--headless")
-options.add_experimental_option("detach", True)
-options.add_argument("--disable-blink-features=AutomationControlled")
+# Chrome is only started the first time a page can't be read over plain HTTP.
+driver = None
+cookie_consent_handled = False
+
+def get_driver():
+    """
+    Returns the shared WebDriver, starting it on first use.
+    """
+    global driver
+    if driver is None:
+        options = Options()
+        # options.add_argument("--headless")
+        options.add_experimental_option("detach", True)
+        options.add_argument("--disable-blink-features=AutomationControlled")
+
+        # Try to use system Chrome driver first, then fall back to ChromeDriverManager
+        try:
+            driver = webdriver.Chrome(options=options)
+        except:
+            driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+        # Removed WebDriverWait - using direct element finding for speed
+        print("✅ WebDriver started successfully.")
+    return driver
+
+def quit_driver():
+    global driver
+    if driver is not None:
+        driver.quit()
+        driver = None
+
+def create_http_session():
+    """
+    A pooled HTTP session, so consecutive pages reuse the same connection to aicrowd.com.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=2)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(HTTP_HEADERS)
+    return session
+
+def extract_name(page_title, link):
+    """
+    Competition name from the page title, or from the URL when the title is generic.
+    """
+    if page_title and page_title.strip() != "AIcrowd":
+        # Extract just the middle part: "AIcrowd | Meta CRAG - MM Challenge 2025 | Challenges" -> "Meta CRAG - MM Challenge 2025"
+        name = page_title.strip()
+        # Remove prefix "AIcrowd |" if present
+        name = re.sub(r'^AIcrowd\s*\|\s*', '', name)
+        # Remove suffix "| Challenges" if present
+        name = re.sub(r'\s*\|\s*Challenges.*$', '', name)
+        name = name.strip()
+        if name:
+            return name
+    # Fallback: extract from URL
+    url_parts = link.split('/')
+    challenge_name = url_parts[-1] if url_parts[-1] else url_parts[-2]
+    return challenge_name.replace('-', ' ').title()
+
+def extract_block_text(element):
+    """
+    Approximates Selenium's rendered `.text` for parsed HTML: one line per block element,
+    with inline markup (links, emphasis, ...) kept on the same line.
+    """
+    for hidden in element.find_all(["script", "style", "noscript"]):
+        hidden.decompose()
+    for br in element.find_all("br"):
+        br.replace_with("\n")
+    for block in element.find_all(BLOCK_TAGS):
+        block.insert_before("\n")
+        block.insert_after("\n")
+    lines = (" ".join(line.split()) for line in element.get_text().split("\n"))
+    return "\n".join(line for line in lines if line)
+
+def find_content_text(soup):
+    for selector in CONTENT_SELECTORS:
+        content_area = soup.select_one(selector)
+        if content_area is not None:
+            return extract_block_text(content_area)
+    return ""
+
+def page_validators(response):
+    return {"url": response.url, "etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+
+def others_not_modified(session, link, pages):
+    """
+    True if every page of a previous fetch other than the Overview answers a conditional GET
+    with 304. A page stored without validators can't be checked, so it counts as changed.
+    """
+    for page, validators in pages.items():
+        if page == "overview":
+            continue
+        if not conditional_headers(validators):
+            return False
+        with recorder.span("fetch", link, tab=page.capitalize(), conditional=True) as span:
+            response = session.get(validators["url"], timeout=HTTP_TIMEOUT, headers=conditional_headers(validators))
+            span["status"] = response.status_code
+        if response.status_code != 304:
+            return False
+    return True
+
+def fetch_static(session, competition, fingerprint=None):
+    """
+    Reads a challenge with plain HTTP GETs and lxml parsing.
+    Returns (name, context_parts, pages), or None if the static HTML has no Overview content;
+    `pages` holds the validators of each page read (see fingerprints.record_fetch).
+    With the `fingerprint` of a previous fetch the GETs are conditional, and NOT_MODIFIED is
+    returned only if the server reports every page (Overview and Rules) unchanged.
+    """
+    link = competition['link']
+    pages = (fingerprint or {}).get("pages") or {}
+    with recorder.span("fetch", link, conditional=bool(pages)) as span:
+        response = session.get(link, timeout=HTTP_TIMEOUT, headers=conditional_headers(pages.get("overview")))
+        span["status"] = response.status_code
+    if response.status_code == 304:
+        if others_not_modified(session, link, pages):
+            return NOT_MODIFIED
+        # Another page changed: read them all again, the Overview included.
+        with recorder.span("fetch", link) as span:
+            response = session.get(link, timeout=HTTP_TIMEOUT)
+            span["status"] = response.status_code
+    response.raise_for_status()
+    pages = {"overview": page_validators(response)}
+    with recorder.span("parse", link):
+        soup = BeautifulSoup(response.content, "lxml")
+        name = extract_name(soup.title.get_text() if soup.title else "", link)
+        overview_raw = find_content_text(soup)
+    with recorder.span("clean", link):
+        overview_text = clean_text_for_analysis(overview_raw)
+    if not overview_text.strip():
+        return None
+    context_parts = [f"--- OVERVIEW ---\n{overview_text}"]
+
+    rules_link = soup.find("a", href=re.compile("challenge_rules")) or soup.find("a", string=re.compile("Rules"))
+    if rules_link is not None and rules_link.get("href"):
+        rules_url = urljoin(response.url, rules_link["href"])
+        pages["rules"] = {"url": rules_url}  # No validators until it is read, so a failed read is retried
+        try:
+            with recorder.span("fetch", link, tab="Rules"):
+                rules_response = session.get(rules_url, timeout=HTTP_TIMEOUT)
+            rules_response.raise_for_status()
+            pages["rules"] = page_validators(rules_response)
+            with recorder.span("parse", link, tab="Rules"):
+                rules_raw = find_content_text(BeautifulSoup(rules_response.content, "lxml"))
+            with recorder.span("clean", link, tab="Rules"):
+                rules_text = clean_text_for_analysis(rules_raw)
+            if rules_text.strip():
+                context_parts.append(f"--- RULES ---\n{rules_text}")
+        except requests.RequestException as e:
+            print(f"  - Could not fetch Rules page: {e}")
+    else:
+        print(f"  - Rules tab not found. Skipping Rules tab.")
+
+    return name, context_parts, pages
+
+def fetch_with_browser(competition, index):
+    """
+    Reads a challenge by driving Chrome, for pages whose Overview is rendered client-side.
+    Returns (name, context_parts, overview_found). Raises if the page can't be opened.
+    """
+    global cookie_consent_handled
+    driver = get_driver()
+    with recorder.span("fetch", competition['link'], browser=True):
+        driver.get(competition['link'])
+
+    # Handle cookie consent only once per browser session
+    if not cookie_consent_handled:
+        try:
+            cookie_button = driver.find_element(By.XPATH, "//button[@class='btn btn-primary btn-sm cookies-set-accept' and text()='Accept']")
+            driver.execute_script("arguments[0].click();", cookie_button)
+            print("  ✅ Cookie consent accepted.")
+        except NoSuchElementException:
+            print("  ⚠️ Cookie consent button not found or already handled.")
+        cookie_consent_handled = True
+
+    # Extract competition name from URL or page title
+    try:
+        name = extract_name(driver.title, competition['link'])
+    except Exception as e:
+        print(f"  ⚠️ Could not extract name: {e}")
+        name = f"Unknown Competition {index + 1}"
+
+    context_parts = []
+    overview_found = False
+
+    for tab_name in TABS_TO_SCRAPE:
+        try:
+            # Simple tab selection for Overview and Rules tabs
+            if tab_name == "Overview":
+                # Overview tab is usually the default/active tab
+                tab_element = driver.find_element(By.XPATH, "//a[contains(@href, 'overview') or contains(@class, 'active')]")
+            elif tab_name == "Rules":
+                # Rules tab selector - skip if not found
+                try:
+                    tab_element = driver.find_element(By.XPATH, "//a[contains(@href, 'challenge_rules') or contains(text(), 'Rules')]")
+                except NoSuchElementException:
+                    print(f"  - Rules tab not found. Skipping Rules tab.")
+                    continue
+
+            if tab_element is None:
+                print(f"  - Could not find '{tab_name}' tab. Skipping.")
+                continue
+
+            # Click the tab
+            driver.execute_script("arguments[0].click();", tab_element)
+            print(f"  - Clicked '{tab_name}' tab.")
+
+            # Try multiple selectors for content area
+            content_area = None
+            for selector in CONTENT_SELECTORS:
+                try:
+                    content_area = driver.find_element(By.CSS_SELECTOR, selector)
+                    break
+                except NoSuchElementException:
+                    continue
+
+            if content_area is None:
+                # Fallback: get body content
+                content_area = driver.find_element(By.TAG_NAME, "body")
+                print(f"  - Using body content as fallback for '{tab_name}'.")
+            else:
+                print(f"  - Found content area for '{tab_name}'.")
+
+            # Get the text content
+            with recorder.span("parse", competition['link'], tab=tab_name, browser=True):
+                full_text = content_area.text
+
+            # Apply comprehensive text cleaning for analysis optimization
+            with recorder.span("clean", competition['link'], tab=tab_name, browser=True):
+                processed_text = clean_text_for_analysis(full_text)
+
+            if processed_text.strip():
+                context_parts.append(f"--- {tab_name.upper()} ---\n{processed_text}")
+                print(f"  - Captured and filtered content for '{tab_name}'.")
+                if tab_name == "Overview":
+                    overview_found = True
+            else:
+                print(f"  - No meaningful content found for '{tab_name}'.")
+                if tab_name == "Overview":
+                    overview_found = False
+
+        except NoSuchElementException:
+            print(f"  - Could not find tab or content for '{tab_name}'. Skipping.")
+        except Exception as e:
+            print(f"  - An error occurred on tab '{tab_name}': {e}")
+
+    return name, context_parts, overview_found
 
-try:
-    # Try to use system Chrome driver first, then fall back to ChromeDriverManager
+def scrape_competition(session, competition, index, total=None, refresh=False, stale_after_days=STALE_AFTER_DAYS):
+    """
+    Scrapes one competition record in place. Returns (competition, changed), where
+    competition is None if it has to be dropped (link failed or no Overview content).
+    """
+    progress = f"{index + 1}/{total}" if total else f"{index + 1}"
+    if refresh and not is_stale(competition, stale_after_days):
+        print(f"({progress}) ♻️ '{competition.get('name') or competition['link']}' is still fresh. Keeping it.")
+        return competition, False
+
+    previous_context = competition.pop("context", None)
+    previous_name = competition.pop("name", None)
+
+    print(f"({progress}) Scraping '{competition['link']}'...")
+
+    # Fast path: plain HTTP + lxml. Only start Chrome when the Overview isn't in the static HTML.
+    # Pages scraped before are requested conditionally, so unchanged ones cost a single 304.
+    fetched = None
     try:
-        driver = webdriver.Chrome(options=options)
-    except:
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    # Removed WebDriverWait - using direct element finding for speed
-    print("✅ WebDriver started successfully.")
-except Exception as e:
-    print(f"❌ Failed to start WebDriver: {e}")
-    exit()
-
-# --- Cookie consent will be handled on each individual page ---
-
-def main(start_index=None, limit=None):
+        fingerprint = competition.get("fingerprint") if previous_context else None
+        fetched = fetch_static(session, competition, fingerprint)
+    except requests.RequestException as e:
+        print(f"  ⚠️ HTTP fetch failed ({e}).")
+
+    pages = {}
+    if fetched == NOT_MODIFIED:
+        competition['name'] = previous_name
+        competition['context'] = previous_context
+        record_not_modified(competition)
+        print(f"  ♻️ Not modified since the last fetch. Keeping previous content.")
+        return competition, False
+    elif fetched is not None:
+        name, context_parts, pages = fetched
+        overview_found = True
+        print(f"  ⚡ Captured content from static HTML.")
+    else:
+        print(f"  - No Overview in static HTML. Falling back to the browser.")
+        try:
+            name, context_parts, overview_found = fetch_with_browser(competition, index)
+        except Exception as e:
+            print(f"  ❌ Failed to open link: {competition['link']}. Error: {e}")
+            return None, False
+    competition['name'] = name
+
+    # Check if Overview has content - if not, skip this competition
+    if not overview_found:
+        print(f"  ❌ No Overview content found. Skipping this competition.")
+        return None, False
+
+    changed = record_fetch(competition, "\n\n".join(context_parts), pages)
+    if not changed:
+        print(f"  ♻️ Content unchanged since the last fetch.")
+    return competition, changed
+
+def main(start_index=None, limit=None, refresh=False, stale_after_days=STALE_AFTER_DAYS, base_url=AICROWD_URL,
+         input_path=INPUT_PATH, output_path=OUTPUT_PATH, metrics_path=METRICS_PATH):
     # --- Load and Slice the Data ---
-    input_path = "/Users/manikeshmakam/Endgame 2.0/ethicalAI/data/aicrowd/inputs/extracted_urls.json"
-    output_path = "/Users/manikeshmakam/Endgame 2.0/ethicalAI/data/aicrowd/inputs/aicrowd_competitions_final.json"
 
     # Check if output file exists first
     output_exists = os.path.exists(output_path)
     
     if output_exists:
-        # Load existing output file - no need to process input data
+        # Count the existing records - they are streamed from disk one at a time below
         try:
-            with open(output_path, "r", encoding="utf-8") as f:
-                existing_competitions = json.load(f)
-            print(f"✅ Loaded existing output file with {len(existing_competitions)} competitions")
-            competitions = existing_competitions  # Use existing data for reference
-        except:
-            existing_competitions = []
+            total_existing = sum(1 for _ in iter_records(output_path))
+            print(f"✅ Loaded existing output file with {total_existing} competitions")
+        except ValueError:
             print("⚠️ Could not load existing output file, starting fresh")
             output_exists = False
     
     if not output_exists:
         # Only process input data if output file doesn't exist
         try:
-            with open(input_path, "r", encoding="utf-8") as f:
-                competitions = json.load(f)
+            competitions = load_records(input_path)
             print(f"✅ Successfully loaded {len(competitions)} total competitions from {input_path}")
 
             # Deduplicate URLs
             competitions = deduplicate_urls(competitions)
             
             # Create new output file with unique URLs structure - pre-populate with all URLs
-            existing_competitions = []
-            for comp in competitions:
-                existing_competitions.append({
-                    "link": comp.get("link", ""), 
-                    "name": "", 
-                    "context": ""
-                })
             print("📝 Creating new output file with unique URLs pre-populated")
-            
-            # Save the initial structure with URLs
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(existing_competitions, f, indent=4, ensure_ascii=False)
+            total_existing = write_records(output_path, (
+                {"link": mirror_link(comp.get("link", ""), base_url), "name": "", "context": ""} for comp in competitions
+            ))
             print("✅ Initial file structure saved with all URLs")
         except FileNotFoundError:
             print(f"❌ Error: The file {input_path} was not found.")
-            driver.quit()
+            quit_driver()
             return
 
     # Handle single index mode
     if start_index is not None:
-        if start_index < 1 or start_index > len(competitions):
-            print(f"❌ Error: start_index {start_index} is out of range. Valid range: 1-{len(competitions)}")
-            driver.quit()
+        if start_index < 1 or start_index > total_existing:
+            print(f"❌ Error: start_index {start_index} is out of range. Valid range: 1-{total_existing}")
+            quit_driver()
             return
         
         # Process only the specified index (convert from 1-based to 0-based)
         target_index = start_index - 1
-        competitions_to_process = [competitions[target_index]]
         print(f"✅ Processing single competition at index {start_index} (0-based: {target_index})")
     else:
         # Process all competitions
-        competitions_to_process = competitions
-        print(f"✅ Processing all {len(competitions)} competitions.")
+        print(f"✅ Processing all {total_existing} competitions.")
 
     print(f"Output will be written to {output_path}")
 
     # --- Main Scraping Loop ---
-    total_competitions = len(competitions_to_process)
-    processed_competitions = []
-    
-    for index, competition in enumerate(competitions_to_process):
-        competition.pop("context", None)
-        competition.pop("name", None)
+    recorder.open(metrics_path)
+    session = create_http_session()
+    processed_count = 0
+    changed_count = 0
 
-        print(f"({index + 1}/{total_competitions}) Scraping '{competition['link']}'...")
-        
-        try:
-            driver.get(competition['link'])
-            
-            # Handle cookie consent only for the first competition (index 0)
-            if index == 0:
-                try:
-                    cookie_button = driver.find_element(By.XPATH, "//button[@class='btn btn-primary btn-sm cookies-set-accept' and text()='Accept']")
-                    driver.execute_script("arguments[0].click();", cookie_button)
-                    print("  ✅ Cookie consent accepted (first competition).")
-                except NoSuchElementException:
-                    print("  ⚠️ Cookie consent button not found or already handled.")
-            else:
-                print("  ⚡ Skipping cookie consent (already handled in first competition).")
-                
-        except Exception as e:
-            print(f"  ❌ Failed to open link: {competition['link']}. Error: {e}")
-            competition['context'] = f"Error: Failed to open link - {e}"
-            continue
-
-        # Extract competition name from URL or page title
-        try:
-            # Try to get name from page title first
-            page_title = driver.title
-            if page_title and page_title != "AIcrowd":
-                # Extract just the middle part: "AIcrowd | Meta CRAG - MM Challenge 2025 | Challenges" -> "Meta CRAG - MM Challenge 2025"
-                name = page_title.strip()
-                # Remove prefix "AIcrowd |" if present
-                name = re.sub(r'^AIcrowd\s*\|\s*', '', name)
-                # Remove suffix "| Challenges" if present
-                name = re.sub(r'\s*\|\s*Challenges.*$', '', name)
-                name = name.strip()
-                if name:
-                    competition['name'] = name
-            else:
-                # Fallback: extract from URL
-                url_parts = competition['link'].split('/')
-                challenge_name = url_parts[-1] if url_parts[-1] else url_parts[-2]
-                competition['name'] = challenge_name.replace('-', ' ').title()
-        except Exception as e:
-            print(f"  ⚠️ Could not extract name: {e}")
-            competition['name'] = f"Unknown Competition {index + 1}"
-
-        context_parts = []
-        overview_found = False
-        
-        for tab_name in TABS_TO_SCRAPE:
+    if start_index is not None:
+        # Single index mode: update the specific index in existing data
+        competitions = load_records(output_path)
+        scraped, changed = scrape_competition(session, competitions[target_index], 0, 1, refresh, stale_after_days)
+        if scraped is not None:
+            processed_count = 1
+            changed_count += changed
+            write_records(output_path, competitions)
+            print(f"\n✅ Progress saved! Processed {processed_count} valid competitions.\n")
+    else:
+        # Full mode: stream the existing records and write each valid one as soon as it is done.
+        # The new file replaces the old one at the end; if the run is interrupted, the
+        # competitions not reached yet are copied over unchanged.
+        with RecordWriter(output_path, keep_partial=True) as writer:
+            records = iter_records(output_path)
+            current = None
             try:
-                # Simple tab selection for Overview and Rules tabs
-                if tab_name == "Overview":
-                    # Overview tab is usually the default/active tab
-                    tab_element = driver.find_element(By.XPATH, "//a[contains(@href, 'overview') or contains(@class, 'active')]")
-                elif tab_name == "Rules":
-                    # Rules tab selector - skip if not found
-                    try:
-                        tab_element = driver.find_element(By.XPATH, "//a[contains(@href, 'challenge_rules') or contains(text(), 'Rules')]")
-                    except NoSuchElementException:
-                        print(f"  - Rules tab not found. Skipping Rules tab.")
-                        continue
-                
-                if tab_element is None:
-                    print(f"  - Could not find '{tab_name}' tab. Skipping.")
-                    continue
-                
-                # Click the tab
-                driver.execute_script("arguments[0].click();", tab_element)
-                print(f"  - Clicked '{tab_name}' tab.")
-                
-                # Try multiple selectors for content area (optimized for AIcrowd structure)
-                content_selectors = [
-                    "#description-wrapper .md-content",  # Main content area with markdown
-                    ".challenge-description-md-content",  # Specific challenge description
-                    "#description-wrapper",  # Description wrapper
-                    "div[role='main']",
-                    ".main-content",
-                    "main"
-                ]
-                
-                content_area = None
-                for selector in content_selectors:
-                    try:
-                        content_area = driver.find_element(By.CSS_SELECTOR, selector)
-                        break
-                    except NoSuchElementException:
-                        continue
-                
-                if content_area is None:
-                    # Fallback: get body content
-                    content_area = driver.find_element(By.TAG_NAME, "body")
-                    print(f"  - Using body content as fallback for '{tab_name}'.")
-                else:
-                    print(f"  - Found content area for '{tab_name}'.")
-                
-                # Get the text content
-                full_text = content_area.text
-                
-                # Apply comprehensive text cleaning for analysis optimization
-                processed_text = clean_text_for_analysis(full_text)
-                
-                if processed_text.strip():
-                    context_parts.append(f"--- {tab_name.upper()} ---\n{processed_text}")
-                    print(f"  - Captured and filtered content for '{tab_name}'.")
-                    if tab_name == "Overview":
-                        overview_found = True
-                else:
-                    print(f"  - No meaningful content found for '{tab_name}'.")
-                    if tab_name == "Overview":
-                        overview_found = False
-
-            except NoSuchElementException:
-                print(f"  - Could not find tab or content for '{tab_name}'. Skipping.")
-            except Exception as e:
-                print(f"  - An error occurred on tab '{tab_name}': {e}")
-
-        # Check if Overview has content - if not, skip this competition
-        if not overview_found:
-            print(f"  ❌ No Overview content found. Skipping this competition.")
-            continue
-        
-        competition['context'] = "\n\n".join(context_parts)
-        processed_competitions.append(competition)
-
-        # Save progress every 10 competitions or after each competition in single index mode
-        if (index + 1) % 10 == 0 or (index + 1) == total_competitions or start_index is not None:
-            if start_index is not None:
-                # Single index mode: update the specific index in existing data
-                target_index = start_index - 1
-                if target_index < len(existing_competitions):
-                    existing_competitions[target_index] = competition
-                else:
-                    # Extend the list if needed with original URLs
-                    while len(existing_competitions) < target_index:
-                        original_index = len(existing_competitions)
-                        original_competition = competitions[original_index] if original_index < len(competitions) else {"link": ""}
-                        existing_competitions.append({
-                            "link": original_competition.get("link", ""), 
-                            "name": "", 
-                            "context": ""
-                        })
-                    existing_competitions.append(competition)
-                final_output = existing_competitions
-            else:
-                # Full mode: save all processed competitions
-                final_output = processed_competitions
-            
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(final_output, f, indent=4, ensure_ascii=False)
-            print(f"\n✅ Progress saved! Processed {len(processed_competitions)} valid competitions.\n")
+                for index, competition in enumerate(records):
+                    current = competition
+                    scraped, changed = scrape_competition(session, dict(competition), index, total_existing,
+                                                          refresh, stale_after_days)
+                    current = None
+                    changed_count += changed
+                    if scraped is not None:
+                        writer.write(scraped)
+                        processed_count += 1
+                        if processed_count % 10 == 0:
+                            print(f"\n✅ Progress: processed {processed_count} valid competitions.\n")
+            finally:
+                if current is not None:
+                    writer.write(current)
+                writer.write_all(records)
 
-    print(f"\n🎉 Scraping complete! Processed {len(processed_competitions)} valid competitions.")
+    print(f"\n🎉 Scraping complete! Processed {processed_count} valid competitions, {changed_count} with new or changed content.")
     print(f"Updated data saved to: {output_path}")
+    recorder.print_summary()
+    recorder.close()
 
-    driver.quit()
+    quit_driver()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Scrape AIcrowd competitions with enhanced error handling.")
@@ -379,6 +491,26 @@ if __name__ == "__main__":
         type=int,
         help="Process only a specific competition index (1-based). If not provided, processes all competitions."
     )
+    parser.add_argument(
+        "--base_url",
+        default=AICROWD_URL,
+        help="Scrape a mirror instead of aicrowd.com, e.g. the fixture server (python src/fixture_server.py) at http://127.0.0.1:8000/aicrowd."
+    )
+    parser.add_argument("--input", default=INPUT_PATH, help="Challenge URL list to read.")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="Where to write competitions with their context.")
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Only re-fetch competitions that are stale; the rest keep their previous content."
+    )
+    parser.add_argument(
+        "--stale_after_days",
+        type=int,
+        default=STALE_AFTER_DAYS,
+        help="With --refresh, re-fetch settled competitions fetched longer ago than this (active ones: daily)."
+    )
+    parser.add_argument("--metrics", default=METRICS_PATH, help="JSONL file the per-competition timing spans are appended to.")
     args = parser.parse_args()
     
-    main(start_index=args.index)
+    main(start_index=args.index, refresh=args.refresh, stale_after_days=args.stale_after_days, base_url=args.base_url,
+         input_path=args.input, output_path=args.output, metrics_path=args.metrics)
@@ -0,0 +1,661 @@
+import asyncio
+import json
+import os
+import random
+
+from analysis_engine import AnalysisEngine, DEFAULT_CONCURRENCY, estimate_tokens
+from batching import BATCH_RULES, build_batch_prompt, normalize_name, pack_batches, parse_batch_response
+from boilerplate import BoilerplateDetector
+from context_compressor import DEFAULT_CONTEXT_TOKENS, compress_context
+from definitions import CURRENT_VERSIONS, build_partial_system_prompt, changed_fields, keys_of
+from fingerprints import context_hash_of
+from json_stream import iter_records
+from json_to_parquet import pa, write_parquet
+from metrics import recorder
+from model_backends import BACKENDS, MissingAPIKey, create_model
+from near_duplicates import build_index, pick_representatives
+from platforms import PARQUET_DIR
+from preclassifier import agreement, past_pairs, preclassify, print_agreement
+from prompts import SYSTEM_PROMPT
+from rate_limiter import (AdaptiveRateLimiter, RateLimiter, DEFAULT_MAX_REQUESTS_PER_MINUTE,
+                          DEFAULT_REQUESTS_PER_MINUTE, DEFAULT_TOKENS_PER_MINUTE)
+from response_cache import ResponseCache, cache_key
+from response_schema import (DEFAULTS, SCHEMA_KEYS, SchemaError, build_field_retry_prompt, merge_field_retry, parse_analysis,
+                             validate_analysis)
+from result_store import ResultStore, RetryQueue
+
+# --- Configuration ---
+MODEL_NAME = "gemini-2.5-pro"
+
+# Used when several competitions are packed into one request (--batch_tokens).
+BATCH_SYSTEM_PROMPT = SYSTEM_PROMPT + BATCH_RULES
+
+# Created by configure_model(), so the scrapers and the pipeline can import this module without an API key.
+model = None
+# Identifies the backend in cache keys, so stub answers never stand in for Gemini's.
+model_id = MODEL_NAME
+
+# Set by AnalysisRun.open(); unchanged (model, prompt, context) requests are answered from disk.
+response_cache = None
+
+
+# --- Model Setup ---
+def configure_model(backend="gemini"):
+    """
+    Creates the model for `backend` (see model_backends.BACKENDS). Returns it, or None
+    (after printing why) if it can't be set up.
+    """
+    global model, model_id
+    try:
+        model = create_model(backend, MODEL_NAME)
+    except MissingAPIKey:
+        print("❌ ERROR: GOOGLE_API_KEY environment variable not found.")
+        print("Please set the key using: export GOOGLE_API_KEY='your_key'")
+        print("(Or try the pipeline without quota using --backend stub.)")
+        return None
+    except ImportError as e:
+        print(f"❌ ERROR: {e}")
+        return None
+    model_id = MODEL_NAME if backend == "gemini" else f"{backend}:{MODEL_NAME}"
+    if backend == "gemini":
+        print("✅ Gemini API configured successfully.")
+    else:
+        print(f"🧪 Using the local '{backend}' model backend; answers are fake.")
+    return model
+
+async def analyze_competition_context(context, competition_name, decided=None, system_prompt=SYSTEM_PROMPT):
+    """
+    Sends the competition context to the Gemini API and returns the structured analysis.
+    The answer is repaired and validated locally (response_schema); if some fields are
+    still invalid, only those are asked for again. Errors are raised to the caller, which
+    decides whether to back off and retry the whole call.
+    Keys in `decided` (from preclassifier.py, or kept from an earlier record) are not asked
+    for; they go into the result as-is. `system_prompt` may be reduced to the other fields.
+    """
+    if decided and all(key in decided for key in SCHEMA_KEYS):
+        analysis_data, invalid = validate_analysis(decided)
+        if not invalid:
+            print(f"  - Every field of '{competition_name}' is already settled; no call needed.")
+            return analysis_data
+    print(f"  - Sending '{competition_name}' to Gemini API for analysis...")
+    prompt = build_prompt(context, competition_name, decided)
+    with recorder.span("prompt", competition_name) as span:
+        response = await model.generate_content_async([system_prompt, prompt])
+        span.update(token_counts(system_prompt + prompt, response))
+    with recorder.span("parse_response", competition_name):
+        analysis_data, invalid = parse_analysis(response.text, decided)
+
+    if invalid:
+        print(f"  - ⚠️ Invalid fields {', '.join(invalid)}; asking for just those again...")
+        recorder.count("field_retries")
+        retry_prompt, keys = build_field_retry_prompt(context, competition_name, analysis_data, invalid)
+        with recorder.span("field_retry", competition_name, fields=len(keys)) as span:
+            response = await model.generate_content_async([system_prompt, retry_prompt])
+            span.update(token_counts(system_prompt + retry_prompt, response))
+        analysis_data, invalid = merge_field_retry(analysis_data, keys, response.text)
+        if invalid:
+            raise SchemaError(f"Fields still invalid after a targeted retry: {', '.join(invalid)}")
+
+    # Only cache answers that validated, so a bad answer is retried on the next run.
+    if response_cache is not None:
+        response_cache.put(cache_key(model_id, system_prompt, prompt), json.dumps(analysis_data, ensure_ascii=False))
+    return analysis_data
+
+async def analyze_competition_batch(competitions):
+    """
+    Sends several competitions in one request and returns {competition_name: analysis}
+    for every item that came back valid. Missing items are left to the caller.
+    """
+    names = [competition['name'] for competition in competitions]
+    print(f"  - Sending a batch of {len(names)} competitions to Gemini API for analysis...")
+    prompt = build_batch_prompt([(competition['name'], competition.get("context", "")) for competition in competitions])
+    with recorder.span("prompt", batch_size=len(names)) as span:
+        response = await model.generate_content_async([BATCH_SYSTEM_PROMPT, prompt])
+        span.update(token_counts(BATCH_SYSTEM_PROMPT + prompt, response))
+    with recorder.span("parse_response", batch_size=len(names)):
+        analyses, missing = parse_batch_response(response.text, names)
+    if missing:
+        print(f"  - ⚠️ Batch answer is missing {len(missing)} of {len(names)} competitions.")
+    # Cache per competition, so later runs hit regardless of how batches are packed.
+    if response_cache is not None:
+        for competition in competitions:
+            if competition['name'] in analyses:
+                key = cache_key(model_id, BATCH_SYSTEM_PROMPT, build_prompt(competition.get("context", ""), competition['name']))
+                response_cache.put(key, json.dumps(analyses[competition['name']], ensure_ascii=False))
+    return analyses
+
+def token_counts(prompt_text, response):
+    """
+    Prompt/response token counts for a metrics span: Gemini's usage metadata when the
+    response has it, otherwise the same ~4 characters per token estimate as the quota.
+    """
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None and getattr(usage, "prompt_token_count", None):
+        return {"prompt_tokens": usage.prompt_token_count, "response_tokens": usage.candidates_token_count or 0}
+    return {"prompt_tokens": estimate_tokens(prompt_text), "response_tokens": estimate_tokens(response.text)}
+
+def build_prompt(context, competition_name, decided=None):
+    prompt = f"Here is the context for the competition '{competition_name}':\n\n{context}"
+    if decided:
+        remaining = [key for key in SCHEMA_KEYS if key not in decided]
+        prompt += (f"\n\nThe keys {', '.join(decided)} are already settled. "
+                   f"Answer with a single JSON object containing ONLY the keys {', '.join(remaining)}.")
+    return prompt
+
+def lookup_cached_analysis(context, competition_name, system_prompt=SYSTEM_PROMPT, decided=None):
+    """
+    Returns the cached analysis for this exact request, or None if it was never answered.
+    """
+    if response_cache is None:
+        return None
+    cached = response_cache.get(cache_key(model_id, system_prompt, build_prompt(context, competition_name, decided)))
+    if cached is not None:
+        try:
+            analysis_data, invalid = parse_analysis(cached, decided)
+        except SchemaError:
+            invalid = True
+        if not invalid:
+            recorder.count("cache_hits")
+            return analysis_data
+    recorder.count("cache_misses")
+    return None
+
+def build_structured_record(competition, analysis_data):
+    """
+    Builds the output record from a validated analysis (see response_schema.SCHEMA_KEYS).
+    `definitions` records which prompt definition versions the fields were analyzed with,
+    `model` which model (and backend) answered.
+    """
+    record = {
+        "name": competition.get("name"),
+        "url": competition.get("link"),
+        "context_hash": competition.get("context_hash"),
+        "model": model_id,
+    }
+    record.update({key: analysis_data.get(key, default) for key, default in DEFAULTS.items()})
+    record["definitions"] = CURRENT_VERSIONS
+    return record
+
+
+class AnalysisRun:
+    """
+    One analysis pass for a platform: resume state, retry queue, response cache, the shared
+    rate limit and the result callbacks. Competitions are (index, competition) entries, read
+    from the scraped file by main() or handed over by the scraper as it goes (src/main.py).
+    """
+
+    def __init__(self, platform, fresh=False, concurrency=DEFAULT_CONCURRENCY,
+                 requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE,
+                 use_cache=True, context_tokens=DEFAULT_CONTEXT_TOKENS, parquet=False, backend="gemini",
+                 adaptive=True, max_requests_per_minute=DEFAULT_MAX_REQUESTS_PER_MINUTE, local_rules=False):
+        self.platform = platform
+        self.local_rules = local_rules
+        self.local_decisions = {}  # link -> fields preclassify() settled for it
+        self.stale_fields = {}  # link -> fields whose definition changed since its record was written
+        self.previous_records = {}  # link -> that record, whose other fields are kept
+        self.derived = {}  # link -> (representative link, similarity) for near-duplicates
+        self.deferred = []  # Entries that take their representative's result after the run
+        self.backend = backend
+        self.fresh = fresh
+        self.concurrency = concurrency
+        self.use_cache = use_cache
+        self.context_tokens = context_tokens
+        self.parquet = parquet
+        # Other backends' fake answers get their own outputs, so they never pass for Gemini's.
+        self.results_file = platform.results_file_for(backend)
+        self.csv_file = os.path.splitext(self.results_file)[0] + ".csv"
+        self.parquet_dir = PARQUET_DIR if backend == "gemini" else f"{PARQUET_DIR}_{backend}"
+        self.store = ResultStore(self.results_file)
+        self.retry_queue = RetryQueue(self.results_file)
+        # Calls run concurrently under a shared requests/tokens-per-minute budget; 429s trigger backoff.
+        # The adaptive limiter treats `requests_per_minute` as a starting point and learns the real limit.
+        if adaptive:
+            self.rate_limiter = AdaptiveRateLimiter(requests_per_minute, tokens_per_minute,
+                                                    max_requests_per_minute, max_concurrency=concurrency)
+        else:
+            self.rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.total = None  # Number of competitions, when known up front (for progress lines)
+        self.processed = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    def open(self):
+        """Sets up the model, the resume state and the response cache. Returns False if there is no model."""
+        global response_cache
+        if configure_model(self.backend) is None:
+            return False
+        output_file = self.results_file
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+
+        # --- Handle Overwrite vs. Resume Logic ---
+        # Records are appended to a JSONL log as they finish; the JSON output is rebuilt from it at the end.
+        if self.fresh:
+            # OVERWRITE MODE: Start with an empty log and forget earlier failures.
+            self.store.reset()
+            self.retry_queue.reset()
+            print(f"✅ Starting a new analysis session. '{output_file}' will be overwritten upon completion.")
+        else:
+            # RESUME MODE: Index every finished competition by URL, whatever order it ran in.
+            if self.store.exists():
+                self.store.load()
+            elif os.path.exists(output_file):
+                self.store.seed_from_json()
+            else:
+                self.store.reset()
+            self.retry_queue.load()
+            print(f"✅ Loaded {len(self.store.completed_urls)} previously analyzed competitions and {len(self.retry_queue.entries)} queued retries.")
+            self.find_stale_fields()
+
+        if self.use_cache:
+            response_cache = ResponseCache(self.platform.cache_file)
+        if isinstance(self.rate_limiter, AdaptiveRateLimiter):
+            if self.rate_limiter.restore(self.platform.rate_state_file, model_id):
+                print(f"🎚️ Starting at the learned rate: {self.rate_limiter.rate:.0f} requests/min, "
+                      f"{self.rate_limiter.window} calls in flight.")
+        real_results = self.platform.results_file
+        if self.local_rules and os.path.exists(self.platform.details_file) and os.path.exists(real_results):
+            # How often the keyword rules matched the model's earlier answers, to judge how far to trust them.
+            print("📏 Local rules vs. earlier model answers:")
+            print_agreement(agreement(past_pairs(self.platform.details_file, real_results)))
+        return True
+
+    def find_stale_fields(self):
+        """
+        Finds records analyzed with older versions of some definitions in prompts.py. Only
+        those fields are asked for again; the record's other fields are kept.
+        """
+        for url, versions in self.store.definitions.items():
+            fields = changed_fields(versions, CURRENT_VERSIONS)
+            if fields:
+                self.stale_fields[url] = fields
+        if not self.stale_fields:
+            return
+        for record in self.store.iter_latest_records():
+            if record.get("url") in self.stale_fields:
+                self.previous_records[record.get("url")] = record
+        counts = {}
+        for fields in self.stale_fields.values():
+            for field in fields:
+                counts[field] = counts.get(field, 0) + 1
+        print(f"🧩 Definitions changed since {len(self.stale_fields)} records were analyzed: "
+              f"{', '.join(f'{field} ({count})' for field, count in counts.items())}. Only those fields will be asked for again.")
+
+    def needs_analysis(self, competition):
+        """
+        True unless this competition was analyzed before with the same scraped context and
+        the current definitions. Sets its context_hash, which goes into the output record.
+        """
+        competition["context_hash"] = context_hash_of(competition)
+        link = competition.get("link")
+        if self.store.is_done(link, competition["context_hash"], model_id):
+            return link in self.stale_fields
+        self.stale_fields.pop(link, None)  # New content: every field is analyzed again
+        return True
+
+    def defer_near_duplicates(self, pending, competitions, boilerplate=None):
+        """
+        Groups `competitions` (the whole scraped file) by near-duplicate context and removes
+        from `pending` every competition that is close enough to a representative (see
+        near_duplicates.pick_representatives). Those get its result in propagate_near_duplicates().
+        """
+        index = build_index(competitions, boilerplate=boilerplate)
+        self.derived = pick_representatives(index, prefer=lambda link: self.store.is_done(link, model=model_id))
+        self.deferred = [entry for entry in pending if entry[1].get("link") in self.derived]
+        if self.deferred:
+            representatives = {self.derived[entry[1].get("link")][0] for entry in self.deferred}
+            print(f"🧬 {len(representatives)} near-duplicate groups: {len(self.deferred)} competitions will reuse "
+                  f"their representative's analysis instead of being sent to the model.")
+        return [entry for entry in pending if entry[1].get("link") not in self.derived]
+
+    def propagate_near_duplicates(self):
+        """
+        Saves each deferred near-duplicate with its representative's newest result, noting the
+        source in `derived_from` and `derived_similarity`. Those whose representative has no
+        result yet (it failed, or was beyond --limit) wait for a later run.
+        """
+        if not self.deferred:
+            return
+        representatives = {self.derived[competition.get("link")][0] for _, competition in self.deferred}
+        sources = {record.get("url"): record for record in self.store.iter_latest_records() if record.get("url") in representatives}
+        waiting = 0
+        for _, competition in self.deferred:
+            representative, similarity = self.derived[competition.get("link")]
+            source = sources.get(representative)
+            if source is None:
+                waiting += 1
+                continue
+            record = build_structured_record(competition, source)
+            record["definitions"] = source.get("definitions")
+            record["derived_from"] = representative
+            record["derived_similarity"] = round(similarity, 3)
+            self.store.append(record)
+        print(f"🧬 Reused representatives' analyses for {len(self.deferred) - waiting} near-duplicates"
+              + (f"; {waiting} wait for their representative's result." if waiting else "."))
+
+    def is_partial(self, competition):
+        return competition.get("link") in self.stale_fields
+
+    def was_analyzed(self, competition):
+        return self.store.is_done(competition.get("link"), model=model_id)
+
+    def progress(self, index):
+        return f"{index + 1}/{self.total}" if self.total else f"{index + 1}"
+
+    def compress(self, entry, boilerplate=None):
+        """Strips shared boilerplate from a competition's context and fits it into the token budget."""
+        index, competition = entry
+        self.decided(competition)  # The keyword rules need the full context, before anything is cut
+        if not self.context_tokens or self.context_tokens <= 0:
+            return
+        with recorder.span("compress", competition['name']) as span:
+            compressed, before, after = compress_context(competition.get("context", ""), self.context_tokens, boilerplate)
+            span.update(tokens_before=before, tokens_after=after)
+        competition["context"] = compressed
+        self.tokens_before += before
+        self.tokens_after += after
+        print(f"  - ({self.progress(index)}) '{competition['name']}': {before:,} → {after:,} context tokens")
+
+    def decided(self, competition):
+        """The fields the local keyword rules settle for this competition ({} without --local_rules)."""
+        if not self.local_rules:
+            return {}
+        link = competition.get("link")
+        if link not in self.local_decisions:
+            self.local_decisions[link] = preclassify(competition)
+        return self.local_decisions[link]
+
+    def request_for(self, competition):
+        """
+        (decided, system prompt) for a competition: the fields settled without the model, and
+        the prompt for the rest. With changed definitions, the earlier record's other fields
+        are kept and the prompt is reduced to the changed ones.
+        """
+        decided = self.decided(competition)
+        fields = self.stale_fields.get(competition.get("link"))
+        if not fields:
+            return decided, SYSTEM_PROMPT
+        keys = keys_of(fields)
+        previous = self.previous_records.get(competition.get("link"), {})
+        kept = {key: previous.get(key, DEFAULTS[key]) for key in SCHEMA_KEYS if key not in keys}
+        kept.update({key: value for key, value in decided.items() if key in keys})
+        return kept, build_partial_system_prompt(fields)
+
+    async def analyze(self, entry):
+        index, competition = entry
+        print(f"\n({self.progress(index)}) Processing: {competition['name']}")
+        decided, system_prompt = self.request_for(competition)
+        stale = self.stale_fields.get(competition.get("link"))
+        flags = [key for key in self.decided(competition) if not key.startswith("how_") and (not stale or key in stale)]
+        if flags:
+            print(f"  - Decided locally: {', '.join(f'{key}={decided[key]}' for key in flags)}")
+            recorder.count("local_fields", len(flags))
+        if stale:
+            print(f"  - Asking only for {', '.join(stale)} (definitions changed).")
+        return await analyze_competition_context(competition.get("context", ""), competition['name'], decided, system_prompt)
+
+    def lookup(self, entry):
+        index, competition = entry
+        decided, system_prompt = self.request_for(competition)
+        analysis_data = lookup_cached_analysis(competition.get("context", ""), competition['name'], system_prompt, decided)
+        if analysis_data is not None:
+            print(f"\n({self.progress(index)}) Cache hit: {competition['name']}")
+        return analysis_data
+
+    def on_result(self, entry, analysis_data):
+        index, competition = entry
+        self.processed += 1
+        # Save progress after every single record (one fsync'd line, not a full rewrite).
+        self.store.append(build_structured_record(competition, analysis_data))
+        self.retry_queue.discard(competition.get("link"))
+        if self.stale_fields.pop(competition.get("link"), None):
+            recorder.count("partial_analyses")
+        print(f"  - ✅ Success! '{competition['name']}' saved. Total records: {len(self.store.completed_urls)}")
+
+    def on_failure(self, entry, error):
+        index, competition = entry
+        # --- Fallback System ---
+        # Queue the competition for the next run instead of stopping this one.
+        self.retry_queue.add(competition, error)
+        print(f"  - 🔴 Giving up on '{competition['name']}' for this run: {error}")
+
+    async def run_batches(self, entries, batch_tokens):
+        """
+        Packs competitions into shared requests and returns the ones that still need a single call.
+        """
+        uncached = []
+        for entry in entries:
+            analysis_data = lookup_cached_analysis(entry[1].get("context", ""), entry[1]['name'], BATCH_SYSTEM_PROMPT)
+            if analysis_data is not None:
+                self.on_result(entry, analysis_data)
+            else:
+                uncached.append(entry)
+
+        batches = pack_batches(
+            uncached,
+            batch_tokens,
+            size_of=lambda entry: estimate_tokens(entry[1].get("context", "")),
+            key_of=lambda entry: normalize_name(entry[1]['name']),  # The key answers are matched back by
+        )
+        print(f"📦 Packed {len(uncached)} competitions into {len(batches)} batched requests.")
+        leftovers = []
+
+        def on_batch_result(batch, analyses):
+            for entry in batch:
+                if entry[1]['name'] in analyses:
+                    self.on_result(entry, analyses[entry[1]['name']])
+                else:
+                    leftovers.append(entry)
+
+        def on_batch_failure(batch, error):
+            print(f"  - ⚠️ Batch failed ({error}); its competitions will be sent one by one.")
+            leftovers.extend(batch)
+
+        batch_engine = AnalysisEngine(
+            lambda batch: analyze_competition_batch([entry[1] for entry in batch]),
+            concurrency=self.concurrency,
+            rate_limiter=self.rate_limiter,
+            token_estimator=lambda batch: estimate_tokens(BATCH_SYSTEM_PROMPT + "".join(entry[1].get("context", "") for entry in batch)),
+        )
+        await batch_engine.run(batches, on_result=on_batch_result, on_failure=on_batch_failure)
+        return leftovers
+
+    async def run(self, entries, batch_tokens=0):
+        """
+        Analyzes (index, competition) entries and returns the failures. `entries` may be an
+        async iterable that yields competitions as they are scraped; batching needs a list.
+        """
+        if batch_tokens and batch_tokens > 0:
+            # Batches ask for every field, so partial re-analyses, and competitions the local rules
+            # settle fields for, go through single calls that leave those fields out of the prompt.
+            partial = [entry for entry in entries if self.is_partial(entry[1]) or self.decided(entry[1])]
+            entries = await self.run_batches([entry for entry in entries if not (self.is_partial(entry[1]) or self.decided(entry[1]))],
+                                             batch_tokens)
+            entries += partial
+            if entries:
+                print(f"🔁 Falling back to single calls for {len(entries)} competitions.")
+        engine = AnalysisEngine(
+            self.analyze,
+            concurrency=self.concurrency,
+            rate_limiter=self.rate_limiter,
+            token_estimator=lambda entry: estimate_tokens(SYSTEM_PROMPT + entry[1].get("context", "")),
+            cache_lookup=self.lookup,
+        )
+        return await engine.run(entries, on_result=self.on_result, on_failure=self.on_failure)
+
+    def close(self, failures):
+        """Export stage: compacts the log into the JSON/CSV (and optionally Parquet) outputs."""
+        global response_cache
+        output_file = self.results_file
+        if self.tokens_before:
+            saved = 1 - self.tokens_after / self.tokens_before
+            print(f"🗜️ Compressed contexts from {self.tokens_before:,} to {self.tokens_after:,} tokens ({saved:.0%} saved).")
+
+        # --- Compact the log into the JSON/CSV outputs ---
+        written = self.store.compact(csv_file=self.csv_file)
+        print(f"✅ Wrote {written} records to {output_file} and {self.csv_file}.")
+        if self.parquet:
+            if pa is None:
+                print("⚠️ pyarrow is not installed; skipping the Parquet export.")
+            else:
+                rows = write_parquet(self.store.iter_latest_records(), self.parquet_dir, platform=self.platform.name)
+                print(f"🧱 Exported {rows} records to the Parquet dataset in {self.parquet_dir}.")
+        if isinstance(self.rate_limiter, AdaptiveRateLimiter):
+            self.rate_limiter.save()
+            print(f"🎚️ Learned rate: {self.rate_limiter.rate:.0f} requests/min with {self.rate_limiter.window} calls in flight "
+                  f"({self.rate_limiter.throttled} slowdowns); saved for the next run.")
+        if response_cache is not None:
+            stats = response_cache.stats()
+            print(f"💾 Response cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate).")
+            response_cache.close()
+            response_cache = None
+
+        print(f"\n🎉 Analysis complete! Processed {self.processed} competitions in this run. Results saved to {output_file}.")
+        if failures:
+            print(f"🔴 {len(failures)} competitions failed and were queued in {self.retry_queue.path}.")
+            print("   Run the analysis again to retry them; finished ones are skipped automatically.")
+
+
+def main(platform, limit, shuffle, fresh=False, concurrency=DEFAULT_CONCURRENCY,
+         requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE,
+         use_cache=True, batch_tokens=0, context_tokens=DEFAULT_CONTEXT_TOKENS, parquet=False, backend="gemini",
+         metrics_file=None, adaptive=True, max_requests_per_minute=DEFAULT_MAX_REQUESTS_PER_MINUTE, local_rules=False,
+         near_duplicates=False):
+    """
+    Analyzes a platform's scraped competitions file (platform.details_file).
+    Timing spans go to `metrics_file` (default: platform.metrics_file). With `near_duplicates`,
+    one competition per cluster of near-identical contexts is analyzed for the whole cluster.
+    """
+    input_file = platform.details_file
+    # --- Check Source Data ---
+    if not os.path.exists(input_file):
+        print(f"❌ Input file not found: {input_file}")
+        return
+
+    run = AnalysisRun(platform, fresh, concurrency, requests_per_minute, tokens_per_minute,
+                      use_cache, context_tokens, parquet, backend, adaptive, max_requests_per_minute, local_rules)
+    if not run.open():
+        return
+    recorder.open(metrics_file or platform.metrics_file)
+
+    # --- Main Processing Loop ---
+    # The input is streamed and only competitions that still need analysis are kept in memory.
+    # A competition is re-analyzed when its scraped context changed since its record was written.
+    total_competitions = 0
+    changed = 0
+    pending = []
+    for index, competition in enumerate(iter_records(input_file)):
+        total_competitions += 1
+        if run.needs_analysis(competition):
+            pending.append((index, competition))
+            if run.was_analyzed(competition) and not run.is_partial(competition):
+                changed += 1
+    run.total = total_competitions
+    print(f"✅ Loaded {total_competitions} competitions from {input_file}")
+    if changed:
+        print(f"🔄 {changed} previously analyzed competitions have changed content and will be analyzed again.")
+
+    # --- Handle Shuffle Logic ---
+    if shuffle:
+        print("🔀 Shuffling competitions as requested...")
+        random.shuffle(pending)
+        print("✅ Competitions shuffled. Previously analyzed competitions are still skipped.")
+
+    # Competitions that failed last time go first (sorted() is stable, so the rest keep their order).
+    pending = sorted(pending, key=lambda entry: entry[1].get("link") not in run.retry_queue.entries)
+    print(f"✅ {total_competitions - len(pending)} already analyzed, {len(pending)} to go.")
+
+    # Text shared by many competitions: stripped before compression and before near-duplicate matching.
+    boilerplate = None
+    if pending and (near_duplicates or (context_tokens and context_tokens > 0)):
+        boilerplate = BoilerplateDetector.from_contexts(competition.get("context", "") for competition in iter_records(input_file))
+
+    # --- Near-Duplicates ---
+    if near_duplicates and pending:
+        pending = run.defer_near_duplicates(pending, iter_records(input_file), boilerplate)
+
+    if limit and limit > 0:
+        pending = pending[:limit]
+        print(f"🟡 Limiting this run to {len(pending)} competitions.")
+
+    # --- Compress Contexts ---
+    # Strip text blocks shared by many competitions and keep the most relevant text within budget.
+    if context_tokens and context_tokens > 0 and pending:
+        for entry in pending:
+            run.compress(entry, boilerplate)
+
+    failures = asyncio.run(run.run(pending, batch_tokens))
+    run.propagate_near_duplicates()
+    run.close(failures)
+    recorder.print_summary()
+    recorder.close()
+
+
+def add_arguments(parser):
+    """The analysis options shared by the per-platform scripts and the pipeline."""
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Discard previous results and the retry queue, and start a new analysis."
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Maximum number of Gemini calls in flight at once."
+    )
+    parser.add_argument(
+        "--rpm",
+        type=int,
+        default=DEFAULT_REQUESTS_PER_MINUTE,
+        help="Requests-per-minute quota of your Gemini tier. The first run starts here; later runs start at the learned rate."
+    )
+    parser.add_argument(
+        "--max_rpm",
+        type=int,
+        default=DEFAULT_MAX_REQUESTS_PER_MINUTE,
+        help="Upper bound for the learned request rate."
+    )
+    parser.add_argument(
+        "--fixed_rate",
+        action="store_true",
+        help="Keep --rpm and --concurrency fixed instead of adapting them to the provider's 429/503 answers."
+    )
+    parser.add_argument(
+        "--tpm",
+        type=int,
+        default=DEFAULT_TOKENS_PER_MINUTE,
+        help="Tokens-per-minute quota of your Gemini tier. 0 disables token limiting."
+    )
+    parser.add_argument(
+        "--no_cache",
+        action="store_true",
+        help="Always call Gemini, ignoring the on-disk response cache."
+    )
+    parser.add_argument(
+        "--context_tokens",
+        type=int,
+        default=DEFAULT_CONTEXT_TOKENS,
+        help="Per-competition token budget for the context sent to Gemini. 0 sends contexts uncompressed."
+    )
+    parser.add_argument(
+        "--parquet",
+        action="store_true",
+        help="Also export the results to the Parquet dataset (partitioned by platform and run date). Needs pyarrow."
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="gemini",
+        help="Model backend. 'stub' answers locally with fake analyses (no API key or quota), for trying out the pipeline; "
+             "they are saved apart from Gemini's, e.g. to ethical_analysis.stub.json."
+    )
+    parser.add_argument(
+        "--local_rules",
+        action="store_true",
+        help="Settle clear-cut fields (toy, red_team, fairness, privacy) with local keyword rules and ask the model only for the rest. "
+             "With --batch_tokens, competitions with settled fields are sent as single calls."
+    )
+    parser.add_argument(
+        "--metrics",
+        help="JSONL file the per-competition timing spans are appended to (default: metrics.jsonl next to the results)."
+    )
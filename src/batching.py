@@ -0,0 +1,89 @@
+from response_schema import SchemaError, extract_json, validate_analysis
+
+# --- Defaults ---
+MAX_ITEMS_PER_BATCH = 10
+NAME_KEY = "competition_name"
+
+# Appended to the single-competition system prompt when several competitions share one request.
+BATCH_RULES = f"""
+**BATCH MODE:**
+The user message contains SEVERAL competitions, each introduced by a line of the form
+"=== COMPETITION: <name> ===". Analyze each competition independently, using only its own context.
+Your entire response MUST be a single, valid JSON array with exactly one object per competition.
+Each object MUST contain a "{NAME_KEY}" key whose value is the competition name exactly as given,
+followed by all the keys of the REQUIRED JSON OUTPUT STRUCTURE above.
+"""
+
+
+def pack_batches(entries, token_budget, size_of, key_of, max_items=MAX_ITEMS_PER_BATCH):
+    """
+    Greedily packs `entries` (in order) into batches whose summed `size_of(entry)` stays
+    within `token_budget`. Entries sharing a `key_of(entry)` never land in the same batch,
+    since answers are matched back by that key. An entry larger than the budget gets a
+    batch of its own.
+    """
+    batches = []
+    current, current_keys, current_size = [], set(), 0
+    for entry in entries:
+        size = size_of(entry)
+        key = key_of(entry)
+        if current and (current_size + size > token_budget or len(current) >= max_items or key in current_keys):
+            batches.append(current)
+            current, current_keys, current_size = [], set(), 0
+        current.append(entry)
+        current_keys.add(key)
+        current_size += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+def build_batch_prompt(named_contexts):
+    """Builds the user message for a list of (competition_name, context) pairs."""
+    sections = [f"=== COMPETITION: {name} ===\n{context}" for name, context in named_contexts]
+    return f"Here are the contexts for {len(sections)} competitions:\n\n" + "\n\n".join(sections)
+
+
+def normalize_name(name):
+    """The key batch answers are matched by: case and runs of whitespace don't count."""
+    return " ".join(str(name).split()).casefold()
+
+
+def parse_batch_response(text, names):
+    """
+    Parses a batch answer and matches its items back to `names`.
+    Returns ({name: analysis}, [names that are missing or malformed]). Items are repaired
+    and validated like single answers; one with invalid fields counts as missing, so it
+    is sent again on its own.
+    """
+    data = extract_json(text)
+    if isinstance(data, dict):
+        # Tolerate {"results": [...]} and {"<name>": {...}, ...} shapes.
+        arrays = [value for value in data.values() if isinstance(value, list)]
+        if arrays:
+            data = arrays[0]
+        else:
+            data = [dict(value, **{NAME_KEY: key}) for key, value in data.items() if isinstance(value, dict)]
+    if not isinstance(data, list):
+        raise ValueError(f"Expected a JSON array for the batch, got {type(data).__name__}.")
+
+    by_name = {}
+    for item in data:
+        if isinstance(item, dict) and NAME_KEY in item:
+            analysis = {key: value for key, value in item.items() if key != NAME_KEY}
+            by_name.setdefault(normalize_name(item[NAME_KEY]), analysis)
+
+    found, missing = {}, []
+    for name in names:
+        analysis = by_name.get(normalize_name(name))
+        invalid = True
+        if analysis:
+            try:
+                analysis, invalid = validate_analysis(analysis)
+            except SchemaError:
+                pass
+        if invalid:
+            missing.append(name)
+        else:
+            found[name] = analysis
+    return found, missing
@@ -0,0 +1,164 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+
+from json_stream import RecordWriter, iter_records
+
+# --- Defaults ---
+SHINGLE_WORDS = 8        # Words per shingle
+MIN_SHARE = 0.2          # A shingle in >= 20% of competitions ...
+MIN_COUNT = 3            # ... and in at least 3 of them is boilerplate
+MIN_SPAN_WORDS = 20      # Only strip runs of boilerplate at least this long
+
+WORD_PATTERN = re.compile(r"\S+")
+SECTION_HEADER_PATTERN = re.compile(r"(^--- .+? ---$)", re.MULTILINE)
+
+
+def _normalize(word):
+    return word.strip(".,;:!?()[]{}\"'").lower()
+
+
+def _shingles(words, size):
+    """Hashes of every run of `size` consecutive normalized words."""
+    normalized = [_normalize(word) for word in words]
+    return [hash(tuple(normalized[i:i + size])) for i in range(len(normalized) - size + 1)]
+
+
+def _sections(text):
+    """Yields (is_header, piece); section headers are never treated as boilerplate."""
+    for piece in SECTION_HEADER_PATTERN.split(text):
+        if piece:
+            yield bool(SECTION_HEADER_PATTERN.fullmatch(piece)), piece
+
+
+class BoilerplateDetector:
+    """
+    Finds text blocks that recur across many competitions (platform rules, legal terms,
+    cookie notices, ...) by counting in how many contexts each hashed word shingle occurs.
+    A run of text covered by frequent shingles is boilerplate, wherever it sits in a page.
+    """
+
+    def __init__(self, shingles, shingle_words=SHINGLE_WORDS, min_span_words=MIN_SPAN_WORDS):
+        self.shingles = set(shingles)
+        self.shingle_words = shingle_words
+        self.min_span_words = min_span_words
+
+    @classmethod
+    def from_contexts(cls, contexts, shingle_words=SHINGLE_WORDS, min_share=MIN_SHARE,
+                      min_count=MIN_COUNT, min_span_words=MIN_SPAN_WORDS):
+        document_frequency = Counter()
+        total = 0
+        for context in contexts:
+            total += 1
+            document_frequency.update({
+                shingle
+                for is_header, piece in _sections(context or "") if not is_header
+                for shingle in _shingles(WORD_PATTERN.findall(piece), shingle_words)
+            })
+        threshold = max(min_count, min_share * total)
+        frequent = (shingle for shingle, count in document_frequency.items() if count >= threshold)
+        return cls(frequent, shingle_words, min_span_words)
+
+    def _spans(self, piece):
+        """Character spans of boilerplate runs in a section body."""
+        matches = list(WORD_PATTERN.finditer(piece))
+        covered = [False] * len(matches)
+        for i, shingle in enumerate(_shingles([m.group() for m in matches], self.shingle_words)):
+            if shingle in self.shingles:
+                for j in range(i, i + self.shingle_words):
+                    covered[j] = True
+
+        spans = []
+        start = None
+        for i, is_covered in enumerate(covered + [False]):
+            if is_covered and start is None:
+                start = i
+            elif not is_covered and start is not None:
+                if i - start >= self.min_span_words:
+                    spans.append((matches[start].start(), matches[i - 1].end()))
+                start = None
+        return spans
+
+    def find(self, text):
+        """Returns the boilerplate blocks found in `text`."""
+        blocks = []
+        for is_header, piece in _sections(text or ""):
+            if not is_header:
+                blocks.extend(piece[start:end] for start, end in self._spans(piece))
+        return blocks
+
+    def strip(self, text, references=None):
+        """
+        Removes boilerplate blocks from `text`. If a `references` dict is given, each block is
+        replaced by a short "[boilerplate:<id>]" marker and recorded there as id -> block text.
+        """
+        if not text or not self.shingles:
+            return text
+        pieces = []
+        for is_header, piece in _sections(text):
+            if is_header:
+                pieces.append(piece)
+                continue
+            position = 0
+            for start, end in self._spans(piece):
+                block = piece[start:end]
+                pieces.append(piece[position:start])
+                if references is not None:
+                    block_id = hashlib.blake2b(" ".join(block.split()).encode("utf-8"), digest_size=4).hexdigest()
+                    references[block_id] = block
+                    pieces.append(f"[boilerplate:{block_id}]")
+                elif "\n" in block:
+                    pieces.append("\n")
+                position = end
+            pieces.append(piece[position:])
+        stripped = "".join(pieces)
+        # Tidy the gaps left behind without touching the rest of the text.
+        stripped = re.sub(r"[ \t]{2,}", " ", stripped)
+        return re.sub(r"\n{3,}", "\n\n", stripped)
+
+
+def main(input_path, output_path, min_share, min_span_words, replace):
+    # Two streaming passes over the input: one to count shingles, one to strip and write.
+    detector = BoilerplateDetector.from_contexts(
+        (competition.get("context", "") for competition in iter_records(input_path)),
+        min_share=min_share, min_span_words=min_span_words,
+    )
+    print(f"🔎 Found {len(detector.shingles):,} boilerplate shingles (in >= {min_share:.0%} of competitions).")
+
+    references = {} if replace else None
+    chars_before = chars_after = 0
+    with RecordWriter(output_path) as writer:
+        for competition in iter_records(input_path):
+            context = competition.get("context", "")
+            stripped = detector.strip(context, references)
+            chars_before += len(context)
+            chars_after += len(stripped)
+            competition["context"] = stripped
+            writer.write(competition)
+
+    saved = 1 - chars_after / chars_before if chars_before else 0
+    print(f"🎉 {writer.count} competitions: context size {chars_before:,} → {chars_after:,} characters ({saved:.0%} saved). Saved to {output_path}")
+
+    if references is not None:
+        references_path = os.path.splitext(output_path)[0] + ".boilerplate.json"
+        with open(references_path, "w", encoding="utf-8") as f:
+            json.dump(references, f, indent=4, ensure_ascii=False)
+        print(f"📎 {len(references)} distinct boilerplate blocks saved to {references_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Strip boilerplate shared across many competitions from scraped contexts.")
+    parser.add_argument("input", help="Scraped competitions JSON (with 'context' fields).")
+    parser.add_argument("output", help="Where to write the stripped JSON.")
+    parser.add_argument("--min_share", type=float, default=MIN_SHARE,
+                        help="Fraction of competitions a block must appear in to count as boilerplate.")
+    parser.add_argument("--min_span_words", type=int, default=MIN_SPAN_WORDS,
+                        help="Shortest run of boilerplate (in words) that gets stripped.")
+    parser.add_argument("--replace", action="store_true",
+                        help="Replace blocks with [boilerplate:<id>] references instead of deleting them.")
+    args = parser.parse_args()
+
+    main(args.input, args.output, args.min_share, args.min_span_words, args.replace)
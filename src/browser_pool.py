@@ -0,0 +1,124 @@
+import queue
+import threading
+
+# --- Defaults ---
+DEFAULT_WORKERS = 4
+DEFAULT_RETRIES = 2
+
+
+class BrowserPool:
+    """
+    Runs `scrape(driver, item)` over many items with N browser workers pulling from one
+    shared work queue. Each worker owns its own driver (WebDriver is not thread-safe),
+    retries a failed item with a fresh driver, and hands results back to a single writer
+    (the calling thread), which receives them in input order.
+    """
+
+    def __init__(self, make_driver, scrape, workers=DEFAULT_WORKERS, retries=DEFAULT_RETRIES):
+        self.make_driver = make_driver
+        self.scrape = scrape
+        self.workers = max(1, workers)
+        self.retries = retries
+
+    def _restart(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        return self.make_driver()
+
+    def _worker(self, worker_id, tasks, results):
+        try:
+            driver = self.make_driver()
+        except Exception as e:
+            print(f"❌ Worker {worker_id}: failed to start WebDriver: {e}")
+            driver = None
+
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            position, item = task
+            if driver is None:
+                # Put the item back for a healthy worker, then retire.
+                tasks.put((position, item))
+                break
+
+            for attempt in range(self.retries + 1):
+                try:
+                    results.put((position, True, self.scrape(driver, item)))
+                    break
+                except Exception as e:
+                    if attempt == self.retries:
+                        results.put((position, False, e))
+                        break
+                    print(f"  ⚠️ Worker {worker_id}: attempt {attempt + 1} failed ({e}). Retrying with a fresh browser.")
+                    try:
+                        driver = self._restart(driver)
+                    except Exception as restart_error:
+                        print(f"❌ Worker {worker_id}: failed to restart WebDriver: {restart_error}")
+                        results.put((position, False, e))
+                        driver = None
+                        break
+
+        if driver is not None:
+            driver.quit()
+        results.put(None)  # This worker is done.
+
+    def _feed(self, items, tasks, items_by_position):
+        """Hands items to the workers as the (possibly lazy) input produces them."""
+        try:
+            for position, item in enumerate(items):
+                items_by_position[position] = item
+                tasks.put((position, item))
+        finally:
+            for _ in range(self.workers):
+                tasks.put(None)  # One stop marker per worker.
+
+    def run(self, items, on_result):
+        """
+        Scrapes every item and calls `on_result(position, item, ok, value)` in input order,
+        where `value` is the scrape result or the last exception.
+        `items` may be a generator fed by an earlier stage: workers start on the first item
+        without waiting for the rest.
+        """
+        if hasattr(items, "__len__"):
+            workers = min(self.workers, len(items))
+            if not workers:
+                return
+        else:
+            workers = self.workers
+        tasks = queue.Queue()
+        results = queue.Queue()
+        items_by_position = {}  # Items handed out and not yet reported
+
+        feeder = threading.Thread(target=self._feed, args=(items, tasks, items_by_position), daemon=True)
+        feeder.start()
+        threads = [
+            threading.Thread(target=self._worker, args=(worker_id, tasks, results), daemon=True)
+            for worker_id in range(1, workers + 1)
+        ]
+        for thread in threads:
+            thread.start()
+
+        # --- Single writer: reorder completed items back into input order ---
+        pending = {}
+        next_position = 0
+        running = len(threads)
+        while running:
+            message = results.get()
+            if message is None:
+                running -= 1
+                continue
+            position, ok, value = message
+            pending[position] = (ok, value)
+            while next_position in pending:
+                ok, value = pending.pop(next_position)
+                on_result(next_position, items_by_position.pop(next_position), ok, value)
+                next_position += 1
+
+        # Items left over if every worker failed to start.
+        feeder.join()
+        for position in sorted(items_by_position):
+            ok, value = pending.pop(position, (False, RuntimeError("No browser worker was available.")))
+            on_result(position, items_by_position.pop(position), ok, value)
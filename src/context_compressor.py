@@ -0,0 +1,132 @@
+import re
+
+from analysis_engine import estimate_tokens
+
+# --- Defaults ---
+DEFAULT_CONTEXT_TOKENS = 4000   # Per-competition context budget sent to the model
+MAX_PARAGRAPH_CHARS = 600       # Long single-line sections are split into sentence groups
+
+# Keywords per analysis key (matched case-insensitively as word prefixes).
+RELEVANCE_KEYWORDS = {
+    "fairness": ["fair", "bias", "discriminat", "equit", "demographic", "protected attribute", "underrepresent"],
+    "privacy": ["privacy", "private", "anonymi", "pii", "gdpr", "personal data", "personally identifiable",
+                "de-identif", "deidentif", "confidential", "consent", "hipaa"],
+    "transparency": ["transparen", "reproducib", "open source", "open-source", "documentation", "datasheet",
+                     "source code", "publicly available"],
+    "explainability": ["explainab", "interpretab", "explain", "shap", "lime", "xai", "saliency"],
+    "evaluation": ["evaluat", "metric", "scor", "accuracy", "f1", "auc", "rmse", "mae", "leaderboard"],
+    "model_use": ["deploy", "production", "paper", "publish", "license", "licence", "workshop", "winning solution",
+                  "intellectual property"],
+    "prize": ["prize", "award", "reward", "cash", "winner", "$", "usd", "kudos", "swag", "medal"],
+    "toy": ["playground", "getting started", "educational", "practice", "beginner", "tutorial", "learn"],
+    "red_team": ["red team", "red-team", "redteam", "adversarial", "jailbreak", "attack", "vulnerab",
+                 "stress-test", "stress test", "harm", "robustness"],
+}
+KEYWORD_PATTERNS = {
+    key: re.compile("|".join(
+        re.escape(word) if not word[0].isalnum() else r"\b" + re.escape(word) for word in words
+    ), re.IGNORECASE)
+    for key, words in RELEVANCE_KEYWORDS.items()
+}
+
+SECTION_PATTERN = re.compile(r"^--- (.+?) ---$", re.MULTILINE)
+SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_sections(context):
+    """Splits a scraped context into [(section_name, text)] using its '--- NAME ---' headers."""
+    headers = list(SECTION_PATTERN.finditer(context))
+    if not headers:
+        return [("", context)]
+    sections = []
+    if context[:headers[0].start()].strip():
+        sections.append(("", context[:headers[0].start()]))
+    for i, header in enumerate(headers):
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(context)
+        sections.append((header.group(1), context[header.end():end]))
+    return sections
+
+
+def split_paragraphs(text):
+    """
+    Splits section text into paragraphs: by lines where the scraper kept them, and into
+    groups of whole sentences where a section was flattened into one long line.
+    """
+    paragraphs = []
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        if len(line) <= MAX_PARAGRAPH_CHARS:
+            paragraphs.append(line)
+            continue
+        current = ""
+        for sentence in SENTENCE_END_PATTERN.split(line):
+            if current and len(current) + len(sentence) + 1 > MAX_PARAGRAPH_CHARS:
+                paragraphs.append(current)
+                current = sentence
+            else:
+                current = f"{current} {sentence}" if current else sentence
+        if current:
+            paragraphs.append(current)
+    return paragraphs
+
+
+def relevance_score(paragraph):
+    """
+    Scores a paragraph by how many analysis keys it touches (capped per key, so one
+    keyword repeated many times doesn't dominate), relative to its length.
+    """
+    hits = sum(min(3, len(pattern.findall(paragraph))) for pattern in KEYWORD_PATTERNS.values())
+    keys = sum(1 for pattern in KEYWORD_PATTERNS.values() if pattern.search(paragraph))
+    return (hits + 2 * keys) / (estimate_tokens(paragraph) ** 0.5)
+
+
+def compress_context(context, token_budget=DEFAULT_CONTEXT_TOKENS, boilerplate=None):
+    """
+    Returns (compressed_context, tokens_before, tokens_after).
+
+    Blocks shared across competitions are stripped first, using `boilerplate` (a
+    boilerplate.BoilerplateDetector). If the rest is still over `token_budget`, the first
+    paragraph of each section (which usually states the task) is kept, then the most
+    relevant remaining paragraphs, and everything is put back in original order.
+    """
+    tokens_before = estimate_tokens(context or "")
+    if not context:
+        return "", tokens_before, tokens_before
+
+    if boilerplate is not None:
+        context = boilerplate.strip(context)
+
+    candidates = []  # (section_index, paragraph_index, section_name, text)
+    sections = split_sections(context)
+    for section_index, (name, text) in enumerate(sections):
+        for paragraph_index, paragraph in enumerate(split_paragraphs(text)):
+            candidates.append((section_index, paragraph_index, name, paragraph))
+
+    if sum(estimate_tokens(paragraph) for *_, paragraph in candidates) <= token_budget:
+        selected = candidates
+    else:
+        first_in_section = {}
+        for candidate in candidates:
+            first_in_section.setdefault(candidate[0], candidate)
+        leads = list(first_in_section.values())
+        rest = sorted((c for c in candidates if first_in_section[c[0]] is not c),
+                      key=lambda c: relevance_score(c[3]), reverse=True)
+        selected, used = [], 0
+        for candidate in leads + rest:
+            size = estimate_tokens(candidate[3])
+            if used + size <= token_budget:
+                selected.append(candidate)
+                used += size
+        selected.sort(key=lambda c: (c[0], c[1]))
+
+    parts = []
+    current_section = None
+    for section_index, _, name, paragraph in selected:
+        if section_index != current_section:
+            current_section = section_index
+            parts.append(f"\n--- {name} ---" if name else "")
+        parts.append(paragraph)
+    compressed = "\n".join(parts).strip()
+    return compressed, tokens_before, estimate_tokens(compressed)
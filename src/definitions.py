@@ -0,0 +1,75 @@
+import hashlib
+import json
+import re
+
+from prompts import SYSTEM_PROMPT
+from response_schema import FLAG_KEY_OF, SCHEMA_KEYS
+
+# --- Prompt Sections ---
+STRUCTURE_HEADER = "**REQUIRED JSON OUTPUT STRUCTURE (MUST FOLLOW EXACTLY):**"
+DEFINITIONS_HEADER = "**DEFINITIONS FOR ANALYSIS:**"
+DEFINITION_PATTERN = re.compile(r"^- \*(\w+)\*:.*$", re.MULTILINE)
+EXAMPLE_PATTERN = re.compile(r"```json\s*(\{.*?\})\s*```", re.DOTALL)
+VERSION_CHARS = 12
+
+
+def split_prompt(system_prompt=SYSTEM_PROMPT):
+    """Returns (rules, example analysis, {field: definition line}) from a system prompt."""
+    rules, rest = system_prompt.split(STRUCTURE_HEADER, 1)
+    structure, definitions_text = rest.split(DEFINITIONS_HEADER, 1)
+    example = json.loads(EXAMPLE_PATTERN.search(structure).group(1))
+    definitions = {match.group(1): match.group(0) for match in DEFINITION_PATTERN.finditer(definitions_text)}
+    return rules, example, definitions
+
+
+def field_of(key):
+    """The field a schema key belongs to: a how key belongs to its flag."""
+    return FLAG_KEY_OF.get(key, key)
+
+
+def definition_versions(system_prompt=SYSTEM_PROMPT):
+    """
+    {field: version} for the category and each flag. A version is a hash of the field's
+    definition plus the rules every field shares, so editing one definition changes only
+    that field's version, and editing the rules changes all of them.
+    """
+    rules, example, definitions = split_prompt(system_prompt)
+    versions = {}
+    for field in [key for key in SCHEMA_KEYS if field_of(key) == key]:
+        text = rules.strip() + "\n" + definitions.get(field, "")
+        versions[field] = hashlib.sha256(text.encode("utf-8")).hexdigest()[:VERSION_CHARS]
+    return versions
+
+
+def changed_fields(stored_versions, current_versions):
+    """
+    Fields whose definition changed since a record was analyzed. Records from before versions
+    were stored count as current.
+    """
+    if not stored_versions:
+        return []
+    return [field for field, version in current_versions.items() if stored_versions.get(field) != version]
+
+
+def keys_of(fields):
+    """The schema keys answering `fields` (each flag with its how key)."""
+    return [key for key in SCHEMA_KEYS if field_of(key) in fields]
+
+
+def build_partial_system_prompt(fields, system_prompt=SYSTEM_PROMPT):
+    """
+    The system prompt reduced to `fields`: the same rules, with a JSON structure and
+    definitions listing only those fields, so the answer covers just them.
+    """
+    rules, example, definitions = split_prompt(system_prompt)
+    keys = keys_of(fields)
+    reduced = {key: example[key] for key in keys if key in example}
+    lines = [line for field, line in definitions.items() if field in fields]
+    return (
+        f"{rules}{STRUCTURE_HEADER}\n\n```json\n{json.dumps(reduced, indent=2)}\n```\n\n"
+        f"{DEFINITIONS_HEADER}\n\n" + "\n".join(lines) + "\n"
+    )
+
+
+# Computed once at import; stored with every record and compared on the next run.
+CURRENT_VERSIONS = definition_versions()
@@ -0,0 +1,106 @@
+import hashlib
+import time
+from datetime import datetime, timedelta
+
+from context_compressor import split_sections
+
+# --- Refresh Policy ---
+STALE_AFTER_DAYS = 28          # Settled competitions are re-checked every four weeks
+ACTIVE_STALE_AFTER_DAYS = 1    # Active or recently changed ones are re-checked daily
+RECENT_CHANGE_DAYS = 28        # "Recently changed" = content hash changed within this window
+
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+def now_timestamp():
+    return time.strftime(TIMESTAMP_FORMAT)
+
+
+def parse_timestamp(value):
+    try:
+        return datetime.strptime(value[:19], TIMESTAMP_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+
+def content_hash(text):
+    """Short stable hash of a scraped text."""
+    return hashlib.blake2b((text or "").encode("utf-8"), digest_size=16).hexdigest()
+
+
+def tab_hashes(context):
+    """Hash of each '--- TAB ---' section of a scraped context, keyed by tab name."""
+    return {name or "PREAMBLE": content_hash(text.strip()) for name, text in split_sections(context or "")}
+
+
+def context_hash_of(competition):
+    """The content hash of a competition's context, reusing the scraper's fingerprint when present."""
+    fingerprint = competition.get("fingerprint") or {}
+    return fingerprint.get("context_hash") or content_hash(competition.get("context", ""))
+
+
+def record_fetch(competition, context, pages=None):
+    """
+    Stores a freshly scraped context and its fingerprint on the competition record.
+    `pages` ({page: {"url", "etag", "last_modified"}}) keeps the HTTP validators of every
+    page the context was read from, for conditional GETs on the next fetch.
+    Returns True if the content differs from what was stored before.
+    """
+    previous = competition.get("fingerprint") or {}
+    new_hash = content_hash(context)
+    changed = new_hash != previous.get("context_hash")
+    fetched_at = now_timestamp()
+
+    fingerprint = {
+        "context_hash": new_hash,
+        "tab_hashes": tab_hashes(context),
+        "fetched_at": fetched_at,
+        "changed_at": fetched_at if changed else previous.get("changed_at", fetched_at),
+    }
+    if pages:
+        fingerprint["pages"] = pages
+
+    competition["context"] = context
+    competition["fingerprint"] = fingerprint
+    return changed
+
+
+def record_not_modified(competition):
+    """Marks a competition as checked now when the server answered 304 Not Modified."""
+    competition["fingerprint"]["fetched_at"] = now_timestamp()
+
+
+def conditional_headers(validators):
+    """If-None-Match / If-Modified-Since headers from a page's stored validators, if it has any."""
+    headers = {}
+    if validators and validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators and validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def is_active(competition, now=None):
+    """A competition counts as active if it says so, its deadline is ahead, or its content changed recently."""
+    now = now or datetime.now()
+    if competition.get("active"):
+        return True
+    deadline = parse_timestamp(competition.get("deadline"))
+    if deadline is not None and deadline > now:
+        return True
+    changed_at = parse_timestamp((competition.get("fingerprint") or {}).get("changed_at"))
+    return changed_at is not None and now - changed_at < timedelta(days=RECENT_CHANGE_DAYS)
+
+
+def is_stale(competition, stale_after_days=STALE_AFTER_DAYS, active_stale_after_days=ACTIVE_STALE_AFTER_DAYS, now=None):
+    """
+    Whether a competition should be fetched again: never scraped, scraped with an error,
+    or last fetched longer ago than its refresh interval.
+    """
+    now = now or datetime.now()
+    context = competition.get("context") or ""
+    fetched_at = parse_timestamp((competition.get("fingerprint") or {}).get("fetched_at"))
+    if not context or context.startswith("Error:") or fetched_at is None:
+        return True
+    max_age = active_stale_after_days if is_active(competition, now) else stale_after_days
+    return now - fetched_at >= timedelta(days=max_age)
@@ -0,0 +1,68 @@
+import argparse
+import functools
+import os
+import threading
+from urllib.parse import parse_qs
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+# --- Configuration ---
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "fixtures")
+
+
+class FixtureRequestHandler(SimpleHTTPRequestHandler):
+    """
+    Serves saved pages so that site-style URLs resolve without extensions:
+    /competitions/foo/rules is answered with competitions/foo/rules.html. Paged endpoints
+    are answered from recorded responses: /api/list?page=2 with api/list/page-2.json.
+    """
+
+    def translate_path(self, path):
+        path, _, query = path.partition("?")
+        translated = super().translate_path(path)
+        page = parse_qs(query).get("page")
+        if page:
+            recorded = os.path.join(translated, f"page-{page[0]}.json")
+            if os.path.isfile(recorded):
+                return recorded
+        page = translated.rstrip("/") + ".html"
+        if not os.path.isfile(translated) and os.path.isfile(page):
+            return page
+        return translated
+
+    def log_message(self, format, *args):
+        pass  # Keep scraper output readable.
+
+
+class FixtureServer:
+    """
+    A local HTTP server for replaying saved pages to the scrapers, running in a background thread.
+    Use as a context manager; `url` is the base URL to point the scrapers at.
+    """
+
+    def __init__(self, directory=FIXTURES_DIR, port=0):
+        handler = functools.partial(FixtureRequestHandler, directory=directory)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve saved competition pages for local scraper runs.")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on.")
+    parser.add_argument("--directory", default=FIXTURES_DIR, help="Directory of fixture pages to serve.")
+    args = parser.parse_args()
+
+    with FixtureServer(args.directory, args.port) as server:
+        print(f"✅ Serving {args.directory} at {server.url} (Ctrl+C to stop).")
+        try:
+            server.thread.join()
+        except KeyboardInterrupt:
+            print("\n🛑 Stopped.")
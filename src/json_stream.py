@@ -0,0 +1,133 @@
+import json
+import os
+import re
+
+# --- Defaults ---
+READ_CHUNK_SIZE = 1 << 16  # Characters read at a time from a JSON array file
+
+WHITESPACE_PATTERN = re.compile(r"[ \t\n\r]*")
+
+
+def _iter_json_array(f):
+    """
+    Yields the items of a top-level JSON array one at a time, keeping only the current
+    item (plus one read chunk) in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer = f.read(READ_CHUNK_SIZE)
+    eof = not buffer
+    position = WHITESPACE_PATTERN.match(buffer).end()
+    if buffer[position:position + 1] != "[":
+        raise ValueError(f"{getattr(f, 'name', 'input')} is not a JSON array.")
+    position += 1
+    expect_value = True
+
+    while True:
+        position = WHITESPACE_PATTERN.match(buffer, position).end()
+        if position == len(buffer):
+            if eof:
+                raise ValueError(f"{getattr(f, 'name', 'input')} ends before its closing ']'.")
+            buffer, position = f.read(READ_CHUNK_SIZE), 0
+            eof = not buffer
+            continue
+
+        if buffer[position] == "]":
+            return
+        if not expect_value:
+            if buffer[position] != ",":
+                raise ValueError(f"Expected ',' or ']' in {getattr(f, 'name', 'input')}.")
+            position += 1
+            expect_value = True
+            continue
+
+        try:
+            value, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            end = None
+        if end is None or (end == len(buffer) and not eof):
+            # The item runs past the buffer: read more (at least doubling, so huge items stay linear).
+            more = f.read(max(READ_CHUNK_SIZE, len(buffer) - position))
+            buffer, position = buffer[position:] + more, 0
+            eof = not more
+            continue
+
+        yield value
+        position = end
+        expect_value = False
+        if position > READ_CHUNK_SIZE:
+            buffer, position = buffer[position:], 0
+
+
+def iter_records(path):
+    """
+    Streams records from a JSON array file or, for *.jsonl paths, from one record per line.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from _iter_json_array(f)
+
+
+def load_records(path):
+    """All records of a file as a list, for the few callers that need random access."""
+    return list(iter_records(path))
+
+
+class RecordWriter:
+    """
+    Writes records one at a time: as the usual indented JSON array (the same layout as
+    json.dump(..., indent=4)), or one line each for *.jsonl paths.
+
+    Records go to a temporary file that replaces `path` on close, so readers never see a
+    half-written file. If the block raises, the previous file is kept, unless
+    `keep_partial` is set, in which case whatever was written so far replaces it.
+    """
+
+    def __init__(self, path, keep_partial=False):
+        self.path = path
+        self.temp_path = path + ".tmp"
+        self.keep_partial = keep_partial
+        self.jsonl = path.endswith(".jsonl")
+        self.count = 0
+        self.file = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.file = open(self.temp_path, "w", encoding="utf-8")
+        if not self.jsonl:
+            self.file.write("[")
+        return self
+
+    def write(self, record):
+        if self.jsonl:
+            self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            self.file.write(",\n" if self.count else "\n")
+            self.file.write("    " + json.dumps(record, indent=4, ensure_ascii=False).replace("\n", "\n    "))
+        self.count += 1
+
+    def write_all(self, records):
+        for record in records:
+            self.write(record)
+        return self.count
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None and not self.keep_partial:
+            self.file.close()
+            os.remove(self.temp_path)
+            return
+        if not self.jsonl:
+            self.file.write("\n]" if self.count else "]")
+        self.file.close()
+        os.replace(self.temp_path, self.path)
+
+
+def write_records(path, records):
+    """Writes an iterable of records to `path` and returns how many were written."""
+    with RecordWriter(path) as writer:
+        return writer.write_all(records)
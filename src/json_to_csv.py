@@ -1,75 +1,90 @@
-import json
 import csv
+import itertools
 import os
 
+from json_stream import iter_records
+
 # --- Configuration ---
 INPUT_FILE = "data/aicrowd/results/ethical_analysis.json"
 OUTPUT_FILE = "data/aicrowd/results/ethical_analysis.csv"
 
-def convert_json_to_csv():
+# Define the headers based on the keys in your structured_record
+CSV_HEADERS = [
+    "name",
+    "url",
+    "category",
+    "fairness_bias_mentioned",
+    "how_fairness",
+    "data_privacy",
+    "how_data_privacy",
+    "transparency_mentioned",
+    "how_transparency",
+    "data_explainability",
+    "how_explainability",
+    "post_competition_model_use",
+    "how_model_use",
+    "toy",
+    "how_toy",
+    "red_team",
+    "how_red_team",
+]
+
+def write_csv(records, output_file):
     """
-    Reads the JSON output from the Gemini analyzer and converts it into a CSV file.
+    Writes analysis records (any iterable) to a CSV file and returns how many rows were written.
+    Rows go to a temporary file that replaces `output_file` only once every record was read,
+    so an error while reading them (e.g. a corrupted JSON) leaves the previous CSV in place.
     """
-    # --- Load Source JSON Data ---
-    try:
-        with open(INPUT_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        print(f"✅ Loaded {len(data)} records from {INPUT_FILE}")
-    except FileNotFoundError:
-        print(f"❌ Input file not found: {INPUT_FILE}")
-        print("Please run the gemini_analyzer.py script first to generate the JSON file.")
-        return
-    except json.JSONDecodeError:
-        print(f"❌ Error decoding JSON from {INPUT_FILE}. The file might be empty or corrupted.")
-        return
-
-    if not data:
-        print("🟡 The JSON file is empty. Nothing to convert.")
-        return
-
-    # --- Prepare for CSV Writing ---
-    # Define the headers based on the keys in your structured_record
-    headers = [
-        "name",
-        "url",
-        "category",
-        "fairness_bias_mentioned",
-        "how_fairness",
-        "data_privacy",
-        "how_data_privacy",
-        "transparency_mentioned",
-        "how_transparency",
-        "data_explainability",
-        "how_explainability",
-        "post_competition_model_use",
-        "how_model_use",
-        "toy",
-        "how_toy",
-        "red_team",
-        "how_red_team",
-    ]
+    # Create the directory if it doesn't exist
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    temp_file = output_file + ".tmp"
 
+    count = 0
     try:
-        # Create the directory if it doesn't exist
-        os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-
-        with open(OUTPUT_FILE, "w", newline="", encoding="utf-8") as f:
+        with open(temp_file, "w", newline="", encoding="utf-8") as f:
             writer = csv.writer(f)
-            
+
             # Write the header row
-            writer.writerow(headers)
-            
+            writer.writerow(CSV_HEADERS)
+
             # --- Write Data Rows ---
-            for record in data:
+            for record in records:
                 # Create a list of values in the same order as the headers
-                row = [record.get(header, "") for header in headers]
-                writer.writerow(row)
-        
-        print(f"🎉 Success! Converted {len(data)} records to {OUTPUT_FILE}.")
+                writer.writerow([record.get(header, "") for header in CSV_HEADERS])
+                count += 1
+    except BaseException:
+        os.remove(temp_file)
+        raise
+    os.replace(temp_file, output_file)
+    return count
+
+def convert_json_to_csv():
+    """
+    Reads the JSON output from the Gemini analyzer and converts it into a CSV file.
+    """
+    # --- Stream Source JSON Data ---
+    # Records are read and written one at a time, so memory use doesn't grow with the file.
+    if not os.path.exists(INPUT_FILE):
+        print(f"❌ Input file not found: {INPUT_FILE}")
+        print("Please run the gemini_analyzer.py script first to generate the JSON file.")
+        return
 
+    try:
+        records = iter_records(INPUT_FILE)
+        first = next(records, None)
+        if first is None:
+            # Nothing to convert; an existing CSV is kept rather than emptied.
+            print("🟡 The JSON file is empty. Nothing to convert.")
+            return
+        count = write_csv(itertools.chain([first], records), OUTPUT_FILE)
+    except ValueError:
+        print(f"❌ Error decoding JSON from {INPUT_FILE}. The file might be empty or corrupted.")
+        return
     except IOError as e:
         print(f"❌ An error occurred while writing to the CSV file: {e}")
+        return
 
+    print(f"🎉 Success! Converted {count} records from {INPUT_FILE} to {OUTPUT_FILE}.")
 
 if __name__ == "__main__":
     convert_json_to_csv()
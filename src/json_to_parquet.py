@@ -0,0 +1,171 @@
+import argparse
+import os
+import time
+from urllib.parse import urlparse
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:  # Parquet export is optional; everything else works without pyarrow.
+    pa = ds = None
+
+from json_stream import iter_records
+
+# --- Configuration ---
+INPUT_FILE = "data/aicrowd/results/ethical_analysis.json"
+OUTPUT_DIR = "data/results/parquet"
+BATCH_SIZE = 10_000  # Records converted per Arrow record batch
+
+# The seven yes/no answers become booleans (null when the model gave neither).
+FLAG_COLUMNS = [
+    "fairness_bias_mentioned",
+    "data_privacy",
+    "transparency_mentioned",
+    "data_explainability",
+    "post_competition_model_use",
+    "toy",
+    "red_team",
+]
+# Free-text explanations stay strings ("n/a" becomes null).
+HOW_COLUMNS = [
+    "how_fairness",
+    "how_data_privacy",
+    "how_transparency",
+    "how_explainability",
+    "how_model_use",
+    "how_toy",
+    "how_red_team",
+]
+# Set on near-duplicates that reuse another competition's analysis (null otherwise).
+PROVENANCE_COLUMNS = [("derived_from", "string"), ("derived_similarity", "float64")]
+PARTITION_COLUMNS = ["platform", "run_date"]
+PLATFORM_HOSTS = {"kaggle.com": "kaggle", "aicrowd.com": "aicrowd"}
+
+
+def results_schema():
+    return pa.schema(
+        [
+            ("name", pa.string()),
+            ("url", pa.string()),
+            ("context_hash", pa.string()),
+            ("category", pa.dictionary(pa.int32(), pa.string())),
+        ]
+        + [(column, pa.bool_()) for column in FLAG_COLUMNS]
+        + [(column, pa.string()) for column in HOW_COLUMNS]
+        + [(column, pa.type_for_alias(type_name)) for column, type_name in PROVENANCE_COLUMNS]
+        + [(column, pa.string()) for column in PARTITION_COLUMNS]
+    )
+
+
+def to_flag(value):
+    answer = str(value or "").strip().lower()
+    if answer == "yes":
+        return True
+    if answer == "no":
+        return False
+    return None
+
+
+def to_text(value):
+    text = str(value or "").strip()
+    return None if text.lower() in ("", "n/a", "na", "none") else text
+
+
+def platform_of(url):
+    host = urlparse(url or "").netloc.lower()
+    for suffix, platform in PLATFORM_HOSTS.items():
+        if host == suffix or host.endswith("." + suffix):
+            return platform
+    return "other"
+
+
+def iter_batches(records, schema, platform=None, run_date=None, batch_size=BATCH_SIZE):
+    """
+    Converts analysis records into typed Arrow record batches of up to `batch_size` rows.
+    `platform` defaults to one inferred from each record's URL.
+    """
+    run_date = run_date or time.strftime("%Y-%m-%d")
+    columns = {field.name: [] for field in schema}
+
+    def flush():
+        batch = pa.RecordBatch.from_pydict(columns, schema=schema)
+        for values in columns.values():
+            values.clear()
+        return batch
+
+    for record in records:
+        columns["name"].append(record.get("name"))
+        columns["url"].append(record.get("url"))
+        columns["context_hash"].append(record.get("context_hash"))
+        columns["category"].append(to_text(record.get("category")))
+        for column in FLAG_COLUMNS:
+            columns[column].append(to_flag(record.get(column)))
+        for column in HOW_COLUMNS:
+            columns[column].append(to_text(record.get(column)))
+        for column, _ in PROVENANCE_COLUMNS:
+            columns[column].append(record.get(column))
+        columns["platform"].append(platform or platform_of(record.get("url")))
+        columns["run_date"].append(run_date)
+        if len(columns["name"]) >= batch_size:
+            yield flush()
+    if columns["name"]:
+        yield flush()
+
+
+def write_parquet(records, output_dir=OUTPUT_DIR, platform=None, run_date=None):
+    """
+    Writes records as a Parquet dataset partitioned by platform and run date
+    (output_dir/platform=kaggle/run_date=2025-01-31/...). Re-exporting the same platform
+    and date replaces that partition. Returns the number of rows written.
+    """
+    if pa is None:
+        raise ImportError("Parquet export needs pyarrow (pip install pyarrow).")
+    schema = results_schema()
+    written = 0
+
+    def counted(batches):
+        nonlocal written
+        for batch in batches:
+            written += batch.num_rows
+            yield batch
+
+    ds.write_dataset(
+        counted(iter_batches(records, schema, platform, run_date)),
+        output_dir,
+        schema=schema,
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([schema.field(name) for name in PARTITION_COLUMNS]), flavor="hive"),
+        existing_data_behavior="delete_matching",
+        basename_template="results-{i}.parquet",
+    )
+    return written
+
+
+def convert_json_to_parquet(input_file=INPUT_FILE, output_dir=OUTPUT_DIR, platform=None, run_date=None):
+    """
+    Reads the JSON output from the analyzer and exports it as a partitioned Parquet dataset.
+    """
+    if pa is None:
+        print("❌ pyarrow is not installed. Run: pip install pyarrow")
+        return
+    if not os.path.exists(input_file):
+        print(f"❌ Input file not found: {input_file}")
+        return
+
+    try:
+        count = write_parquet(iter_records(input_file), output_dir, platform, run_date)
+    except ValueError as e:
+        print(f"❌ Error decoding JSON from {input_file}: {e}")
+        return
+    print(f"🎉 Success! Exported {count} records from {input_file} to {output_dir}.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export analysis results to a partitioned Parquet dataset.")
+    parser.add_argument("--input", default=INPUT_FILE, help="Analysis results JSON (or JSONL) to export.")
+    parser.add_argument("--output_dir", default=OUTPUT_DIR, help="Root directory of the Parquet dataset.")
+    parser.add_argument("--platform", help="Platform partition to write (default: inferred from each URL).")
+    parser.add_argument("--run_date", help="Run date partition, YYYY-MM-DD (default: today).")
+    args = parser.parse_args()
+
+    convert_json_to_parquet(args.input, args.output_dir, args.platform, args.run_date)
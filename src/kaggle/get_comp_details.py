@@ -1,9 +1,10 @@
-import json
+import argparse
 import os
 import re
+import sys
 import time
 from selenium import webdriver
-from selenium.common.exceptions import (NoSuchElementException, TimeoutException, StaleElementReferenceException)
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
@@ -11,6 +12,13 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from browser_pool import BrowserPool, DEFAULT_RETRIES, DEFAULT_WORKERS
+from fingerprints import STALE_AFTER_DAYS, is_stale, record_fetch
+from json_stream import RecordWriter, iter_records, load_records
+from metrics import recorder
+from platforms import PLATFORMS
+
 # --- 💡 Configuration ---
 # Set the number of competitions you want to process.
 # To process all, set this to a very large number (e.g., 9999).
@@ -18,103 +26,229 @@ COMPETITIONS_TO_PROCESS = 1002
 
 TABS_TO_SCRAPE = ["Overview", "Data", "Rules"]
 CONTENT_AREA_SELECTOR = "div[role='main']"
+KAGGLE_URL = "https://www.kaggle.com"
 
-# --- Script Setup ---
-options = Options()
-# options.add_argument("--headless")
-options.add_experimental_option("detach", True)
-options.add_argument("--disable-blink-features=AutomationControlled")
+# Default paths come from the registry in platforms.py (repo-relative, like the pipeline uses).
+INPUT_PATH = PLATFORMS["kaggle"].list_file
+OUTPUT_PATH = PLATFORMS["kaggle"].details_file
+METRICS_PATH = PLATFORMS["kaggle"].metrics_file
 
-try:
+# --- Script Setup ---
+def create_driver(headless=True, base_url=KAGGLE_URL):
+    """
+    Starts one Chrome instance and clears Kaggle's cookie banner. Each pool worker calls this once.
+    """
+    options = Options()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--disable-blink-features=AutomationControlled")
     driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    wait = WebDriverWait(driver, 15)
-    print("✅ WebDriver started successfully.")
-except Exception as e:
-    print(f"❌ Failed to start WebDriver: {e}")
-    exit()
-
-# --- Handle Cookie Consent ---
-driver.get("https://www.kaggle.com")
-print("Navigated to Kaggle to handle cookie consent.")
-try:
-    wait.until(EC.element_to_be_clickable((By.XPATH, "//div[text()='OK, Got it.']"))).click()
-    print("✅ Cookie consent given.")
-except TimeoutException:
-    print("⚠️ Cookie consent button not found or already handled.")
-time.sleep(1)
-
-# --- Load and Slice the Data ---
-input_path = "/Users/manikeshmakam/Endgame 2.0/ethicalAI/data/kaggle/inputs/kaggle_competitions_all_types.json"
-output_path = "/Users/manikeshmakam/Endgame 2.0/ethicalAI/data/kaggle/inputs/kaggle_competitions_final.json"
-
-try:
-    with open(input_path, "r", encoding="utf-8") as f:
-        competitions = json.load(f)
-    print(f"✅ Successfully loaded {len(competitions)} total competitions from {input_path}")
-
-    # Slice the list to process only the specified number of competitions
-    competitions = competitions[:COMPETITIONS_TO_PROCESS]
-    print(f"✅ Sliced the list to process the first {len(competitions)} competitions.")
-    print(f"Output will be written to {output_path}, overwriting if it exists.")
-
-except FileNotFoundError:
-    print(f"❌ Error: The file {input_path} was not found.")
-    driver.quit()
-    exit()
-
-# --- Main Scraping Loop ---
-total_competitions = len(competitions)
-for index, competition in enumerate(competitions):
-    competition.pop("context", None)
 
-    print(f"({index + 1}/{total_competitions}) Scraping '{competition['name']}'...")
-    
+    # --- Handle Cookie Consent ---
+    driver.get(base_url)
     try:
-        driver.get(competition['link'])
-    except Exception as e:
-        print(f"  ❌ Failed to open link: {competition['link']}. Error: {e}")
-        competition['context'] = f"Error: Failed to open link - {e}"
-        continue
+        WebDriverWait(driver, 5).until(EC.element_to_be_clickable((By.XPATH, "//div[text()='OK, Got it.']"))).click()
+    except TimeoutException:
+        print("⚠️ Cookie consent button not found or already handled.")
+    return driver
+
+def scrape_competition(driver, competition):
+    """
+    Opens a competition and returns the text of its Overview, Data and Rules tabs.
+    Raises if the page can't be opened or no tab yields content, so the pool can retry it.
+    """
+    link = competition['link']
+    wait = WebDriverWait(driver, 15)
+    with recorder.span("fetch", link):
+        driver.get(link)
 
     context_parts = []
-    
     for tab_name in TABS_TO_SCRAPE:
         try:
             tab_selector = f"a[href$='/{tab_name.lower()}']"
-            tab_button = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, tab_selector)))
-            driver.execute_script("arguments[0].click();", tab_button)
-            print(f"  - Clicked '{tab_name}' tab.")
-            
-            content_area = wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, CONTENT_AREA_SELECTOR)))
-            time.sleep(1)
-            
-            full_text = content_area.text
-            parts = re.split(r'Overview\nData\n.*?\nRules', full_text, maxsplit=1, flags=re.DOTALL)
-
-            if len(parts) > 1:
-                full_text_no_header = parts[1]  # RIGHT side of the split
-            else:
-                full_text_no_header = full_text
-            lines = full_text_no_header.split('\n')
-            filtered_lines = [line.strip() for line in lines if len(line.strip().split()) > 5]
-            processed_text = '\n'.join(lines)
-            
+            with recorder.span("wait", link, tab=tab_name):
+                tab_button = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, tab_selector)))
+                driver.execute_script("arguments[0].click();", tab_button)
+                content_area = wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, CONTENT_AREA_SELECTOR)))
+            with recorder.span("sleep", link, tab=tab_name):
+                time.sleep(1)
+
+            with recorder.span("parse", link, tab=tab_name):
+                full_text = content_area.text
+                parts = re.split(r'Overview\nData\n.*?\nRules', full_text, maxsplit=1, flags=re.DOTALL)
+
+            with recorder.span("clean", link, tab=tab_name):
+                if len(parts) > 1:
+                    full_text_no_header = parts[1]  # RIGHT side of the split
+                else:
+                    full_text_no_header = full_text
+                lines = full_text_no_header.split('\n')
+                processed_text = '\n'.join(lines)
+
             context_parts.append(f"--- {tab_name.upper()} ---\n{processed_text}")
-            print(f"  - Captured and filtered content for '{tab_name}'.")
 
         except TimeoutException:
-            print(f"  - Could not find tab or content for '{tab_name}'. Skipping.")
+            print(f"  - '{competition['name']}': could not find tab or content for '{tab_name}'. Skipping.")
         except Exception as e:
-            print(f"  - An error occurred on tab '{tab_name}': {e}")
-
-    competition['context'] = "\n\n".join(context_parts)
-
-    if (index + 1) % 10 == 0 or (index + 1) == total_competitions:
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(competitions, f, indent=4, ensure_ascii=False)
-        print(f"\n✅ Progress saved! Scraped {index + 1}/{total_competitions} competitions.\n")
+            print(f"  - '{competition['name']}': an error occurred on tab '{tab_name}': {e}")
+
+    if not context_parts:
+        raise RuntimeError("No tab content could be captured.")
+    return "\n\n".join(context_parts)
+
+def mirror_link(link, base_url=KAGGLE_URL):
+    """Points a kaggle.com link at a mirror, e.g. the local fixture server."""
+    return link if base_url == KAGGLE_URL else link.replace(KAGGLE_URL, base_url.rstrip("/"), 1)
+
+def record_result(competition, ok, value):
+    """
+    Stores a pool result on the competition: the scraped context, or an error note when
+    there is no earlier content to keep. Returns True if the content is new or changed.
+    """
+    if ok:
+        return record_fetch(competition, value)
+    if not competition.get('fingerprint'):
+        competition['context'] = f"Error: Failed to scrape - {value}"
+    return False
+
+def main(workers=DEFAULT_WORKERS, headless=True, limit=COMPETITIONS_TO_PROCESS, base_url=KAGGLE_URL,
+         input_path=INPUT_PATH, output_path=OUTPUT_PATH, retries=DEFAULT_RETRIES,
+         refresh=False, stale_after_days=STALE_AFTER_DAYS, metrics_path=METRICS_PATH):
+    # --- Load and Slice the Data ---
+    try:
+        competitions = load_records(input_path)
+        print(f"✅ Successfully loaded {len(competitions)} total competitions from {input_path}")
+    except FileNotFoundError:
+        print(f"❌ Error: The file {input_path} was not found.")
+        return
 
-print(f"\n🎉 Scraping complete! All {total_competitions} competitions processed.")
-print(f"Updated data saved to: {output_path}")
+    # Slice the list to process only the specified number of competitions
+    competitions = competitions[:limit]
+    print(f"✅ Sliced the list to process the first {len(competitions)} competitions.")
+    print(f"Output will be written to {output_path}, overwriting if it exists.")
 
-driver.quit()
\ No newline at end of file
+    if base_url != KAGGLE_URL:
+        # Point the scraper at a mirror, e.g. the local fixture server.
+        for competition in competitions:
+            competition['link'] = mirror_link(competition['link'], base_url)
+
+    # --- Carry Over Previous Results ---
+    # Earlier contexts and fingerprints let unchanged competitions be detected (and, with --refresh, skipped).
+    # The old output is streamed, keeping only the records this run will write out again.
+    if os.path.exists(output_path):
+        by_link = {competition['link']: competition for competition in competitions}
+        for old in iter_records(output_path):
+            competition = by_link.get(old.get('link'))
+            if competition is not None and old.get('fingerprint'):
+                competition['context'] = old.get('context', "")
+                competition['fingerprint'] = old['fingerprint']
+
+    if refresh:
+        to_scrape = [competition for competition in competitions if is_stale(competition, stale_after_days)]
+        print(f"♻️ {len(competitions) - len(to_scrape)} competitions are still fresh; re-scraping {len(to_scrape)} stale ones.")
+    else:
+        to_scrape = competitions
+
+    # --- Main Scraping Loop ---
+    recorder.open(metrics_path)
+    # Workers scrape concurrently; results arrive here one at a time, in input order, and each
+    # competition is written out (with any fresh ones before it) as soon as its result is in.
+    total_competitions = len(to_scrape)
+    changed_count = 0
+    position_of = {id(competition): position for position, competition in enumerate(competitions)}
+    written = 0
+
+    def write_through(end):
+        nonlocal written
+        while written < end:
+            writer.write(competitions[written])
+            competitions[written].pop('context', None)  # Written out; no need to keep it in memory.
+            written += 1
+
+    def on_result(index, competition, ok, value):
+        nonlocal changed_count
+        if record_result(competition, ok, value):
+            changed_count += 1
+            print(f"({index + 1}/{total_competitions}) ✅ Scraped '{competition['name']}'.")
+        elif ok:
+            print(f"({index + 1}/{total_competitions}) ✅ Scraped '{competition['name']}' (unchanged).")
+        elif competition.get('fingerprint'):
+            # Keep the last good context; it stays stale, so the next refresh tries again.
+            print(f"({index + 1}/{total_competitions}) ❌ Failed to re-scrape '{competition['name']}', keeping previous content: {value}")
+        else:
+            print(f"({index + 1}/{total_competitions}) ❌ Failed to scrape '{competition['name']}': {value}")
+
+        write_through(position_of[id(competition)] + 1)
+        if (index + 1) % 10 == 0:
+            print(f"\n✅ Progress: scraped {index + 1}/{total_competitions} competitions.\n")
+
+    # The new output replaces the old one when the run ends. If it is interrupted, competitions
+    # not reached yet are still written with whatever content they had before.
+    with RecordWriter(output_path, keep_partial=True) as writer:
+        try:
+            if to_scrape:
+                pool = BrowserPool(
+                    make_driver=lambda: create_driver(headless, base_url),
+                    scrape=scrape_competition,
+                    workers=workers,
+                    retries=retries,
+                )
+                print(f"🚀 Starting {min(workers, total_competitions)} browser workers.")
+                pool.run(to_scrape, on_result)
+        finally:
+            write_through(len(competitions))
+
+    print(f"\n🎉 Scraping complete! {total_competitions} competitions processed, {changed_count} with new or changed content.")
+    print(f"Updated data saved to: {output_path}")
+    recorder.print_summary()
+    recorder.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape Kaggle competition tabs with a pool of browser workers.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Number of browser workers scraping in parallel."
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=DEFAULT_RETRIES,
+        help="How many times a worker retries a competition before recording an error."
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=COMPETITIONS_TO_PROCESS,
+        help="Number of competitions to process from the start of the input file."
+    )
+    parser.add_argument(
+        "--show_browser",
+        action="store_true",
+        help="Run the browsers with a visible window instead of headless."
+    )
+    parser.add_argument(
+        "--base_url",
+        default=KAGGLE_URL,
+        help="Scrape a mirror instead of kaggle.com, e.g. the fixture server (python src/fixture_server.py) at http://127.0.0.1:8000/kaggle."
+    )
+    parser.add_argument("--input", default=INPUT_PATH, help="Competition list to read.")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="Where to write competitions with their context.")
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Only re-scrape competitions that are stale; the rest keep their previous content."
+    )
+    parser.add_argument(
+        "--stale_after_days",
+        type=int,
+        default=STALE_AFTER_DAYS,
+        help="With --refresh, re-scrape settled competitions fetched longer ago than this (active ones: daily)."
+    )
+    parser.add_argument("--metrics", default=METRICS_PATH, help="JSONL file the per-competition timing spans are appended to.")
+    args = parser.parse_args()
+
+    main(args.workers, not args.show_browser, args.limit, args.base_url, args.input, args.output, args.retries,
+         args.refresh, args.stale_after_days, args.metrics)
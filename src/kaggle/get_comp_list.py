@@ -1,133 +1,149 @@
+import argparse
 import json
 import os
 import re
-import time
-from selenium import webdriver
-from selenium.common.exceptions import (NoSuchElementException,
-                                        TimeoutException, StaleElementReferenceException)
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
-from webdriver_manager.chrome import ChromeDriverManager
-
-# 1. Configure Chrome
-options = Options()
-# options.add_argument("--headless")
-options.add_experimental_option("detach", True)
-options.add_argument("--disable-blink-features=AutomationControlled")
-
-# 2. Start Chrome
-try:
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    wait = WebDriverWait(driver, 15)
-except Exception as e:
-    print(f"❌ Failed to start WebDriver: {e}")
-    exit()
-
-# 3. Open Kaggle and Navigate
-driver.get("https://www.kaggle.com")
-print("✅ Kaggle opened successfully.")
-
-try:
-    wait.until(EC.element_to_be_clickable((By.XPATH, "//div[text()='OK, Got it.']"))).click()
-    print("✅ Cookie consent given.")
-except TimeoutException:
-    print("⚠️ Cookie consent button not found or already handled.")
-
-wait.until(EC.element_to_be_clickable((By.LINK_TEXT, "Competitions"))).click()
-print("✅ Clicked on Competitions tab.")
-
-# 6. Search for "data science"
-wait.until(EC.presence_of_element_located((By.XPATH, "//input[@placeholder='Search competitions']"))).send_keys("data science")
-print("✅ Searched for 'data science'.")
-
-
-# --- FILTERING LOGIC REMOVED ---
-# The following lines that applied the monetary filter have been removed.
-print("✅ Monetary filter skipped to include all competition types.")
-
-
-# 9. Main Extraction and Pagination Loop
-results = []
-page_number = 1
-list_container_locator = (By.CSS_SELECTOR, "ul[role='list']")
-
-while True:
-    print(f"\n--- Scraping Page {page_number} ---")
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from json_stream import write_records
+from platforms import PLATFORMS
+
+# --- 💡 Configuration ---
+KAGGLE_URL = "https://www.kaggle.com"
+LIST_ENDPOINT = "/api/v1/competitions/list"  # The paged JSON listing the Kaggle site and CLI use
+SEARCH_TERM = "data science"
+MAX_PAGES = 500          # Safety stop; the listing normally ends with an empty page long before this
+DEFAULT_WORKERS = 4      # Pages fetched in parallel
+HTTP_TIMEOUT = 15
+
+OUTPUT_PATH = PLATFORMS["kaggle"].list_file  # Repo-relative, from the registry in platforms.py
+KAGGLE_CONFIG = os.path.join(os.path.expanduser("~"), ".kaggle", "kaggle.json")
+
+
+def load_credentials():
+    """
+    Kaggle API credentials from KAGGLE_USERNAME/KAGGLE_KEY or ~/.kaggle/kaggle.json, or None.
+    """
+    if os.getenv("KAGGLE_USERNAME") and os.getenv("KAGGLE_KEY"):
+        return os.getenv("KAGGLE_USERNAME"), os.getenv("KAGGLE_KEY")
+    if os.path.exists(KAGGLE_CONFIG):
+        with open(KAGGLE_CONFIG, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        return config.get("username"), config.get("key")
+    return None
+
+
+def create_session(credentials, workers):
+    """
+    A pooled session that retries throttled or failing pages, honouring Retry-After.
+    """
+    session = requests.Session()
+    retries = Retry(total=4, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504],
+                    allowed_methods=["GET"], respect_retry_after_header=True)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(workers, 1), max_retries=retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if credentials:
+        session.auth = credentials
+    return session
+
+
+def parse_prize(reward):
+    """'$25,000' -> 25000; 'Knowledge', 'Kudos', 'Swag' and missing rewards -> 0."""
+    digits_only = re.sub(r"[^\d]", "", str(reward or ""))
+    return int(digits_only) if digits_only else 0
+
+
+def to_record(entry):
+    """
+    Maps one API listing entry to the {"name", "link", "prize"} records the detail scraper reads.
+    """
+    ref = entry.get("ref") or entry.get("url") or ""
+    link = ref if ref.startswith("http") else f"{KAGGLE_URL}/competitions/{ref.strip('/')}"
+    record = {"name": entry.get("title"), "link": link, "prize": parse_prize(entry.get("reward"))}
+    if entry.get("deadline"):
+        # Lets a --refresh of the detail scraper treat open competitions as active.
+        record["deadline"] = entry["deadline"]
+    return record
+
+
+def fetch_page(session, base_url, search, page):
+    response = session.get(f"{base_url.rstrip('/')}{LIST_ENDPOINT}",
+                           params={"page": page, "search": search}, timeout=HTTP_TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+
+def iter_competitions(session, base_url=KAGGLE_URL, search=SEARCH_TERM, workers=DEFAULT_WORKERS,
+                      max_pages=MAX_PAGES):
+    """
+    Fetches listing pages `workers` at a time and yields unique competitions in page order,
+    each page as soon as it arrives. The listing ends at the first empty page.
+    """
+    seen_links = set()
+    page = 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while page <= max_pages:
+            pages = list(range(page, min(page + workers, max_pages + 1)))
+            batch = executor.map(lambda number: fetch_page(session, base_url, search, number), pages)
+            for number, entries in zip(pages, batch):
+                if not entries:
+                    print(f"✅ Page {number} is empty. Listing complete.")
+                    return
+                added = 0
+                for entry in entries:
+                    record = to_record(entry)
+                    if record["name"] and record["link"] not in seen_links:
+                        seen_links.add(record["link"])
+                        added += 1
+                        yield record
+                print(f"--- Page {number}: {len(entries)} entries, {added} new (total {len(seen_links)}) ---")
+            page += len(pages)
+    print(f"⚠️ Stopped after {max_pages} pages.")
+
+
+def collect_competitions(session, base_url=KAGGLE_URL, search=SEARCH_TERM, workers=DEFAULT_WORKERS,
+                         max_pages=MAX_PAGES):
+    """All unique competitions of the listing, in page order."""
+    return list(iter_competitions(session, base_url, search, workers, max_pages))
+
+
+def main(base_url=KAGGLE_URL, search=SEARCH_TERM, workers=DEFAULT_WORKERS, output_path=OUTPUT_PATH,
+         max_pages=MAX_PAGES):
+    credentials = load_credentials()
+    if credentials is None and base_url == KAGGLE_URL:
+        print("❌ Kaggle API credentials not found. Set KAGGLE_USERNAME and KAGGLE_KEY or create ~/.kaggle/kaggle.json.")
+        sys.exit(1)
+
+    session = create_session(credentials, workers)
+    print(f"🔎 Listing competitions matching '{search}' from {base_url} ({workers} pages at a time).")
     try:
-        wait.until(EC.visibility_of_element_located(list_container_locator))
-        
-        # Scroll to load all items
-        li_elements = driver.find_elements(list_container_locator[0], list_container_locator[1] + " > li")
-        prev_count = 0
-        while len(li_elements) > prev_count:
-            prev_count = len(li_elements)
-            if li_elements:
-                driver.execute_script("arguments[0].scrollIntoView({block: 'end'});", li_elements[-1])
-            time.sleep(1.5)
-            li_elements = driver.find_elements(list_container_locator[0], list_container_locator[1] + " > li")
-        
-        print(f"✅ Found {len(li_elements)} competition entries on this page.")
-
-        # Loop through each competition card
-        for li_element in li_elements:
-            try:
-                link_node = li_element.find_element(By.CSS_SELECTOR, "a[href*='/competitions/']")
-                link = link_node.get_attribute("href")
-                name = link_node.get_attribute("aria-label")
-                
-                # --- MODIFIED PRIZE LOGIC ---
-                # Gracefully handle competitions without a monetary prize
-                prize = 0
-                try:
-                    prize_node = li_element.find_element(By.XPATH, ".//a/following-sibling::div//div[contains(text(), '$')]")
-                    prize_text = prize_node.text
-                    digits_only = re.sub(r"[^\d]", "", prize_text)
-                    if digits_only:
-                        prize = int(digits_only)
-                except NoSuchElementException:
-                    # This is expected for "Knowledge" competitions, prize remains 0
-                    pass
-                
-                # Add the competition to results regardless of prize amount
-                if name and link:
-                    results.append({"name": name, "link": link, "prize": prize})
-
-            except (NoSuchElementException, StaleElementReferenceException):
-                continue
-        
-        # --- DEFINITIVE PAGINATION LOGIC ---
-        try:
-            next_page_button = driver.find_element(By.CSS_SELECTOR, "button[aria-label='Go to next page']")
-            driver.execute_script("arguments[0].scrollIntoView({ behavior: 'auto', block: 'center' });", next_page_button)
-            time.sleep(0.5)
-            next_page_button.click()
-            print("✅ Navigating to next page...")
-
-            time.sleep(1)
-            wait.until(EC.url_contains(f"page={page_number + 1}"))
-            wait.until(EC.visibility_of_element_located(list_container_locator))
-            
-            page_number += 1
-
-        except (TimeoutException, NoSuchElementException):
-            print("✅ No more pages found. Scraping complete.")
-            break
-
-    except Exception as e:
-        print(f"⚠️ An error occurred on page {page_number}: {e}")
-        break
-
-# 10. Save the final results
-output_dir = "/Users/manikeshmakam/Endgame 2.0/ethicalAI/data/kaggle/inputs"
-os.makedirs(output_dir, exist_ok=True)
-output_path = os.path.join(output_dir, "kaggle_competitions_all_types.json")
-
-with open(output_path, "w", encoding="utf-8") as f:
-    json.dump(results, f, indent=4, ensure_ascii=False)
-
-print(f"\n✅ Extracted a total of {len(results)} competitions and saved to {output_path}")
-
-# driver.quit()
\ No newline at end of file
+        results = collect_competitions(session, base_url, search, workers, max_pages)
+    except requests.RequestException as e:
+        print(f"❌ Failed to fetch the competition listing: {e}")
+        sys.exit(1)
+
+    write_records(output_path, results)
+
+    print(f"\n✅ Extracted a total of {len(results)} competitions and saved to {output_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Collect the Kaggle competition list from the paged JSON listing.")
+    parser.add_argument("--search", default=SEARCH_TERM, help="Search term to filter competitions by.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Number of pages fetched in parallel.")
+    parser.add_argument("--max_pages", type=int, default=MAX_PAGES, help="Stop after this many pages.")
+    parser.add_argument(
+        "--base_url",
+        default=KAGGLE_URL,
+        help="List from a mirror instead of kaggle.com, e.g. the fixture server (python src/fixture_server.py) at http://127.0.0.1:8000/kaggle."
+    )
+    parser.add_argument("--output", default=OUTPUT_PATH, help="Where to write the competition list.")
+    args = parser.parse_args()
+
+    main(args.base_url, args.search, args.workers, args.output, args.max_pages)
@@ -0,0 +1,229 @@
+import argparse
+import asyncio
+import os
+import queue
+import threading
+import time
+
+import analysis
+from boilerplate import BoilerplateDetector
+from browser_pool import DEFAULT_WORKERS
+from fingerprints import STALE_AFTER_DAYS, is_stale
+from json_stream import RecordWriter, iter_records
+from metrics import recorder
+from platforms import PLATFORMS
+
+# --- Configuration ---
+DEFAULT_PLATFORM = "kaggle"
+QUEUE_SIZE = 32  # Competitions buffered between two stages; when full, the earlier stage waits
+POLL_SECONDS = 1.0
+
+DONE = object()  # Sent downstream when a stage has no more competitions
+
+
+def iter_queue(source):
+    """Yields competitions from a stage's output queue until that stage is done."""
+    while True:
+        item = source.get()
+        if item is DONE:
+            return
+        yield item
+
+
+class Stage(threading.Thread):
+    """
+    Runs one pipeline stage in a background thread. `work(emit)` passes each finished
+    competition to `emit`, which blocks while the next stage is `QUEUE_SIZE` behind.
+    DONE always follows, even if the stage fails, so later stages finish with what they got.
+    """
+
+    def __init__(self, name, work, output):
+        super().__init__(name=name, daemon=True)
+        self.work = work
+        self.output = output
+        self.started_at = None
+        self.finished_at = None
+
+    def run(self):
+        self.started_at = time.monotonic()
+        try:
+            self.work(self.output.put)
+        except Exception as e:
+            print(f"❌ {self.name} stage failed: {e}")
+        finally:
+            self.finished_at = time.monotonic()
+            self.output.put(DONE)
+
+
+def main(platform_name=DEFAULT_PLATFORM, limit=0, workers=DEFAULT_WORKERS, show_browser=False, base_url=None,
+         refresh=False, stale_after_days=STALE_AFTER_DAYS, queue_size=QUEUE_SIZE, fresh=False,
+         concurrency=analysis.DEFAULT_CONCURRENCY, requests_per_minute=analysis.DEFAULT_REQUESTS_PER_MINUTE,
+         tokens_per_minute=analysis.DEFAULT_TOKENS_PER_MINUTE, use_cache=True,
+         context_tokens=analysis.DEFAULT_CONTEXT_TOKENS, parquet=False, backend="gemini", metrics_file=None,
+         adaptive=True, max_requests_per_minute=analysis.DEFAULT_MAX_REQUESTS_PER_MINUTE, local_rules=False):
+    """
+    Runs list → details → analysis → export for one platform. The stages run at the same
+    time, connected by bounded queues: a competition is analyzed as soon as it is scraped,
+    so a run takes about as long as its slowest stage rather than the sum of all of them.
+    Timing spans from every stage go to `metrics_file` (default: platform.metrics_file).
+    """
+    platform = PLATFORMS[platform_name]
+    options = argparse.Namespace(workers=workers, show_browser=show_browser, base_url=base_url)
+    started = time.monotonic()
+    print(f"🚀 Running the {platform.label} pipeline: list → details → analysis → export.")
+
+    # --- Previous Scrape ---
+    # Earlier contexts and fingerprints detect unchanged competitions (and, with --refresh, skip
+    # fresh ones). They are also the corpus the boilerplate detector learns from.
+    previous = {}
+    if os.path.exists(platform.details_file):
+        for competition in iter_records(platform.details_file):
+            previous[competition.get("link")] = competition
+        print(f"✅ Loaded {len(previous)} previously scraped competitions from {platform.details_file}")
+    boilerplate = None
+    if previous and context_tokens and context_tokens > 0:
+        boilerplate = BoilerplateDetector.from_contexts(competition.get("context", "") for competition in previous.values())
+
+    run = analysis.AnalysisRun(platform, fresh, concurrency, requests_per_minute, tokens_per_minute,
+                               use_cache, context_tokens, parquet, backend, adaptive, max_requests_per_minute, local_rules)
+    if not run.open():
+        return
+    recorder.open(metrics_file or platform.metrics_file)
+
+    listed = queue.Queue(maxsize=queue_size)
+    scraped = queue.Queue(maxsize=queue_size)
+
+    # --- List Stage ---
+    def list_competitions(emit):
+        for count, competition in enumerate(platform.list_competitions(options), 1):
+            emit(competition)
+            if limit and limit > 0 and count >= limit:
+                print(f"🟡 Limiting this run to {count} competitions.")
+                break
+
+    # --- Details Stage ---
+    def scrape_details(emit):
+        def to_scrape():
+            for competition in iter_queue(listed):
+                old = previous.get(competition.get("link"))
+                if old is not None and old.get("fingerprint"):
+                    competition["context"] = old.get("context", "")
+                    competition["fingerprint"] = old["fingerprint"]
+                    if not competition.get("name"):
+                        competition["name"] = old.get("name")
+                if refresh and not is_stale(competition, stale_after_days):
+                    print(f"♻️ '{competition.get('name') or competition['link']}' is still fresh. Keeping it.")
+                    emit(competition)
+                else:
+                    yield competition
+
+        platform.scrape_details(to_scrape(), emit, options)
+
+    stages = [Stage("List", list_competitions, listed), Stage("Details", scrape_details, scraped)]
+    for stage in stages:
+        stage.start()
+
+    # --- Analysis Stage ---
+    # Runs here, on the event loop. Every scraped competition is written to the details file
+    # and, unless its analysis is already up to date, queued for the model.
+    seen_links = set()
+    skipped = 0
+    analysis_started = None
+
+    async def arriving():
+        nonlocal skipped, analysis_started
+        loop = asyncio.get_running_loop()
+        index = 0
+        while True:
+            try:
+                competition = await loop.run_in_executor(None, scraped.get, True, POLL_SECONDS)
+            except queue.Empty:
+                continue
+            if competition is DONE:
+                return
+            writer.write(competition)
+            seen_links.add(competition.get("link"))
+            context = competition.get("context") or ""
+            if not context or context.startswith("Error:") or not run.needs_analysis(competition):
+                skipped += 1
+                continue
+            if analysis_started is None:
+                analysis_started = time.monotonic()
+            entry = (index, competition)
+            index += 1
+            run.compress(entry, boilerplate)
+            yield entry
+
+    # The details file is replaced when the run ends. Competitions this run did not reach
+    # (or that were interrupted) keep their previous content.
+    with RecordWriter(platform.details_file, keep_partial=True) as writer:
+        try:
+            failures = asyncio.run(run.run(arriving()))
+        finally:
+            writer.write_all(competition for link, competition in previous.items() if link not in seen_links)
+    analysis_finished = time.monotonic()
+    print(f"\n✅ Saved {len(seen_links)} scraped competitions to {platform.details_file} ({skipped} needed no new analysis).")
+
+    # --- Export Stage ---
+    run.close(failures)
+
+    # A stage blocked behind a failed one never finishes; leave it out.
+    timings = [(stage.name, stage.finished_at - stage.started_at) for stage in stages if stage.finished_at is not None]
+    if analysis_started is not None:
+        timings.append(("Analysis", analysis_finished - analysis_started))
+    summary = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in timings)
+    print(f"⏱️ {summary}; end to end {time.monotonic() - started:.1f}s "
+          f"(back to back: {sum(seconds for _, seconds in timings):.1f}s).")
+    recorder.print_summary()
+    recorder.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the full pipeline (list → details → analysis → export) for one platform.")
+    parser.add_argument("--platform", choices=sorted(PLATFORMS), default=DEFAULT_PLATFORM, help="Competition platform to run.")
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=0,
+        help="Only take this many competitions from the listing. 0 means all."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Number of browser workers scraping in parallel (Kaggle)."
+    )
+    parser.add_argument(
+        "--show_browser",
+        action="store_true",
+        help="Run the browsers with a visible window instead of headless."
+    )
+    parser.add_argument(
+        "--base_url",
+        help="List and scrape a mirror instead of kaggle.com, e.g. the fixture server (python src/fixture_server.py) at http://127.0.0.1:8000/kaggle."
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Only re-scrape competitions that are stale; the rest keep their previous content."
+    )
+    parser.add_argument(
+        "--stale_after_days",
+        type=int,
+        default=STALE_AFTER_DAYS,
+        help="With --refresh, re-scrape settled competitions fetched longer ago than this (active ones: daily)."
+    )
+    parser.add_argument(
+        "--queue_size",
+        type=int,
+        default=QUEUE_SIZE,
+        help="Competitions buffered between two stages before the earlier one waits."
+    )
+    analysis.add_arguments(parser)
+    args = parser.parse_args()
+
+    main(args.platform, args.limit, args.workers, args.show_browser, args.base_url, args.refresh,
+         args.stale_after_days, args.queue_size, args.fresh, args.concurrency, args.rpm, args.tpm,
+         use_cache=not args.no_cache, context_tokens=args.context_tokens, parquet=args.parquet,
+         backend=args.backend, metrics_file=args.metrics, adaptive=not args.fixed_rate,
+         max_requests_per_minute=args.max_rpm, local_rules=args.local_rules)
@@ -0,0 +1,103 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# --- Summary ---
+TOKEN_FIELDS = ["prompt_tokens", "response_tokens"]
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[round(fraction * (len(ordered) - 1))]
+
+
+class Metrics:
+    """
+    Per-stage timings for one run. Each timed step is a span
+    {"run", "stage", "competition", "seconds", ...extra fields} appended to a JSONL file,
+    and counters (retries, cache hits, ...) are kept for the end-of-run summary.
+    Safe to use from the scraper threads and the analysis event loop alike.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.file = None
+        self.path = None
+        self.run_id = None
+        self.reset()
+
+    def reset(self):
+        self.durations = defaultdict(list)
+        self.token_totals = defaultdict(lambda: defaultdict(int))
+        self.counters = defaultdict(int)
+
+    def open(self, path=None):
+        """Starts a new run. With a `path`, spans are appended to that JSONL file."""
+        self.close()
+        self.reset()
+        self.run_id = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.path = path
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.file = open(path, "a", encoding="utf-8")
+
+    def record(self, stage, seconds, competition=None, **fields):
+        span = {"run": self.run_id, "stage": stage, "competition": competition, "seconds": round(seconds, 4)}
+        span.update(fields)
+        with self.lock:
+            self.durations[stage].append(seconds)
+            for field in TOKEN_FIELDS:
+                self.token_totals[stage][field] += fields.get(field) or 0
+            if self.file is not None:
+                self.file.write(json.dumps(span, ensure_ascii=False) + "\n")
+
+    @contextmanager
+    def span(self, stage, competition=None, **fields):
+        """
+        Times the block as one span. Fields set on the yielded dict inside the block (e.g.
+        token counts) are recorded with it; a block that raises is recorded with its error.
+        """
+        started = time.perf_counter()
+        try:
+            yield fields
+        except BaseException as e:
+            fields["error"] = type(e).__name__
+            raise
+        finally:
+            self.record(stage, time.perf_counter() - started, competition, **fields)
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def print_summary(self):
+        """Prints where the time (and the tokens) went, stage by stage."""
+        with self.lock:
+            stages = sorted(self.durations.items(), key=lambda item: sum(item[1]), reverse=True)
+            if not stages and not self.counters:
+                return
+            print("\n📈 Where the time went (seconds are summed over parallel workers):")
+            print(f"  {'stage':<14}{'spans':>7}{'total s':>10}{'mean s':>9}{'p95 s':>8}{'prompt tok':>12}{'response tok':>14}")
+            for stage, durations in stages:
+                tokens = self.token_totals[stage]
+                print(f"  {stage:<14}{len(durations):>7}{sum(durations):>10.1f}{sum(durations) / len(durations):>9.2f}"
+                      f"{percentile(durations, 0.95):>8.2f}{tokens['prompt_tokens']:>12,}{tokens['response_tokens']:>14,}")
+            if self.counters:
+                print("  " + " · ".join(f"{name}: {value}" for name, value in sorted(self.counters.items())))
+        if self.path:
+            print(f"  Spans saved to {self.path}")
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+# Shared by every module of a run; scripts call recorder.open(...) at start and print_summary() at the end.
+recorder = Metrics()
@@ -0,0 +1,152 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from collections import deque
+
+try:
+    import google.generativeai as genai
+except ImportError:  # Only the "gemini" backend needs the client library.
+    genai = None
+
+from analysis_engine import estimate_tokens
+from batching import NAME_KEY
+from response_schema import ANSWER_KEYS
+
+# --- Backends ---
+BACKENDS = ["gemini", "stub"]  # "stub" answers locally: no API key, no quota
+
+STUB_CATEGORIES = ["healthcare", "finance", "nlp", "computer vision", "robotics", "climate", "games"]
+BATCH_HEADER_PATTERN = re.compile(r"^=== COMPETITION: (.+?) ===$", re.MULTILINE)
+SINGLE_HEADER_PATTERN = re.compile(r"^Here is the context for the competition '.*?':\n\n", re.DOTALL)
+
+
+class RateLimitExceeded(Exception):
+    """Mimics the provider's 429 error so the engine's backoff path can be exercised locally."""
+    code = 429
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class StubServerError(Exception):
+    """Mimics a transient provider failure (a 500), which the engine retries as an ordinary error."""
+    code = 500
+
+
+class MissingAPIKey(Exception):
+    pass
+
+
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+def stub_analysis(context):
+    """
+    A schema-valid analysis whose answers depend only on the text (via its hash), so the
+    same context always gets the same answer. About one answer in four is "yes".
+    """
+    context = context.strip()
+    digest = hashlib.blake2b(context.encode("utf-8"), digest_size=8).digest()
+    quote = " ".join(context.split()[:12])
+    analysis = {"category": STUB_CATEGORIES[digest[0] % len(STUB_CATEGORIES)]}
+    for position, (flag_key, how_key) in enumerate(ANSWER_KEYS, 1):
+        if digest[position] % 4 == 0:
+            analysis[flag_key] = "yes"
+            analysis[how_key] = f'Stub answer quoting the context: "{quote}"'
+        else:
+            analysis[flag_key] = "no"
+            analysis[how_key] = "n/a - Accuracy" if flag_key == "data_explainability" else "n/a"
+    return analysis
+
+
+def malformed_answer(analysis):
+    """
+    The analysis the way models sometimes send it: in a code fence with chatter around it,
+    capitalized answers, and the evaluation metric missing from a "no" explainability answer.
+    """
+    analysis = {key: value.capitalize() if value in ("yes", "no") else value for key, value in analysis.items()}
+    if analysis["data_explainability"] == "No":
+        analysis["how_explainability"] = "n/a"
+    return f"Here is the analysis:\n```json\n{json.dumps(analysis, indent=2)}\n```\nLet me know if you need anything else."
+
+
+class StubModel:
+    """
+    A local stand-in for `genai.GenerativeModel` that never leaves the machine.
+    It answers single and batch prompts with schema-valid JSON (see stub_analysis), after a
+    random latency (plus `seconds_per_1k_tokens` of prompt, so big batches are slower),
+    and fails with a 429 or a 500 at the given rates. Latencies and failures come from a
+    seeded generator, so a run can be repeated exactly.
+    With `requests_per_minute`, it also enforces a provider-style quota: calls beyond it in
+    any 60 s window get a 429 carrying a Retry-After hint. `defect_rate` is the share of
+    single answers sent back with the defects real models produce (see malformed_answer).
+    """
+
+    def __init__(self, latency=(0.2, 0.8), rate_limit_error_rate=0.1, error_rate=0.0, seed=None,
+                 seconds_per_1k_tokens=0.0, requests_per_minute=None, defect_rate=0.0):
+        self.latency = latency
+        self.seconds_per_1k_tokens = seconds_per_1k_tokens
+        self.rate_limit_error_rate = rate_limit_error_rate
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.calls = 0
+        self.requests_per_minute = requests_per_minute
+        self.defect_rate = defect_rate
+        self.recent_calls = deque()  # Start times of the accepted calls in the last minute
+
+    async def generate_content_async(self, contents):
+        self.calls += 1
+        if self.requests_per_minute:
+            now = time.monotonic()
+            while self.recent_calls and now - self.recent_calls[0] >= 60:
+                self.recent_calls.popleft()
+            if len(self.recent_calls) >= self.requests_per_minute:
+                retry_after = 60 - (now - self.recent_calls[0])
+                raise RateLimitExceeded(f"429 Quota exceeded. Please retry in {retry_after:.1f}s.", retry_after)
+            self.recent_calls.append(now)
+        prompt = contents[-1]
+        delay = self.random.uniform(*self.latency) + estimate_tokens(prompt) / 1000 * self.seconds_per_1k_tokens
+        roll = self.random.random()
+        await asyncio.sleep(delay)
+        if roll < self.rate_limit_error_rate:
+            raise RateLimitExceeded("429 Resource has been exhausted (e.g. check quota).")
+        if roll < self.rate_limit_error_rate + self.error_rate:
+            raise StubServerError("500 An internal error has occurred.")
+
+        headers = list(BATCH_HEADER_PATTERN.finditer(prompt))
+        if not headers:
+            header = SINGLE_HEADER_PATTERN.match(prompt)
+            analysis = stub_analysis(prompt[header.end():] if header else prompt)
+            if self.defect_rate and self.random.random() < self.defect_rate:
+                return StubResponse(malformed_answer(analysis))
+            return StubResponse(json.dumps(analysis))
+        answers = []
+        for i, header in enumerate(headers):
+            end = headers[i + 1].start() if i + 1 < len(headers) else len(prompt)
+            answers.append(dict({NAME_KEY: header.group(1)}, **stub_analysis(prompt[header.end():end])))
+        return StubResponse(json.dumps(answers))
+
+
+def create_model(backend, model_name, **options):
+    """
+    Returns the model the analyzers call `generate_content_async(contents)` on.
+    "gemini" needs the google-generativeai package and GOOGLE_API_KEY (MissingAPIKey
+    otherwise); "stub" takes StubModel's options.
+    """
+    if backend == "stub":
+        return StubModel(**options)
+    if backend == "gemini":
+        if genai is None:
+            raise ImportError("The Gemini backend needs google-generativeai (pip install google-generativeai).")
+        if not os.getenv("GOOGLE_API_KEY"):
+            raise MissingAPIKey("GOOGLE_API_KEY environment variable not found.")
+        genai.configure(api_key=os.environ["GOOGLE_API_KEY"])
+        return genai.GenerativeModel(model_name, generation_config={"response_mime_type": "application/json"})
+    raise ValueError(f"Unknown model backend '{backend}'. Choose from: {', '.join(BACKENDS)}.")
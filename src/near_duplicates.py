@@ -0,0 +1,206 @@
+import argparse
+import json
+import os
+import re
+import time
+import zlib
+from collections import defaultdict
+
+from boilerplate import BoilerplateDetector
+from json_stream import load_records
+from platforms import PLATFORMS
+
+# --- MinHash / LSH ---
+SHINGLE_WORDS = 5        # Words per shingle
+NUM_HASHES = 128         # MinHash signature length
+BANDS = 16               # 16 bands of 8 hashes: pairs above ~0.7 Jaccard almost always share a band
+ROWS = NUM_HASHES // BANDS
+BIN_RANGE = 2 ** 32 // NUM_HASHES  # Values a bin can hold (shingle hashes are 32-bit)
+# Estimated Jaccard similarity of two near-duplicates. Reposts and yearly reruns score 0.9 and up;
+# different tasks of one challenge (e.g. ImageCLEF Coral annotation vs. pixel-wise parsing) score about 0.85.
+DEFAULT_THRESHOLD = 0.9
+MIN_SHINGLES = 20        # Shorter contexts (error pages, empty tabs) are never clustered
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def shingles(text):
+    """Hashes of every run of SHINGLE_WORDS consecutive lower-cased words."""
+    words = WORD_PATTERN.findall(text.lower())
+    return {zlib.crc32(" ".join(words[i:i + SHINGLE_WORDS]).encode("utf-8")) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def signature(shingle_hashes):
+    """
+    MinHash signature by one-permutation hashing: each shingle hash falls into one of
+    NUM_HASHES bins by its low bits and each bin keeps its smallest value, so a context is
+    hashed once instead of NUM_HASHES times. An empty bin takes the next non-empty bin's
+    value offset by the distance (rotation densification), so it still only agrees with the
+    same bin of a similar set.
+    """
+    bins = [None] * NUM_HASHES
+    for value in shingle_hashes:
+        index, rest = value % NUM_HASHES, value // NUM_HASHES
+        if bins[index] is None or rest < bins[index]:
+            bins[index] = rest
+    filled = list(bins)
+    if not shingle_hashes:
+        return tuple(filled)
+    for index in range(NUM_HASHES):
+        distance = 1
+        while filled[index] is None:
+            source = bins[(index + distance) % NUM_HASHES]
+            if source is not None:
+                filled[index] = source + distance * BIN_RANGE
+            distance += 1
+    return tuple(filled)
+
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of two signatures: the share of equal positions."""
+    return sum(a == b for a, b in zip(first, second)) / NUM_HASHES
+
+
+class NearDuplicateIndex:
+    """
+    Locality-sensitive hashing over MinHash signatures. A signature is cut into BANDS bands;
+    competitions sharing any band are candidates, and candidates whose estimated similarity
+    reaches `threshold` are joined into one cluster (union-find). Each add costs about the
+    number of true neighbours, not the number of competitions already added. Clusters are
+    connected, not all-pairs similar: pick_representatives() splits them into stars.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.signatures = {}
+        self.buckets = defaultdict(list)
+        self.parent = {}
+        self.order = []
+        self.compared = 0
+
+    def find(self, key):
+        while self.parent[key] != key:
+            self.parent[key] = self.parent[self.parent[key]]
+            key = self.parent[key]
+        return key
+
+    def add(self, key, text):
+        """Adds a competition's context. Returns [(other key, similarity)] of its near-duplicates so far."""
+        hashes = shingles(text)
+        if len(hashes) < MIN_SHINGLES or key in self.signatures:
+            return []
+        own = signature(hashes)
+        candidates = set()
+        for band in range(BANDS):
+            bucket = self.buckets[(band, own[band * ROWS:(band + 1) * ROWS])]
+            candidates.update(bucket)
+            bucket.append(key)
+
+        self.signatures[key] = own
+        self.parent[key] = key
+        self.order.append(key)
+        matches = []
+        for other in candidates:
+            self.compared += 1
+            score = similarity(own, self.signatures[other])
+            if score >= self.threshold:
+                matches.append((other, score))
+                self.parent[self.find(key)] = self.find(other)
+        return matches
+
+    def clusters(self):
+        """Clusters of two or more competitions, each in the order they were added."""
+        groups = defaultdict(list)
+        for key in self.order:
+            groups[self.find(key)].append(key)
+        return [group for group in groups.values() if len(group) > 1]
+
+    def similarity(self, first, second):
+        return similarity(self.signatures[first], self.signatures[second])
+
+
+def build_index(competitions, threshold=DEFAULT_THRESHOLD, boilerplate=None, index=None):
+    """
+    A NearDuplicateIndex over competitions ({"link", "context"}), keyed by link, or `index`
+    with them added. Text shared by a large share of the platform's pages (`boilerplate`) is
+    stripped first, so common rules or footers alone don't make two competitions look alike.
+    """
+    index = index or NearDuplicateIndex(threshold)
+    for competition in competitions:
+        context = competition.get("context") or ""
+        if competition.get("link") and context and not context.startswith("Error:"):
+            index.add(competition["link"], boilerplate.strip(context) if boilerplate is not None else context)
+    return index
+
+
+def pick_representatives(index, prefer=lambda link: False):
+    """
+    {member link: (representative link, similarity)} for competitions that can reuse another's
+    analysis. Each cluster is split into stars: a representative (the first one `prefer`s, e.g.
+    already analyzed, else the first in input order) takes the members that are themselves at
+    least `index.threshold` similar to it, and the rest form stars of their own. A chain of
+    similar pages therefore never hands a result to one that is not similar to its source.
+    """
+    derived = {}
+    for cluster in index.clusters():
+        remaining = cluster
+        while len(remaining) > 1:
+            representative = next((link for link in remaining if prefer(link)), remaining[0])
+            rest = []
+            for link in remaining:
+                if link == representative:
+                    continue
+                score = index.similarity(link, representative)
+                if score >= index.threshold:
+                    derived[link] = (representative, score)
+                else:
+                    rest.append(link)
+            remaining = rest
+    return derived
+
+
+def main(args):
+    started = time.monotonic()
+    names = {}
+    index = NearDuplicateIndex(args.threshold)
+    for name in args.platforms:
+        platform = PLATFORMS[name]
+        if not os.path.exists(platform.details_file):
+            print(f"⚠️ No scraped {platform.label} competitions at {platform.details_file}; skipping.")
+            continue
+        competitions = load_records(platform.details_file)
+        names.update({c.get("link"): c.get("name") or c.get("link") for c in competitions})
+        # Boilerplate is per platform: each site has its own page chrome and rules text.
+        boilerplate = BoilerplateDetector.from_contexts(c.get("context", "") for c in competitions)
+        build_index(competitions, boilerplate=boilerplate, index=index)
+    elapsed = time.monotonic() - started
+
+    groups = defaultdict(list)  # representative -> [(member, similarity)]
+    for link, (representative, score) in pick_representatives(index).items():
+        groups[representative].append((link, score))
+    total = len(index.signatures)
+    print(f"🧬 {total} competitions ({', '.join(args.platforms)}): {len(groups)} near-duplicate groups, "
+          f"{sum(len(members) for members in groups.values())} competitions that could reuse a representative's analysis.")
+    print(f"   {index.compared:,} candidate pairs compared instead of {total * (total - 1) // 2:,}, in {elapsed:.1f}s.")
+    for representative, members in sorted(groups.items(), key=lambda item: len(item[1]), reverse=True)[:args.show]:
+        print(f"\n  {len(members) + 1} × {names[representative]}")
+        print(f"    1.00  {representative}")
+        for link, score in members:
+            print(f"    {score:.2f}  {link}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump([[{"url": representative, "name": names[representative], "similarity": 1.0}]
+                       + [{"url": link, "name": names[link], "similarity": round(score, 3)} for link, score in members]
+                       for representative, members in groups.items()], f, indent=4, ensure_ascii=False)
+        print(f"✅ Clusters saved to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find near-duplicate competitions (reposts, multi-round challenges) with MinHash and LSH.")
+    parser.add_argument("--platforms", nargs="+", choices=sorted(PLATFORMS), default=sorted(PLATFORMS),
+                        help="Scraped competitions to cluster; several platforms are clustered together.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Estimated Jaccard similarity of near-duplicates.")
+    parser.add_argument("--show", type=int, default=10, help="Number of the largest clusters to print.")
+    parser.add_argument("--output", help="Also write every cluster as JSON to this file.")
+    main(parser.parse_args())
@@ -0,0 +1,144 @@
+import importlib.util
+import os
+import sys
+import threading
+
+from browser_pool import BrowserPool
+from json_stream import load_records
+
+# --- Configuration ---
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(os.path.dirname(SRC_DIR), "data")
+PARQUET_DIR = os.path.join(DATA_DIR, "results", "parquet")  # Shared by all platforms
+SEMANTIC_INDEX_DIR = os.path.join(DATA_DIR, "results", "semantic_index")  # Also shared: one search over every platform
+
+# The pipeline's list and details stages may load the same script at the same time.
+_load_lock = threading.Lock()
+
+
+class Platform:
+    """
+    Where one competition site's files live and how to run its pipeline stages.
+
+    `list_competitions(options)` yields competition records ({"link", ...}) as the listing
+    is read. `scrape_details(competitions, emit, options)` scrapes the competitions it is
+    handed (a generator fed by the list stage) and passes each finished record to `emit`.
+    """
+
+    def __init__(self, name, label, list_file, details_file, list_competitions, scrape_details):
+        self.name = name
+        self.label = label
+        self.list_file = list_file
+        self.details_file = details_file
+        self.results_file = os.path.join(DATA_DIR, name, "results", "ethical_analysis.json")
+        self.csv_file = os.path.splitext(self.results_file)[0] + ".csv"
+        self.cache_file = os.path.join(os.path.dirname(self.results_file), "llm_cache.sqlite")
+        self.metrics_file = os.path.join(os.path.dirname(self.results_file), "metrics.jsonl")
+        self.rate_state_file = os.path.join(os.path.dirname(self.results_file), "rate_limits.json")
+        self.list_competitions = list_competitions
+        self.scrape_details = scrape_details
+
+    def results_file_for(self, backend):
+        """
+        Where `backend`'s analyses go: Gemini's to results_file, the fake answers of other
+        backends next to it (e.g. ethical_analysis.stub.json), so they never mix with real ones.
+        """
+        if backend == "gemini":
+            return self.results_file
+        stem, extension = os.path.splitext(self.results_file)
+        return f"{stem}.{backend}{extension}"
+
+
+PLATFORMS = {}
+
+
+def register(platform):
+    PLATFORMS[platform.name] = platform
+    return platform
+
+
+def load_script(platform_name, script):
+    """
+    Imports src/<platform>/<script>.py. The platform folders hold scripts rather than
+    packages, and both have a get_comp_details.py, so they are loaded by path.
+    """
+    module_name = f"{platform_name}_{script}"
+    with _load_lock:
+        if module_name not in sys.modules:
+            spec = importlib.util.spec_from_file_location(module_name, os.path.join(SRC_DIR, platform_name, script + ".py"))
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            spec.loader.exec_module(module)
+        return sys.modules[module_name]
+
+
+# --- Kaggle: paged JSON listing, then a pool of browsers for the tabs ---
+def list_kaggle(options):
+    get_comp_list = load_script("kaggle", "get_comp_list")
+    base_url = options.base_url or get_comp_list.KAGGLE_URL
+    credentials = get_comp_list.load_credentials()
+    if credentials is None and base_url == get_comp_list.KAGGLE_URL:
+        raise RuntimeError("Kaggle API credentials not found. Set KAGGLE_USERNAME and KAGGLE_KEY or create ~/.kaggle/kaggle.json.")
+
+    get_comp_details = load_script("kaggle", "get_comp_details")
+    session = get_comp_list.create_session(credentials, get_comp_list.DEFAULT_WORKERS)
+    for competition in get_comp_list.iter_competitions(session, base_url):
+        # Link to the pages the details stage will actually open (a mirror, if one is used).
+        competition["link"] = get_comp_details.mirror_link(competition["link"], base_url)
+        yield competition
+
+
+def scrape_kaggle(competitions, emit, options):
+    get_comp_details = load_script("kaggle", "get_comp_details")
+    base_url = options.base_url or get_comp_details.KAGGLE_URL
+
+    def on_result(index, competition, ok, value):
+        get_comp_details.record_result(competition, ok, value)
+        if ok:
+            print(f"({index + 1}) ✅ Scraped '{competition['name']}'.")
+        else:
+            print(f"({index + 1}) ❌ Failed to scrape '{competition['name']}': {value}")
+        emit(competition)
+
+    pool = BrowserPool(
+        make_driver=lambda: get_comp_details.create_driver(not options.show_browser, base_url),
+        scrape=get_comp_details.scrape_competition,
+        workers=options.workers,
+    )
+    pool.run(competitions, on_result)
+
+
+# --- AIcrowd: curated URL list, then plain HTTP with a browser fallback ---
+def list_aicrowd(options):
+    get_comp_details = load_script("aicrowd", "get_comp_details")
+    base_url = options.base_url or get_comp_details.AICROWD_URL
+    for competition in get_comp_details.deduplicate_urls(load_records(PLATFORMS["aicrowd"].list_file)):
+        yield {"link": get_comp_details.mirror_link(competition.get("link", ""), base_url)}
+
+
+def scrape_aicrowd(competitions, emit, options):
+    get_comp_details = load_script("aicrowd", "get_comp_details")
+    session = get_comp_details.create_http_session()
+    try:
+        for index, competition in enumerate(competitions):
+            scraped, _ = get_comp_details.scrape_competition(session, competition, index)
+            if scraped is not None:
+                emit(scraped)
+    finally:
+        get_comp_details.quit_driver()
+
+
+register(Platform(
+    "kaggle", "Kaggle",
+    list_file=os.path.join(DATA_DIR, "kaggle", "inputs", "kaggle_competitions_all_types.json"),
+    details_file=os.path.join(DATA_DIR, "kaggle", "inputs", "kaggle_competitions_final.json"),
+    list_competitions=list_kaggle,
+    scrape_details=scrape_kaggle,
+))
+register(Platform(
+    "aicrowd", "AIcrowd",
+    list_file=os.path.join(DATA_DIR, "aicrowd", "inputs", "extracted_urls.json"),
+    details_file=os.path.join(DATA_DIR, "aicrowd", "inputs", "aicrowd_competitions_final.json"),
+    list_competitions=list_aicrowd,
+    scrape_details=scrape_aicrowd,
+))
@@ -0,0 +1,174 @@
+import argparse
+import os
+import sys
+from collections import defaultdict, deque
+
+from json_stream import iter_records
+from response_schema import HOW_KEY_OF
+
+# --- Keyword Rules ---
+# Terms from the definitions in prompts.SYSTEM_PROMPT. A trailing "*" matches any word
+# starting with the term ("anonymi*" → anonymized, anonymisation); other terms match whole words.
+
+# Only phrases naming a kind of competition: "Getting Started" alone is also a common section header.
+TOY_TERMS = ["playground series", "playground competition", "playground prediction competition", "kaggle playground",
+             "getting started competition", "getting started prediction competition", "kudos",
+             "does not award points or medals", "for learning purposes", "educational purposes"]
+
+# Flags that are "no" when none of their terms appear anywhere in the context.
+ABSENT_MEANS_NO = {
+    "red_team": ["red team*", "red-team*", "adversarial*", "jailbreak*", "attack*", "vulnerab*", "stress test*",
+                 "stress-test*", "harmful", "harms", "exploit*", "robustness", "prompt injection", "safety"],
+    "fairness_bias_mentioned": ["fairness", "fair", "unfair*", "bias*", "unbiased", "discriminat*", "equitab*",
+                                "equity", "demographic*", "underrepresent*", "under-represent*", "protected attribute*"],
+    "data_privacy": ["privacy", "private", "anonymi*", "anonymous*", "pseudonymi*", "personal data", "personal information",
+                     "personally identifiable", "pii", "gdpr", "hipaa", "de-identif*", "deidentif*", "confidential*",
+                     "sensitive data", "consent"],
+}
+
+# Listed prize money (from get_comp_list.py's "prize") that settles `toy` without the model.
+NO_PRIZE = 0
+SIGNIFICANT_PRIZE = 10_000
+
+SNIPPET_CHARS = 120  # Quoted around a keyword match in a local "yes" explanation
+
+
+class KeywordIndex:
+    """
+    Aho-Corasick automaton over many labelled patterns: one pass over a text finds every
+    occurrence of every pattern, however many there are. Matching is case-insensitive.
+    """
+
+    def __init__(self, patterns_by_label):
+        self.goto = [{}]
+        self.fail = [0]
+        self.outputs = [[]]
+        for label, patterns in patterns_by_label.items():
+            for pattern in patterns:
+                word = pattern.rstrip("*").lower()
+                node = 0
+                for char in word:
+                    if char not in self.goto[node]:
+                        self.goto[node][char] = len(self.goto)
+                        self.goto.append({})
+                        self.fail.append(0)
+                        self.outputs.append([])
+                    node = self.goto[node][char]
+                self.outputs[node].append((label, word, pattern.endswith("*")))
+
+        # Failure links, breadth first: the longest proper suffix that is also a trie path.
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.outputs[child] = self.outputs[child] + self.outputs[self.fail[child]]
+
+    def find(self, text):
+        """Returns {label: [(term, position), ...]} for every match that respects word boundaries."""
+        text = " ".join(text.split()).lower()
+        found = defaultdict(list)
+        node = 0
+        for end, char in enumerate(text):
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            for label, word, is_prefix in self.outputs[node]:
+                start = end - len(word) + 1
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if not is_prefix and end + 1 < len(text) and text[end + 1].isalnum():
+                    continue
+                found[label].append((word, start))
+        return found
+
+
+# Compiled once; shared by every competition of a run.
+INDEX = KeywordIndex(dict({"toy": TOY_TERMS}, **ABSENT_MEANS_NO))
+
+
+def snippet(text, position):
+    text = " ".join(text.split())
+    start = max(0, position - SNIPPET_CHARS // 2)
+    return text[start:start + SNIPPET_CHARS].strip()
+
+
+def preclassify(competition):
+    """
+    Decides the fields keywords and the listing settle with high confidence. Returns
+    {key: value} with each decided flag and its how key; everything else is left to the model.
+    - toy: "yes" for Playground/Getting Started competition wording or no prize money, "no" for a prize
+      of SIGNIFICANT_PRIZE or more;
+    - red_team, fairness_bias_mentioned, data_privacy: "no" when none of their terms occur.
+    """
+    context = competition.get("context") or ""
+    matches = INDEX.find(context)
+    decided = {}
+
+    prize = competition.get("prize")
+    if matches.get("toy"):
+        term, position = matches["toy"][0]
+        decided["toy"] = "yes"
+        decided["how_toy"] = f'Local rule: the context mentions "{term}": "{snippet(context, position)}"'
+    elif prize == NO_PRIZE:
+        decided["toy"] = "yes"
+        decided["how_toy"] = "Local rule: the competition is listed without prize money (knowledge, kudos or swag only)."
+    elif isinstance(prize, (int, float)) and prize >= SIGNIFICANT_PRIZE:
+        decided["toy"], decided["how_toy"] = "no", "n/a"
+
+    for flag_key in ABSENT_MEANS_NO:
+        if not matches.get(flag_key):
+            decided[flag_key], decided[HOW_KEY_OF[flag_key]] = "no", "n/a"
+    return decided
+
+
+def agreement(pairs):
+    """
+    Compares local decisions with earlier model answers. `pairs` yields (competition,
+    past analysis record). Returns {flag: {"compared", "decided", "agreed"}}.
+    """
+    stats = defaultdict(lambda: {"compared": 0, "decided": 0, "agreed": 0})
+    for competition, past in pairs:
+        decided = preclassify(competition)
+        for flag_key in ["toy"] + list(ABSENT_MEANS_NO):
+            stats[flag_key]["compared"] += 1
+            if flag_key in decided:
+                stats[flag_key]["decided"] += 1
+                stats[flag_key]["agreed"] += decided[flag_key] == past.get(flag_key)
+    return dict(stats)
+
+
+def past_pairs(details_file, results_file):
+    """(competition, past analysis) for every scraped competition that has a result."""
+    past = {record.get("url"): record for record in iter_records(results_file)}
+    for competition in iter_records(details_file):
+        record = past.get(competition.get("link"))
+        if record is not None:
+            yield competition, record
+
+
+def print_agreement(stats):
+    for flag_key, counts in stats.items():
+        decided = counts["decided"]
+        rate = f"{counts['agreed'] / decided:.0%}" if decided else "n/a"
+        print(f"  {flag_key:<26} decided locally for {decided}/{counts['compared']}, agreeing with the model on {rate}")
+
+
+if __name__ == "__main__":
+    from platforms import PLATFORMS
+
+    parser = argparse.ArgumentParser(description="Check the local keyword rules against earlier Gemini answers.")
+    parser.add_argument("--platform", choices=sorted(PLATFORMS), default="kaggle", help="Platform whose results to compare with.")
+    args = parser.parse_args()
+
+    platform = PLATFORMS[args.platform]
+    missing = [path for path in (platform.details_file, platform.results_file) if not os.path.exists(path)]
+    if missing:
+        print(f"⚠️ No scraped {platform.label} competitions or results at {', '.join(missing)}; skipping.")
+        sys.exit(0)
+    print(f"📏 Local rules vs. earlier model answers ({platform.details_file} / {platform.results_file}):")
+    print_agreement(agreement(past_pairs(platform.details_file, platform.results_file)))
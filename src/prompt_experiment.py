@@ -0,0 +1,250 @@
+import argparse
+import asyncio
+import contextlib
+import csv
+import io
+import json
+import os
+import random
+import time
+from collections import Counter
+
+import analysis
+import prompts
+from analysis_engine import AnalysisEngine, DEFAULT_CONCURRENCY, estimate_tokens
+from boilerplate import BoilerplateDetector
+from context_compressor import DEFAULT_CONTEXT_TOKENS, compress_context
+from definitions import DEFINITIONS_HEADER, STRUCTURE_HEADER
+from json_stream import iter_records
+from metrics import percentile
+from model_backends import BACKENDS
+from platforms import PLATFORMS
+from rate_limiter import RateLimiter, DEFAULT_REQUESTS_PER_MINUTE, DEFAULT_TOKENS_PER_MINUTE
+from response_cache import ResponseCache
+from response_schema import ANSWER_KEYS
+
+# --- Experiment ---
+DEFAULT_VARIANTS = ["SYSTEM_PROMPT", "prompt_4"]
+DEFAULT_SAMPLE = 30
+COMPARED_FIELDS = ["category"] + [flag_key for flag_key, _ in ANSWER_KEYS]
+
+
+def variant_prompt(name):
+    """
+    The system prompt of a variant: a prompts.py variable or a text file. Full prompts are used
+    as they are; definition-only drafts (like prompt_1 to prompt_3) replace the definitions of
+    SYSTEM_PROMPT and keep its rules and output structure.
+    """
+    if os.path.isfile(name):
+        with open(name, "r", encoding="utf-8") as f:
+            text = f.read()
+    else:
+        text = getattr(prompts, name, None)
+        if not isinstance(text, str):
+            raise ValueError(f"'{name}' is neither a prompt in prompts.py nor a file.")
+    if STRUCTURE_HEADER in text:
+        return text
+    rules_and_structure = prompts.SYSTEM_PROMPT.split(DEFINITIONS_HEADER, 1)[0]
+    return rules_and_structure + DEFINITIONS_HEADER + text.split(DEFINITIONS_HEADER, 1)[-1]
+
+
+def load_sample(details_file, size, seed, context_tokens):
+    """
+    A seeded random sample of the scraped competitions that have a context, compressed once
+    the way the analyzers compress them. Every variant is sent exactly these contexts.
+    """
+    competitions = [c for c in iter_records(details_file) if c.get("context") and not c["context"].startswith("Error:")]
+    sample = random.Random(seed).sample(competitions, min(size, len(competitions)))
+    if context_tokens and context_tokens > 0:
+        boilerplate = BoilerplateDetector.from_contexts(c["context"] for c in competitions)
+        for competition in sample:
+            competition["context"] = compress_context(competition["context"], context_tokens, boilerplate)[0]
+    return sample
+
+
+async def run_variants(variants, sample, concurrency, rate_limiter):
+    """
+    Analyzes every (variant, competition) pair through one engine, so the variants run side
+    by side and share the quota. Returns ({variant: {link: analysis}}, {variant: cost}).
+    Token counts are estimates; calls answered from the response cache cost nothing.
+    """
+    answers = {name: {} for name in variants}
+    costs = {name: {"answered": 0, "failed": 0, "calls": 0, "cache_hits": 0, "prompt_tokens": 0,
+                    "response_tokens": 0, "latencies": []} for name in variants}
+
+    def lookup(item):
+        name, competition = item
+        result = analysis.lookup_cached_analysis(competition["context"], competition["name"], variants[name])
+        if result is not None:
+            costs[name]["cache_hits"] += 1
+        return result
+
+    async def analyze(item):
+        name, competition = item
+        started = time.monotonic()
+        result = await analysis.analyze_competition_context(competition["context"], competition["name"], system_prompt=variants[name])
+        cost = costs[name]
+        cost["calls"] += 1
+        cost["latencies"].append(time.monotonic() - started)
+        cost["prompt_tokens"] += estimate_tokens(variants[name] + analysis.build_prompt(competition["context"], competition["name"]))
+        cost["response_tokens"] += estimate_tokens(json.dumps(result, ensure_ascii=False))
+        return result
+
+    def on_result(item, result):
+        name, competition = item
+        answers[name][competition["link"]] = result
+        costs[name]["answered"] += 1
+
+    def on_failure(item, error):
+        costs[item[0]]["failed"] += 1
+
+    # Interleaved, so every variant has answers for the same competitions if the run is cut short.
+    items = [(name, competition) for competition in sample for name in variants]
+    engine = AnalysisEngine(analyze, concurrency=concurrency, rate_limiter=rate_limiter,
+                            token_estimator=lambda item: estimate_tokens(variants[item[0]] + item[1]["context"]),
+                            cache_lookup=lookup)
+    with contextlib.redirect_stdout(io.StringIO()):  # Keep per-call progress lines out of the report
+        failures = await engine.run(items, on_result=on_result, on_failure=on_failure)
+    for (name, competition), error in failures:
+        print(f"  ❌ {name} failed on '{competition['name']}': {error}")
+    return answers, costs
+
+
+# --- Agreement ---
+def cohen_kappa(pairs):
+    """
+    Cohen's kappa for two raters' labels on the same items: their agreement corrected for the
+    agreement chance alone would give. None when it is undefined (both always gave one label).
+    """
+    if not pairs:
+        return None
+    total = len(pairs)
+    observed = sum(first == second for first, second in pairs) / total
+    first_counts = Counter(first for first, _ in pairs)
+    second_counts = Counter(second for _, second in pairs)
+    expected = sum(first_counts[label] * second_counts[label] for label in first_counts) / (total * total)
+    if expected == 1:
+        return None
+    return (observed - expected) / (1 - expected)
+
+
+def compare(baseline, other, fields=COMPARED_FIELDS):
+    """
+    Per-field {"compared", "agreement", "kappa"} of two {link: analysis} answer sets, over the
+    competitions both answered (and fields both have).
+    """
+    stats = {}
+    for field in fields:
+        pairs = [(str(baseline[link][field]).strip().lower(), str(other[link][field]).strip().lower())
+                 for link in baseline if link in other and field in baseline[link] and field in other[link]]
+        stats[field] = {
+            "compared": len(pairs),
+            "agreement": sum(first == second for first, second in pairs) / len(pairs) if pairs else None,
+            "kappa": cohen_kappa(pairs),
+        }
+    return stats
+
+
+def print_agreement(names, answers):
+    """One row per field; one column per variant, compared with the first (the baseline)."""
+    baseline = names[0]
+    others = names[1:]
+    if not others:
+        return {}
+    comparisons = {name: compare(answers[baseline], answers[name]) for name in others}
+    print(f"\n🤝 Agreement with {baseline} (share of equal answers, Cohen's κ):")
+    print(f"  {'field':<28}" + "".join(f"{name[:24]:>26}" for name in others))
+    for field in COMPARED_FIELDS:
+        cells = []
+        for name in others:
+            stats = comparisons[name][field]
+            if not stats["compared"]:
+                cells.append(f"{'—':>26}")
+                continue
+            kappa = f"{stats['kappa']:.2f}" if stats["kappa"] is not None else "n/a"
+            cells.append(f"{stats['agreement']:>12.0%} κ={kappa:<5} n={stats['compared']:<3}")
+        print(f"  {field:<28}" + "".join(cells))
+    return comparisons
+
+
+def print_costs(costs):
+    print("\n💰 Cost per variant (tokens are estimates; cache hits are free):")
+    print(f"  {'variant':<24}{'answered':>9}{'failed':>8}{'calls':>7}{'cached':>8}{'prompt tok':>12}{'response tok':>14}"
+          f"{'p50 s':>8}{'p95 s':>8}{'call s':>8}")
+    for name, cost in costs.items():
+        latencies = cost["latencies"]
+        print(f"  {name[:24]:<24}{cost['answered']:>9}{cost['failed']:>8}{cost['calls']:>7}{cost['cache_hits']:>8}"
+              f"{cost['prompt_tokens']:>12,}{cost['response_tokens']:>14,}{percentile(latencies, 0.5):>8.2f}"
+              f"{percentile(latencies, 0.95):>8.2f}{sum(latencies):>8.1f}")
+
+
+def load_results(path):
+    """{url: record} of a saved results file (JSON array, JSONL or CSV)."""
+    if path.endswith(".csv"):
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            records = list(csv.DictReader(f))
+    else:
+        records = iter_records(path)
+    return {record.get("url"): record for record in records if record.get("url")}
+
+
+def main(args):
+    if args.compare:
+        # Saved outputs of earlier runs, e.g. ethical_analysis.json vs. ethical_analysis_prompt2.json.
+        names = [os.path.basename(path) for path in args.compare]
+        answers = {name: load_results(path) for name, path in zip(names, args.compare)}
+        print(f"📂 Comparing {len(names)} result files: " + ", ".join(f"{name} ({len(answers[name])})" for name in names))
+        comparisons = print_agreement(names, answers)
+        output = {"files": args.compare, "agreement": comparisons}
+    else:
+        platform = PLATFORMS[args.platform]
+        try:
+            variants = {name: variant_prompt(name) for name in args.variants}
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+        if analysis.configure_model(args.backend) is None:
+            return
+        if not args.no_cache:
+            analysis.response_cache = ResponseCache(platform.cache_file)
+
+        sample = load_sample(platform.details_file, args.sample, args.seed, args.context_tokens)
+        print(f"🧪 {len(variants)} prompt variants × {len(sample)} {platform.label} competitions (seed {args.seed}), "
+              f"{args.concurrency} calls in flight.")
+        started = time.monotonic()
+        answers, costs = asyncio.run(run_variants(variants, sample, args.concurrency, RateLimiter(args.rpm, args.tpm)))
+        elapsed = time.monotonic() - started
+        if analysis.response_cache is not None:
+            analysis.response_cache.close()
+
+        print_costs(costs)
+        comparisons = print_agreement(list(variants), answers)
+        print(f"\n⏱️ Finished in {elapsed:.1f}s.")
+        for cost in costs.values():
+            cost["call_seconds"] = round(sum(cost.pop("latencies")), 2)
+        output = {"platform": args.platform, "seed": args.seed, "competitions": [c["link"] for c in sample],
+                  "seconds": round(elapsed, 2), "costs": costs, "agreement": comparisons, "answers": answers}
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=4, ensure_ascii=False)
+        print(f"✅ Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare prompt variants on a sample of competitions: per-field agreement, Cohen's kappa and cost.")
+    parser.add_argument("--platform", choices=sorted(PLATFORMS), default="kaggle", help="Platform whose scraped competitions to sample.")
+    parser.add_argument("--variants", nargs="+", default=DEFAULT_VARIANTS,
+                        help="Prompts to compare: prompts.py variable names or text files. The first is the baseline.")
+    parser.add_argument("--sample", type=int, default=DEFAULT_SAMPLE, help="Number of competitions to analyze with each variant.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the competition sample, so variants added later see the same one.")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Maximum number of model calls in flight, across all variants.")
+    parser.add_argument("--rpm", type=int, default=DEFAULT_REQUESTS_PER_MINUTE, help="Requests-per-minute quota of your Gemini tier.")
+    parser.add_argument("--tpm", type=int, default=DEFAULT_TOKENS_PER_MINUTE, help="Tokens-per-minute quota of your Gemini tier. 0 disables token limiting.")
+    parser.add_argument("--context_tokens", type=int, default=DEFAULT_CONTEXT_TOKENS, help="Per-competition context budget. 0 sends contexts uncompressed.")
+    parser.add_argument("--no_cache", action="store_true", help="Always call the model, ignoring the on-disk response cache.")
+    parser.add_argument("--backend", choices=BACKENDS, default="gemini", help="Model backend. 'stub' answers locally with fake analyses.")
+    parser.add_argument("--compare", nargs="+", metavar="RESULTS_FILE",
+                        help="Instead of running variants, compare saved result files (JSON, JSONL or CSV); the first is the baseline.")
+    parser.add_argument("--output", help="Also write costs, agreement and every answer as JSON to this file.")
+    main(parser.parse_args())
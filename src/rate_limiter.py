@@ -0,0 +1,241 @@
+import asyncio
+import json
+import os
+import random
+import re
+import time
+
+from metrics import recorder
+
+# --- Defaults ---
+# Free-tier quota for gemini-2.5-pro. Raise these on paid tiers.
+DEFAULT_REQUESTS_PER_MINUTE = 5
+DEFAULT_TOKENS_PER_MINUTE = 250_000
+
+# Adaptive (AIMD) control: grow slowly while calls succeed, halve on a 429/503.
+DEFAULT_MAX_REQUESTS_PER_MINUTE = 1000  # Ceiling for the learned rate
+MIN_REQUESTS_PER_MINUTE = 1
+ADDITIVE_INCREASE = 1.0  # Requests per minute added per successful call
+DECREASE_FACTOR = 0.5    # Rate and concurrency are multiplied by this when throttled
+
+
+class TokenBucket:
+    """
+    A token bucket that holds up to `capacity` tokens and refills continuously
+    at `capacity / period` tokens per second.
+    """
+
+    def __init__(self, capacity, period=60.0):
+        self.capacity = float(capacity)
+        self.refill_rate = self.capacity / period
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def set_capacity(self, capacity):
+        """Changes the bucket size (and with it the refill rate), keeping the tokens already in it."""
+        self._refill()
+        period = self.capacity / self.refill_rate
+        self.capacity = float(capacity)
+        self.refill_rate = self.capacity / period
+        self.tokens = min(self.tokens, self.capacity)
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+
+    def wait_time(self, amount):
+        """
+        Returns how many seconds to wait until `amount` tokens are available (0 if they are now).
+        Requests larger than the bucket are clamped to its capacity so they can still go through.
+        """
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.refill_rate
+
+    def consume(self, amount):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """
+    Enforces a requests-per-minute and (optionally) a tokens-per-minute quota across
+    all concurrent workers, plus a shared cooldown that is set when the provider
+    answers with a 429.
+    """
+
+    def __init__(self, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds):
+        """Blocks every worker for `seconds`, e.g. after a rate-limit response."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def release(self, ok=True):
+        """Called when a call let through by acquire() has finished. The fixed limiter ignores it."""
+
+    async def acquire(self, estimated_tokens=0):
+        """Waits until one request and `estimated_tokens` tokens fit in the quota, then takes them."""
+        # The lock keeps waiters in FIFO order so large requests are not starved by small ones.
+        started = time.monotonic()
+        async with self._lock:
+            while True:
+                delay = max(0.0, self.blocked_until - time.monotonic())
+                delay = max(delay, self.requests.wait_time(1))
+                if self.tokens is not None:
+                    delay = max(delay, self.tokens.wait_time(estimated_tokens))
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+
+            self.requests.consume(1)
+            if self.tokens is not None:
+                self.tokens.consume(estimated_tokens)
+        # Time spent queueing for quota (including 429 cooldowns), which no other span covers.
+        waited = time.monotonic() - started
+        if waited > 0.001:
+            recorder.record("quota_wait", waited)
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """
+    A RateLimiter that learns the provider's limit instead of trusting a configured one.
+    Like TCP congestion control (AIMD), every successful call raises the request rate a
+    little and every few successes allow one more call in flight; a 429/503 halves both.
+    The learned rate is saved with save() and picked up by the next run's restore(), so a
+    run starts near the sustainable maximum instead of relearning it.
+    """
+
+    def __init__(self, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE,
+                 max_requests_per_minute=DEFAULT_MAX_REQUESTS_PER_MINUTE, max_concurrency=1):
+        super().__init__(requests_per_minute, tokens_per_minute)
+        self.max_requests_per_minute = max(requests_per_minute, max_requests_per_minute)
+        self.rate = float(requests_per_minute)
+        self.max_concurrency = max(1, max_concurrency)
+        self.window = 1  # Calls allowed in flight; grows to max_concurrency while calls succeed
+        self.in_flight = 0
+        self.successes = 0  # Since the window last grew
+        self.decreased_at = None
+        self.throttled = 0
+        self._slot_freed = asyncio.Event()
+        self.state_file = None
+        self.state_key = None
+
+    def _set_rate(self, rate):
+        self.rate = min(self.max_requests_per_minute, max(MIN_REQUESTS_PER_MINUTE, rate))
+        self.requests.set_capacity(self.rate)
+
+    async def acquire(self, estimated_tokens=0):
+        while self.in_flight >= self.window:
+            self._slot_freed.clear()
+            await self._slot_freed.wait()
+        self.in_flight += 1
+        try:
+            await super().acquire(estimated_tokens)
+        except BaseException:
+            self.release(ok=False)
+            raise
+
+    def release(self, ok=True):
+        self.in_flight -= 1
+        self._slot_freed.set()
+        if not ok:
+            return
+        self._set_rate(self.rate + ADDITIVE_INCREASE)
+        self.successes += 1
+        if self.successes >= self.window and self.window < self.max_concurrency:
+            self.window += 1
+            self.successes = 0
+
+    def pause(self, seconds):
+        """Throttled: waits `seconds` (the Retry-After hint or a backoff) and cuts rate and concurrency."""
+        super().pause(seconds)
+        # Calls already in flight may come back throttled too; they belong to the same
+        # overload, so only the first one since the cut takes effect.
+        now = time.monotonic()
+        if self.decreased_at is not None and now - self.decreased_at < seconds:
+            return
+        self.decreased_at = now
+        self.throttled += 1
+        self._set_rate(self.rate * DECREASE_FACTOR)
+        self.window = max(1, int(self.window * DECREASE_FACTOR))
+        self.successes = 0
+
+    def restore(self, state_file, key):
+        """Starts from the rate and concurrency learned for `key` (e.g. the model) by an earlier run."""
+        self.state_file = state_file
+        self.state_key = key
+        learned = load_learned_rates(state_file).get(key)
+        if learned:
+            self._set_rate(learned["requests_per_minute"])
+            self.window = min(self.max_concurrency, max(1, learned.get("concurrency", 1)))
+        return learned
+
+    def save(self):
+        if not self.state_file:
+            return
+        learned = load_learned_rates(self.state_file)
+        learned[self.state_key] = {
+            "requests_per_minute": round(self.rate, 1),
+            "concurrency": self.window,
+            "throttled": self.throttled,
+            "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        temp_file = self.state_file + ".tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(learned, f, indent=4)
+        os.replace(temp_file, self.state_file)
+
+
+def load_learned_rates(state_file):
+    if not state_file or not os.path.exists(state_file):
+        return {}
+    with open(state_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def is_rate_limit_error(error):
+    """
+    Detects quota/rate-limit and overload errors without depending on a specific client library.
+    google-api-core raises `ResourceExhausted` (code 429) for Gemini quota errors and
+    `ServiceUnavailable` (code 503) when the model is overloaded; both mean "send less".
+    """
+    for status in (getattr(error, "code", None), getattr(error, "status_code", None)):
+        if status in (429, 503):
+            return True
+    if type(error).__name__ in ("ResourceExhausted", "TooManyRequests", "RateLimitExceeded", "ServiceUnavailable"):
+        return True
+    message = str(error).lower()
+    return "429" in message or "503" in message or "rate limit" in message or "quota" in message or "overloaded" in message
+
+
+def retry_after_seconds(error):
+    """
+    The provider's hint for how long to wait, or None: a `retry_after` attribute, an HTTP
+    Retry-After header, or Gemini's "retry_delay { seconds: N }" / "Please retry in Ns." text.
+    """
+    hint = getattr(error, "retry_after", None)
+    if hint is None:
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        hint = headers.get("Retry-After")
+    if hint is not None:
+        try:
+            return max(0.0, float(hint))
+        except (TypeError, ValueError):
+            return None  # An HTTP date; rare enough to fall back to backoff
+    match = re.search(r"retry_delay\s*\{\s*seconds:\s*(\d+)|retry in ([\d.]+)\s*s", str(error), re.IGNORECASE)
+    if match:
+        return float(match.group(1) or match.group(2))
+    return None
+
+
+def backoff_delay(attempt, base=2.0, maximum=60.0):
+    """Exponential backoff with jitter for the given (0-based) retry attempt."""
+    delay = min(maximum, base * (2 ** attempt))
+    return delay / 2 + random.uniform(0, delay / 2)
@@ -0,0 +1,94 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+# --- Defaults ---
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 MB of cached responses
+EVICT_TO = 0.9  # Eviction frees space down to this share of max_bytes, so a full cache isn't evicting on every put
+
+
+def cache_key(model_name, system_prompt, prompt):
+    """Content address of a request: any change to the model, system prompt or context is a new key."""
+    digest = hashlib.sha256()
+    for part in (model_name, system_prompt, prompt):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """
+    On-disk LLM response cache backed by SQLite, keyed on `cache_key(...)`.
+    Entries are evicted least-recently-used first once the stored responses exceed `max_bytes`,
+    down to EVICT_TO of it.
+    Their total size is summed once on open and kept up to date by put(), so a write costs
+    the same however large the cache has grown.
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " response TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self.conn.commit()
+        self.total_bytes = self._stored_bytes()
+
+    def get(self, key):
+        row = self.conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+        self.conn.commit()
+        return row[0]
+
+    def put(self, key, response):
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        replaced = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses (key, response, size, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+            (key, response, size, now, now),
+        )
+        self.total_bytes += size - (replaced[0] if replaced else 0)
+        if self.total_bytes > self.max_bytes:
+            self._evict()
+        self.conn.commit()
+
+    def _stored_bytes(self):
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _evict(self):
+        # Another run may have written to the same file since this one opened it, so the
+        # running total is checked against the table before anything is deleted.
+        self.total_bytes = self._stored_bytes()
+        if self.total_bytes <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY last_used"):
+            evicted.append(key)
+            self.total_bytes -= size
+            if self.total_bytes <= self.max_bytes * EVICT_TO:
+                break
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", [(key,) for key in evicted])
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        hit_rate = self.hits / lookups if lookups else 0.0
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": hit_rate}
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,206 @@
+import json
+import re
+
+# --- Schema ---
+# The flat 15-key analysis object of prompts.SYSTEM_PROMPT: a category, then yes/no flags,
+# each followed by its explanation ("how") key.
+ANSWER_KEYS = [
+    ("fairness_bias_mentioned", "how_fairness"),
+    ("data_privacy", "how_data_privacy"),
+    ("transparency_mentioned", "how_transparency"),
+    ("data_explainability", "how_explainability"),
+    ("post_competition_model_use", "how_model_use"),
+    ("toy", "how_toy"),
+    ("red_team", "how_red_team"),
+]
+SCHEMA_KEYS = ["category"] + [key for pair in ANSWER_KEYS for key in pair]
+HOW_KEY_OF = dict(ANSWER_KEYS)
+FLAG_KEY_OF = {how_key: flag_key for flag_key, how_key in ANSWER_KEYS}
+METRIC_FLAG = "data_explainability"  # A "no" here must say "n/a - <evaluation metric>"
+
+# Values used when a key is missing, e.g. in records produced before validation existed.
+DEFAULTS = dict({"category": "unknown"}, **{key: "no" if key in HOW_KEY_OF else "n/a" for key in SCHEMA_KEYS[1:]})
+
+# --- Repair ---
+YES_VALUES = {"yes", "y", "true", "1"}
+NO_VALUES = {"no", "n", "false", "0", "none"}
+NA_PATTERN = re.compile(r"^\s*n\.?\s*/?\s*a\.?\s*(?:[-–—:,]\s*(?P<metric>.*\S))?\s*$", re.IGNORECASE | re.DOTALL)
+FENCE_PATTERN = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+TRAILING_COMMA_PATTERN = re.compile(r",\s*([}\]])")
+# Keys a model may use inside a nested {"fairness_bias_mentioned": {...}} object.
+NESTED_FLAG_KEYS = ["answer", "value", "mentioned", "flag", "result"]
+NESTED_HOW_KEYS = ["how", "explanation", "reason", "evidence", "quote", "details"]
+
+
+class SchemaError(ValueError):
+    """The response has no usable analysis, or fields that stayed invalid after a targeted retry."""
+
+
+def extract_json(text):
+    """
+    Parses the JSON in a model answer, tolerating markdown code fences, text before or after
+    the JSON, and trailing commas. Raises SchemaError if there is no JSON value at all.
+    """
+    try:
+        return json.loads(text)
+    except (TypeError, ValueError):
+        pass
+    text = str(text or "")
+    fenced = FENCE_PATTERN.search(text)
+    if fenced:
+        text = fenced.group(1)
+    decoder = json.JSONDecoder()
+    for start in (match.start() for match in re.finditer(r"[{\[]", text)):
+        for candidate in (text[start:], TRAILING_COMMA_PATTERN.sub(r"\1", text[start:])):
+            try:
+                return decoder.raw_decode(candidate)[0]  # Ignores whatever follows the JSON
+            except ValueError:
+                continue
+    raise SchemaError("The response contains no JSON object.")
+
+
+def normalize_key(key):
+    return re.sub(r"[\s\-]+", "_", str(key).strip()).lower()
+
+
+def flatten(data):
+    """
+    Brings a dict into the flat schema shape: lower-case keys, a lone wrapper object
+    ({"analysis": {...}}) unwrapped, and nested {"answer", "how"} objects split into their
+    flag and how keys.
+    """
+    data = {normalize_key(key): value for key, value in data.items()}
+    if not any(key in data for key in SCHEMA_KEYS):
+        nested = [value for value in data.values() if isinstance(value, dict)]
+        if len(nested) == 1:
+            data = {normalize_key(key): value for key, value in nested[0].items()}
+
+    flat = {}
+    for key, value in data.items():
+        if isinstance(value, dict) and key in HOW_KEY_OF:
+            value = {normalize_key(inner): inner_value for inner, inner_value in value.items()}
+            flag = next((value[name] for name in NESTED_FLAG_KEYS + [key] if name in value), None)
+            how = next((value[name] for name in NESTED_HOW_KEYS + [HOW_KEY_OF[key]] if name in value), None)
+            flat[key] = flag
+            if how is not None and HOW_KEY_OF[key] not in data:
+                flat[HOW_KEY_OF[key]] = how
+        else:
+            flat[key] = value
+    return flat
+
+
+def normalize_flag(value):
+    if isinstance(value, bool):
+        return "yes" if value else "no"
+    text = str(value).strip().strip(".").lower() if value is not None else ""
+    if text in YES_VALUES:
+        return "yes"
+    if text in NO_VALUES:
+        return "no"
+    return value
+
+
+def normalize_how(value):
+    if isinstance(value, (list, tuple)):
+        value = " ".join(str(part) for part in value)
+    if value is None:
+        return ""
+    text = " ".join(str(value).split())
+    na = NA_PATTERN.match(text)
+    if na:
+        return f"n/a - {na.group('metric')}" if na.group("metric") else "n/a"
+    return text
+
+
+def validate_analysis(data):
+    """
+    Repairs what can be repaired locally and checks the rest of the schema.
+    Returns (analysis, invalid): the 15 schema keys (missing ones filled with DEFAULTS) and
+    the keys that still break a rule and need the model again:
+    - flags must be "yes" or "no";
+    - a "yes" needs an explanation in its how key, and a "no" has "n/a" there
+      (for data_explainability: "n/a - <metric>");
+    - the category must be a non-empty string.
+    """
+    if isinstance(data, list) and len(data) == 1:
+        data = data[0]
+    if not isinstance(data, dict):
+        raise SchemaError(f"Expected a JSON object, got {type(data).__name__}.")
+    data = flatten(data)
+
+    analysis, invalid = {}, []
+    category = data.get("category")
+    if isinstance(category, str) and category.strip():
+        analysis["category"] = category.strip()  # The model's casing is kept, as in earlier results
+    else:
+        analysis["category"] = DEFAULTS["category"]
+        invalid.append("category")
+
+    for flag_key, how_key in ANSWER_KEYS:
+        flag = normalize_flag(data.get(flag_key))
+        how = normalize_how(data.get(how_key))
+        if flag not in ("yes", "no"):
+            analysis[flag_key], analysis[how_key] = DEFAULTS[flag_key], DEFAULTS[how_key]
+            invalid += [flag_key, how_key]
+            continue
+        analysis[flag_key] = flag
+        if flag == "yes":
+            analysis[how_key] = how
+            if not how or how.startswith("n/a"):
+                invalid.append(how_key)
+        elif flag_key == METRIC_FLAG:
+            analysis[how_key] = how if how.startswith("n/a - ") else "n/a"
+            if not how.startswith("n/a - "):
+                invalid.append(how_key)  # The metric can only come from the context
+        else:
+            analysis[how_key] = "n/a"  # Whatever was written for a "no" carries no information
+    return analysis, invalid
+
+
+def parse_analysis(text, decided=None):
+    """
+    extract_json() and validate_analysis() for a single-competition answer. Keys in
+    `decided` (settled without the model, see preclassifier.py) override the answer's.
+    """
+    data = extract_json(text)
+    if decided:
+        if isinstance(data, list) and len(data) == 1:
+            data = data[0]
+        if not isinstance(data, dict):
+            raise SchemaError(f"Expected a JSON object, got {type(data).__name__}.")
+        data = dict(flatten(data), **decided)
+    return validate_analysis(data)
+
+
+def build_field_retry_prompt(context, competition_name, analysis, invalid):
+    """
+    Asks the model again for just the `invalid` keys (with their flag/how partners, which
+    are judged together), showing the answers it already gave for the rest.
+    Returns (prompt, keys asked for).
+    """
+    keys = [key for key in SCHEMA_KEYS if key in invalid or FLAG_KEY_OF.get(key) in invalid or HOW_KEY_OF.get(key) in invalid]
+    kept = {key: value for key, value in analysis.items() if key not in keys}
+    return (
+        f"Here is the context for the competition '{competition_name}':\n\n{context}\n\n"
+        f"An earlier answer for this competition was valid except for these keys: {', '.join(keys)}.\n"
+        f"The valid part was: {json.dumps(kept, ensure_ascii=False)}\n"
+        f"Answer with a single JSON object containing ONLY the keys {', '.join(keys)}, following all the rules."
+    ), keys
+
+
+def merge_field_retry(analysis, keys, text):
+    """
+    Replaces the retried `keys` of `analysis` with the answer to build_field_retry_prompt()
+    and re-validates. Returns (analysis, invalid) like validate_analysis(); keys the answer
+    left out stay invalid.
+    """
+    try:
+        fixes = extract_json(text)
+        if isinstance(fixes, list) and len(fixes) == 1:
+            fixes = fixes[0]
+        fixes = flatten(fixes) if isinstance(fixes, dict) else {}
+    except SchemaError:
+        fixes = {}
+    merged = {key: value for key, value in analysis.items() if key not in keys}
+    merged.update({key: value for key, value in fixes.items() if key in keys})
+    return validate_analysis(merged)
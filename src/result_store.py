@@ -0,0 +1,203 @@
+import json
+import os
+import time
+
+from json_stream import RecordWriter, iter_records
+from json_to_csv import write_csv
+
+
+class ResultStore:
+    """
+    Append-only JSONL log of analysis records that lives next to the JSON output file.
+
+    Every record is written as one line and fsync'd, so the cost of saving is constant no
+    matter how many records are already done, and a crash can at most lose the line being
+    written. The pretty-printed JSON (and CSV) outputs are produced from the log by
+    `compact()` once the run is over.
+
+    `completed_urls` indexes every stored record by competition URL, so a run can skip
+    finished competitions no matter what order it visits them in. `context_hashes` remembers
+    which version of each context was analyzed; a changed context is analyzed again, and
+    the newer record supersedes the older one when the log is compacted. `definitions`
+    likewise remembers which prompt definition versions produced each record's fields.
+    """
+
+    def __init__(self, output_file, log_file=None):
+        self.output_file = output_file
+        self.log_file = log_file or os.path.splitext(output_file)[0] + ".jsonl"
+        self.count = 0
+        self.completed_urls = set()
+        self.context_hashes = {}
+        self.definitions = {}
+        self.models = {}
+
+    def _index(self, record):
+        url = record.get("url")
+        self.completed_urls.add(url)
+        self.context_hashes[url] = record.get("context_hash")
+        self.definitions[url] = record.get("definitions")
+        self.models[url] = record.get("model")
+
+    def is_done(self, url, context_hash=None, model=None):
+        """
+        Whether `url` has been analyzed. If `context_hash` is given, the stored record must be
+        for that context; records from before hashes were stored count as up to date. Likewise,
+        if `model` is given, the record must come from that model (older records have none).
+        """
+        if url not in self.completed_urls:
+            return False
+        if model is not None and self.models.get(url) not in (None, model):
+            return False
+        stored_hash = self.context_hashes.get(url)
+        return context_hash is None or stored_hash is None or stored_hash == context_hash
+
+    def exists(self):
+        return os.path.exists(self.log_file)
+
+    def iter_records(self):
+        """Streams records from the log, one line at a time."""
+        if not self.exists():
+            return
+        with open(self.log_file, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def load(self):
+        """
+        Rebuilds state by streaming the log and returns the number of records found.
+        A torn last line (from a crash mid-write) is truncated away so new appends stay valid.
+        """
+        self.count = 0
+        self.completed_urls = set()
+        self.context_hashes = {}
+        self.definitions = {}
+        self.models = {}
+        if not self.exists():
+            return 0
+
+        good_offset = 0
+        with open(self.log_file, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line) if line.strip() else None
+                except ValueError:
+                    print(f"⚠️ Dropping a corrupted record at byte {good_offset} of {self.log_file}.")
+                    break
+                if not line.endswith(b"\n"):
+                    # A complete JSON value without its newline is still a torn write.
+                    break
+                if record is not None:
+                    self.count += 1
+                    self._index(record)
+                good_offset += len(line)
+
+        if good_offset != os.path.getsize(self.log_file):
+            with open(self.log_file, "r+b") as f:
+                f.truncate(good_offset)
+        return self.count
+
+    def reset(self):
+        """Starts a fresh log, discarding previous records."""
+        os.makedirs(os.path.dirname(self.log_file) or ".", exist_ok=True)
+        open(self.log_file, "w", encoding="utf-8").close()
+        self.count = 0
+        self.completed_urls = set()
+        self.context_hashes = {}
+        self.definitions = {}
+        self.models = {}
+
+    def seed_from_json(self):
+        """
+        Imports records from an existing JSON output (written before the log existed),
+        so older runs can still be resumed.
+        """
+        self.reset()
+        with open(self.log_file, "a", encoding="utf-8") as f:
+            for record in iter_records(self.output_file):
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                self.count += 1
+                self._index(record)
+            f.flush()
+            os.fsync(f.fileno())
+        return self.count
+
+    def append(self, record):
+        """Durably appends a single record."""
+        with open(self.log_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.count += 1
+        self._index(record)
+
+    def iter_latest_records(self):
+        """
+        Streams the log keeping only the last record per URL, so re-analyzed competitions
+        appear once, with their newest analysis.
+        """
+        last_position = {}
+        for position, record in enumerate(self.iter_records()):
+            last_position[record.get("url")] = position
+        for position, record in enumerate(self.iter_records()):
+            if last_position[record.get("url")] == position:
+                yield record
+
+    def compact(self, csv_file=None):
+        """
+        Writes the latest record per URL out as the usual indented JSON array (and optionally
+        the CSV), and returns how many records were written. The JSON is written to a
+        temporary file and swapped in, so the previous output survives a crash during compaction.
+        """
+        with RecordWriter(self.output_file) as writer:
+            written = writer.write_all(self.iter_latest_records())
+
+        if csv_file:
+            write_csv(self.iter_latest_records(), csv_file)
+        return written
+
+
+class RetryQueue:
+    """
+    Competitions whose analysis failed permanently, keyed by URL and saved next to the
+    output file. Failed competitions are retried first on the next run instead of
+    aborting the current one.
+    """
+
+    def __init__(self, output_file):
+        self.path = os.path.splitext(output_file)[0] + ".retry.json"
+        self.entries = {}
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = {entry["url"]: entry for entry in json.load(f)}
+        return self.entries
+
+    def add(self, competition, error):
+        url = competition.get("link")
+        previous = self.entries.get(url, {})
+        self.entries[url] = {
+            "url": url,
+            "name": competition.get("name"),
+            "error": str(error),
+            "attempts": previous.get("attempts", 0) + 1,
+            "failed_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        self.save()
+
+    def discard(self, url):
+        if self.entries.pop(url, None) is not None:
+            self.save()
+
+    def reset(self):
+        self.entries = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def save(self):
+        # The queue is small, so a whole-file atomic rewrite is fine here.
+        temp_file = self.path + ".tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(list(self.entries.values()), f, indent=4, ensure_ascii=False)
+        os.replace(temp_file, self.path)
@@ -0,0 +1,379 @@
+import argparse
+import json
+import math
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+import zlib
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:  # The semantic index is optional; everything else works without numpy.
+    np = None
+
+from analysis_engine import estimate_tokens
+from boilerplate import BoilerplateDetector
+from context_compressor import split_paragraphs, split_sections
+from fingerprints import context_hash_of
+from json_stream import iter_records
+from platforms import PLATFORMS, SEMANTIC_INDEX_DIR
+
+# --- Configuration ---
+DIMENSIONS = 2 ** 20   # Hashed features; rows are sparse, so only a chunk's own terms are stored
+CHUNK_TOKENS = 200     # A section's paragraphs are grouped into chunks of about this size
+STEM_CHARS = 6         # Words are cut to this length, so "anonymized" and "anonymisation" meet
+DEFAULT_TOP_K = 10
+BM25_K1 = 1.2          # How quickly repeats of a term stop adding to a chunk's score
+BM25_B = 0.75          # How much a long chunk's score is scaled down
+SNIPPET_CHARS = 160    # Printed per search hit
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOP_WORDS = set("""
+a an and are as at be by for from has have in is it its of on or that the this to was were will with
+you your we our they their can may not all any each which who what how if than then there these those
+""".split())
+
+INDEX_VERSION = 2              # Version 1 stored dense unit vectors of 2 ** 11 dimensions
+STARTS_FILE = "starts.i64"     # Position of each row's first entry in the two files below
+INDICES_FILE = "indices.i32"   # Dimension of every stored entry, row after row
+COUNTS_FILE = "counts.i32"     # How often the chunk has the entry's terms
+LENGTHS_FILE = "lengths.i32"   # Number of terms of each row's chunk
+OFFSETS_FILE = "offsets.i64"   # Byte offset of each row's line in the chunks file
+CHUNKS_FILE = "chunks.jsonl"
+META_FILE = "meta.json"
+
+# README examples, searched by --check on a fresh index of the checked-in scraped files.
+CHECK_QUERIES = [
+    ("aicrowd", "adversarial attacks jailbreak"),
+    ("kaggle", "anonymization GDPR personal data"),
+]
+
+
+def terms(text):
+    """Stemmed words of a text (stop words dropped) and each pair of adjacent ones."""
+    words = [word[:STEM_CHARS] for word in TOKEN_PATTERN.findall(text.lower()) if word not in STOP_WORDS]
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+def term_counts(text, dimensions=DIMENSIONS):
+    """
+    {dimension: count} of a text's terms, each hashed to one of `dimensions` (the hashing
+    trick). There is no vocabulary to fit, so adding records never changes the rows already
+    stored; with DIMENSIONS buckets, a query term rarely shares one with another term.
+    """
+    counts = Counter()
+    for term in terms(text):
+        counts[zlib.crc32(term.encode("utf-8")) % dimensions] += 1
+    return counts
+
+
+def chunk_context(context):
+    """
+    [(section, text)] chunks of a scraped context: each '--- TAB ---' section's paragraphs
+    (split as in context_compressor) grouped up to about CHUNK_TOKENS, never across sections.
+    """
+    chunks = []
+    for section, text in split_sections(context):
+        current, size = [], 0
+        for paragraph in split_paragraphs(text):
+            tokens = estimate_tokens(paragraph)
+            if current and size + tokens > CHUNK_TOKENS:
+                chunks.append((section, "\n".join(current)))
+                current, size = [], 0
+            current.append(paragraph)
+            size += tokens
+        if current:
+            chunks.append((section, "\n".join(current)))
+    return chunks
+
+
+class SemanticIndex:
+    """
+    Top-k search over chunks of the scraped contexts of every platform.
+
+    Files in `directory`:
+    - starts.i64, indices.i32 and counts.i32: the sparse term counts, one row per chunk
+      (compressed sparse rows), and lengths.i32: each chunk's number of terms. All are searched
+      as memory-mapped arrays;
+    - offsets.i64 and chunks.jsonl: the chunk behind each row ({"platform", "link", "name", "section", "text"});
+    - meta.json: the row and entry counts, and the context hash and rows of each indexed competition.
+    Rows are only ever appended. meta.json is written last, so rows of an interrupted add are
+    cut off again on the next add; a changed competition's old rows stay in the files but are
+    no longer searched or counted for IDF (--rebuild drops them).
+    """
+
+    def __init__(self, directory=SEMANTIC_INDEX_DIR, dimensions=DIMENSIONS):
+        if np is None:
+            raise ImportError("The semantic index needs numpy: pip install numpy")
+        self.directory = directory
+        self.starts_path = os.path.join(directory, STARTS_FILE)
+        self.indices_path = os.path.join(directory, INDICES_FILE)
+        self.counts_path = os.path.join(directory, COUNTS_FILE)
+        self.lengths_path = os.path.join(directory, LENGTHS_FILE)
+        self.offsets_path = os.path.join(directory, OFFSETS_FILE)
+        self.chunks_path = os.path.join(directory, CHUNKS_FILE)
+        self.meta_path = os.path.join(directory, META_FILE)
+        self.meta = {"version": INDEX_VERSION, "dimensions": dimensions, "rows": 0, "entries": 0, "chunks_bytes": 0, "documents": {}}
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                self.meta = json.load(f)
+            if self.meta.get("version") != INDEX_VERSION:
+                raise ValueError(f"The index in {directory} was built by an older version; run with --rebuild.")
+        self.dimensions = self.meta["dimensions"]
+        self._arrays = None
+        self._live = {}
+
+    def _rollback(self):
+        """Cuts off whatever an interrupted add wrote after the last saved meta.json."""
+        os.makedirs(self.directory, exist_ok=True)
+        rows, entries = self.meta["rows"], self.meta["entries"]
+        sizes = {
+            self.starts_path: rows * np.dtype(np.int64).itemsize,
+            self.indices_path: entries * np.dtype(np.int32).itemsize,
+            self.counts_path: entries * np.dtype(np.int32).itemsize,
+            self.lengths_path: rows * np.dtype(np.int32).itemsize,
+            self.offsets_path: rows * np.dtype(np.int64).itemsize,
+            self.chunks_path: self.meta["chunks_bytes"],
+        }
+        for path, size in sizes.items():
+            with open(path, "ab") as f:
+                if f.tell() != size:
+                    f.truncate(size)
+
+    def _save_meta(self):
+        temp_path = self.meta_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.meta_path)
+
+    def add(self, competitions, platform_name, boilerplate=None):
+        """
+        Indexes the competitions that are new or whose context changed since they were
+        indexed; unchanged ones are skipped without being chunked. `boilerplate` (a
+        boilerplate.BoilerplateDetector) strips text shared by the platform's pages first.
+        Returns the number of competitions indexed.
+        """
+        self._rollback()
+        documents = self.meta["documents"]
+        rows, entries = self.meta["rows"], self.meta["entries"]
+        added = 0
+        with open(self.starts_path, "ab") as starts, open(self.indices_path, "ab") as indices, \
+                open(self.counts_path, "ab") as counts, open(self.lengths_path, "ab") as lengths, \
+                open(self.offsets_path, "ab") as offsets, open(self.chunks_path, "ab") as chunks:
+            for competition in competitions:
+                link = competition.get("link")
+                context = competition.get("context") or ""
+                if not link or not context or context.startswith("Error:"):
+                    continue
+                context_hash = context_hash_of(competition)
+                if documents.get(link, {}).get("context_hash") == context_hash:
+                    continue
+
+                pieces = chunk_context(boilerplate.strip(context) if boilerplate is not None else context)
+                row_starts = np.zeros(len(pieces), dtype=np.int64)
+                row_lengths = np.zeros(len(pieces), dtype=np.int32)
+                positions = np.zeros(len(pieces), dtype=np.int64)
+                for row, (section, text) in enumerate(pieces):
+                    chunk_terms = term_counts(text, self.dimensions)
+                    row_starts[row] = entries
+                    row_lengths[row] = sum(chunk_terms.values())
+                    indices.write(np.fromiter(chunk_terms.keys(), dtype=np.int32, count=len(chunk_terms)).tobytes())
+                    counts.write(np.fromiter(chunk_terms.values(), dtype=np.int32, count=len(chunk_terms)).tobytes())
+                    entries += len(chunk_terms)
+                    positions[row] = chunks.tell()
+                    chunk = {"platform": platform_name, "link": link, "name": competition.get("name"), "section": section, "text": text}
+                    chunks.write((json.dumps(chunk, ensure_ascii=False) + "\n").encode("utf-8"))
+                starts.write(row_starts.tobytes())
+                lengths.write(row_lengths.tobytes())
+                offsets.write(positions.tobytes())
+                # Replaces the competition's earlier rows, which drop out of search and of the IDF counts.
+                documents[link] = {"platform": platform_name, "name": competition.get("name"),
+                                   "context_hash": context_hash, "rows": [rows, rows + len(pieces)]}
+                rows += len(pieces)
+                added += 1
+
+            for f in (starts, indices, counts, lengths, offsets, chunks):
+                f.flush()
+                os.fsync(f.fileno())
+            self.meta["rows"] = rows
+            self.meta["entries"] = entries
+            self.meta["chunks_bytes"] = chunks.tell()
+        self._save_meta()
+        self._arrays = None  # Re-mapped at the new size on the next search
+        self._live = {}
+        return added
+
+    def arrays(self):
+        """(starts, indices, counts, lengths, offsets) as memory-mapped arrays, or None while the index is empty."""
+        if self._arrays is None and self.meta["rows"]:
+            rows, entries = self.meta["rows"], self.meta["entries"]
+            self._arrays = (np.memmap(self.starts_path, dtype=np.int64, mode="r", shape=(rows,)),
+                            np.memmap(self.indices_path, dtype=np.int32, mode="r", shape=(entries,)),
+                            np.memmap(self.counts_path, dtype=np.int32, mode="r", shape=(entries,)),
+                            np.memmap(self.lengths_path, dtype=np.int32, mode="r", shape=(rows,)),
+                            np.memmap(self.offsets_path, dtype=np.int64, mode="r", shape=(rows,)))
+        return self._arrays
+
+    def chunk(self, row):
+        """The chunk record behind a row."""
+        with open(self.chunks_path, "rb") as f:
+            f.seek(int(self.arrays()[4][row]))
+            return json.loads(f.readline())
+
+    def documents(self, platform=None):
+        """Indexed competitions with at least one chunk, in row order."""
+        documents = [document for document in self.meta["documents"].values()
+                     if document["rows"][1] > document["rows"][0] and (platform is None or document["platform"] == platform)]
+        return sorted(documents, key=lambda document: document["rows"][0])
+
+    def live_rows(self):
+        """A mask of the rows of every indexed competition's current chunks (not replaced ones)."""
+        if "all" not in self._live:
+            live = np.zeros(self.meta["rows"], dtype=bool)
+            for document in self.documents():
+                live[slice(*document["rows"])] = True
+            self._live["all"] = live
+        return self._live["all"]
+
+    def scores(self, query):
+        """
+        BM25 score of every row for `query`, with the IDF and average chunk length taken over
+        the live chunks, so replaced rows neither score nor count. One sequential pass over the
+        mapped dimensions finds the entries of the query's terms; the rest is never read.
+        """
+        starts, indices, counts, lengths, _ = self.arrays()
+        query_terms = term_counts(query, self.dimensions)
+        scores = np.zeros(self.meta["rows"], dtype=np.float32)
+        if not query_terms:
+            return scores
+        dimensions = np.fromiter(query_terms.keys(), dtype=np.int32, count=len(query_terms))
+        hits = np.flatnonzero(np.isin(indices, dimensions))
+        rows = np.searchsorted(starts, hits, side="right") - 1
+        live = self.live_rows()[rows]
+        hits, rows = hits[live], rows[live]
+
+        # A row holds each dimension once, so a dimension's live entries count the chunks using it.
+        hit_dimensions = np.asarray(indices[hits])
+        used, chunk_counts = np.unique(hit_dimensions, return_counts=True)
+        total = int(self.live_rows().sum())
+        weights = {int(dimension): query_terms[int(dimension)] * math.log(1 + (total - count + 0.5) / (count + 0.5))
+                   for dimension, count in zip(used, chunk_counts)}
+        hit_weights = np.array([weights[int(dimension)] for dimension in hit_dimensions], dtype=np.float32)
+
+        frequency = np.asarray(counts[hits], dtype=np.float32)
+        average_length = float(np.asarray(lengths)[self.live_rows()].mean())
+        length_norm = 1 - BM25_B + BM25_B * np.asarray(lengths[rows], dtype=np.float32) / average_length
+        np.add.at(scores, rows, hit_weights * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * length_norm))
+        return scores
+
+    def search(self, query, top_k=DEFAULT_TOP_K, platform=None, per_competition=True):
+        """
+        The chunks most similar to `query`, best first, as chunk records with a "score".
+        With `per_competition`, the best chunk of each of the `top_k` best competitions;
+        otherwise the `top_k` best chunks. Chunks sharing no term with the query are left out.
+        """
+        documents = self.documents(platform)
+        if not documents or self.arrays() is None:
+            return []
+        scores = self.scores(query)
+        live = np.zeros(len(scores), dtype=bool)
+        for document in documents:
+            live[slice(*document["rows"])] = True
+        scores[~live] = -np.inf  # Replaced rows, and other platforms' when filtering
+
+        if per_competition:
+            starts = np.array([document["rows"][0] for document in documents])
+            best = np.maximum.reduceat(scores, starts)  # Rows between documents are -inf
+            picked = np.argsort(-best)[:top_k]
+            rows = [documents[i]["rows"][0] + int(np.argmax(scores[slice(*documents[i]["rows"])])) for i in picked]
+        else:
+            k = min(top_k, len(scores))
+            rows = sorted(np.argpartition(-scores, k - 1)[:k], key=lambda row: -scores[row])
+        return [dict(self.chunk(row), score=float(scores[row])) for row in rows if scores[row] > 0]
+
+
+def add_platforms(index, platform_names):
+    """Indexes the scraped competitions of each platform that has them, printing progress."""
+    for name in platform_names:
+        platform = PLATFORMS[name]
+        if not os.path.exists(platform.details_file):
+            print(f"⚠️ No scraped {platform.label} competitions at {platform.details_file}; skipping.")
+            continue
+        started = time.monotonic()
+        boilerplate = BoilerplateDetector.from_contexts(c.get("context", "") for c in iter_records(platform.details_file))
+        added = index.add(iter_records(platform.details_file), name, boilerplate)
+        print(f"🧭 Indexed {added} new or changed {platform.label} competitions in {time.monotonic() - started:.1f}s.")
+
+
+def check(queries=CHECK_QUERIES):
+    """
+    Builds a fresh index of the scraped files in a temporary directory and searches each
+    (platform, query). A query passes when its best chunk contains one of the query's words
+    and at least half of them. Returns True if every query with scraped competitions passes.
+    """
+    passed = True
+    with tempfile.TemporaryDirectory() as directory:
+        index = SemanticIndex(directory)
+        add_platforms(index, sorted({platform for platform, _ in queries}))
+        for platform, query in queries:
+            if not index.documents(platform):
+                continue
+            hits = index.search(query, 3, platform, per_competition=False)
+            words = {word[:STEM_CHARS] for word in TOKEN_PATTERN.findall(query.lower()) if word not in STOP_WORDS}
+            found = words & set(terms(hits[0]["text"])) if hits else set()
+            ok = len(found) * 2 >= len(words) and found
+            passed = passed and bool(ok)
+            top = f"{hits[0]['name']} ({hits[0]['score']:.3f}), has {', '.join(sorted(found)) or 'none'} of {', '.join(sorted(words))}" if hits else "no results"
+            print(f"{'✅' if ok else '❌'} [{platform}] '{query}': {top}")
+    return passed
+
+
+def main(args):
+    if np is None:
+        print("❌ The semantic index needs numpy: pip install numpy")
+        return
+    if args.check:
+        sys.exit(0 if check() else 1)
+    if args.rebuild and os.path.isdir(args.index_dir):
+        shutil.rmtree(args.index_dir)
+        print(f"🗑️ Removed the index in {args.index_dir}; rebuilding.")
+    try:
+        index = SemanticIndex(args.index_dir)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+
+    if args.add or args.rebuild:
+        add_platforms(index, args.platforms)
+        print(f"✅ {len(index.documents())} competitions, {index.meta['rows']:,} chunks in {args.index_dir}")
+
+    if args.query:
+        platform = args.platforms[0] if len(args.platforms) == 1 else None
+        started = time.perf_counter()
+        hits = index.search(args.query, args.top_k, platform, per_competition=not args.chunks)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"\n🔎 '{args.query}': {len(hits)} results in {elapsed:.0f} ms")
+        for hit in hits:
+            text = " ".join(hit["text"].split())[:SNIPPET_CHARS]
+            print(f"  {hit['score']:.3f}  [{hit['platform']}] {hit['name']} ({hit['section'] or 'preamble'})\n         {text}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local semantic search over the scraped competition contexts of every platform.")
+    parser.add_argument("--add", action="store_true", help="First index competitions that are new or changed since the last --add.")
+    parser.add_argument("--rebuild", action="store_true", help="Delete the index and build it again from the scraped files.")
+    parser.add_argument("--query", help="Text to search for, e.g. 'anonymization GDPR personal data'.")
+    parser.add_argument("--top_k", type=int, default=DEFAULT_TOP_K, help="Number of results.")
+    parser.add_argument("--chunks", action="store_true", help="List the best chunks instead of the best chunk of each competition.")
+    parser.add_argument("--platforms", nargs="+", choices=sorted(PLATFORMS), default=sorted(PLATFORMS),
+                        help="Platforms to index, or (with just one) to search.")
+    parser.add_argument("--check", action="store_true",
+                        help="Index the scraped files in a temporary directory and check that the README example queries find their terms.")
+    parser.add_argument("--index_dir", default=SEMANTIC_INDEX_DIR, help="Where the index files live.")
+    main(parser.parse_args())
@@ -0,0 +1,137 @@
+import re
+import unicodedata
+
+# --- Precompiled Patterns ---
+# The substitutions run in the same order as before; several can create or destroy
+# matches for the next one, so they are not merged unless that is provably safe.
+UI_LINE_PATTERN = re.compile(r'^(Home|Challenges|Leaderboard|Discussion|Insights|Rules|Overview)$')
+SYMBOLS_ONLY_PATTERN = re.compile(r'^[0-9\s\-_|]+$')  # Lines that are mostly numbers/symbols
+
+URL_PATTERN = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+
+# Dates and times (various formats). All of them need a digit; each is paired with the
+# characters it cannot match without, so most lines skip most scans.
+SLASH_DATE_PATTERN = re.compile(r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b')  # MM/DD/YYYY, MM-DD-YYYY
+ISO_DATE_PATTERN = re.compile(r'\b\d{4}[/-]\d{1,2}[/-]\d{1,2}\b')  # YYYY/MM/DD, YYYY-MM-DD
+DAY_MONTH_PATTERN = re.compile(r'\b\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{2,4}\b', re.IGNORECASE)  # DD Mon YYYY
+MONTH_DAY_PATTERN = re.compile(r'\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2},?\s+\d{2,4}\b', re.IGNORECASE)  # Mon DD, YYYY
+TIME_PATTERN = re.compile(r'\b\d{1,2}:\d{2}(?::\d{2})?(?:\s*[AP]M)?\b', re.IGNORECASE)  # Time formats
+FULL_MONTH_PATTERN = re.compile(r'\b(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{2,4}\b', re.IGNORECASE)  # Full month names
+YEAR_PATTERN = re.compile(r'\b\d{4}\b')  # Years (4 digits)
+
+# Runs of repeated punctuation. The four character classes are disjoint and no replacement
+# can produce a run of another class, so one merged pass equals the four separate ones.
+PUNCTUATION_RUN_PATTERN = re.compile(r'!{2,}|\?{2,}|-{3,}|_{2,}')
+PUNCTUATION_RUN_REPLACEMENTS = {"!": "!", "?": "?", "-": "--", "_": "_"}
+
+# Bullet points and list markers (anchored at the start, applied one after another)
+BULLET_PATTERN = re.compile(r'^[\s]*[•·▪▫‣⁃]\s*')
+NUMBERED_MARKER_PATTERN = re.compile(r'^[\s]*\d+[\.\)]\s*')
+LETTERED_MARKER_PATTERN = re.compile(r'^[\s]*[a-zA-Z][\.\)]\s*')
+
+DIGIT_PATTERN = re.compile(r'\d')
+
+
+class _SymbolStripTable(dict):
+    """
+    A `str.translate` table that deletes "Symbol, other" (So) characters such as emojis.
+    Categories are looked up once per distinct character and then cached.
+    """
+
+    def __missing__(self, codepoint):
+        value = None if unicodedata.category(chr(codepoint)) == 'So' else codepoint
+        self[codepoint] = value
+        return value
+
+
+SYMBOL_STRIP_TABLE = _SymbolStripTable()
+
+
+def _replace_punctuation_run(match):
+    return PUNCTUATION_RUN_REPLACEMENTS[match.group()[0]]
+
+
+def strip_symbols(line):
+    """Removes emojis and other special Unicode symbols."""
+    if line.isascii():
+        # NFKD leaves ASCII unchanged and ASCII has no So characters.
+        return line
+    return unicodedata.normalize('NFKD', line).translate(SYMBOL_STRIP_TABLE)
+
+
+def clean_line_content(line):
+    """
+    Clean individual line content by removing special characters and normalizing text.
+    """
+    # Remove URLs
+    if 'http' in line:
+        line = URL_PATTERN.sub('', line)
+
+    # Remove email addresses
+    if '@' in line:
+        line = EMAIL_PATTERN.sub('', line)
+
+    # Remove dates, times and years (removals never add digits, slashes or colons)
+    if DIGIT_PATTERN.search(line):
+        if '/' in line or '-' in line:
+            line = SLASH_DATE_PATTERN.sub('', line)
+            line = ISO_DATE_PATTERN.sub('', line)
+        line = DAY_MONTH_PATTERN.sub('', line)
+        line = MONTH_DAY_PATTERN.sub('', line)
+        if ':' in line:
+            line = TIME_PATTERN.sub('', line)
+        line = FULL_MONTH_PATTERN.sub('', line)
+        line = YEAR_PATTERN.sub('', line)
+
+    # Remove excessive punctuation (keep periods, commas, colons)
+    if '!!' in line or '??' in line or '---' in line or '__' in line:
+        line = PUNCTUATION_RUN_PATTERN.sub(_replace_punctuation_run, line)
+
+    # Remove bullet points and list markers
+    for pattern in (BULLET_PATTERN, NUMBERED_MARKER_PATTERN, LETTERED_MARKER_PATTERN):
+        match = pattern.match(line)
+        if match:
+            line = line[match.end():]
+
+    # Normalize whitespace (str.split() uses the same whitespace definition as \s)
+    return ' '.join(line.split())
+
+
+def is_content_line(line):
+    """
+    Keeps lines that are not too short and don't look like UI elements, copyright,
+    cookie or privacy notices. `line` must already be stripped.
+    """
+    if len(line) <= 10 or line.startswith('©'):
+        return False
+    lowered = line.lower()
+    if 'cookie' in lowered or 'privacy' in lowered:
+        return False
+    return not UI_LINE_PATTERN.match(line) and not SYMBOLS_ONLY_PATTERN.match(line)
+
+
+def iter_clean_lines(lines):
+    """
+    Streams cleaned lines: filters UI/boilerplate lines, strips symbols, cleans the content,
+    and keeps what is still longer than 10 characters.
+    """
+    for line in lines:
+        line = line.strip()
+        if not is_content_line(line):
+            continue
+        cleaned_line = clean_line_content(strip_symbols(line))
+        if len(cleaned_line) > 10:
+            yield cleaned_line
+
+
+def clean_text_for_analysis(text):
+    """
+    Comprehensive text cleaning to optimize for token length and analysis.
+    First extracts according to previous logic, then removes emojis/special chars, then applies >10 condition.
+    """
+    if not text:
+        return ""
+    # Cleaned lines have no surrounding or repeated whitespace, so collapsing all
+    # whitespace in the joined text is the same as joining them with single spaces.
+    return ' '.join(iter_clean_lines(text.split('\n')))